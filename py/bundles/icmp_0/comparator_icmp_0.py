@@ -1,6 +1,7 @@
 
 from difftest.bases import Comparator
 from difftest.cfg import ComparatorEntry
+from difftest.rawfield import RawField
 from difftest.util import get_logger
 from difftest.testenv import inject_icmp_cmd_0_trs
 
@@ -44,12 +45,14 @@ class ComparatorIcmp( Comparator ):
         if super().enrich_cmp_cfg():
             from scapy.all import IP, ICMP
             CE = ComparatorEntry
+            # Raw fields, read without dissecting the packets
+            # (lazy dissection and list read mode).
             cmp_entries = [
-                CE( IP, ( lambda x: x.version, ),
+                CE( IP, ( RawField( IP, 'version' ), ),
                           pkt_cmp_fn = None ),
-                CE( ICMP, ( lambda x: x.type,
-                            lambda x: x.code,
-                            lambda x: x.seq ),
+                CE( ICMP, ( RawField( ICMP, 'type' ),
+                            RawField( ICMP, 'code' ),
+                            RawField( ICMP, 'seq' ) ),
                             pkt_cmp_fn = None )
             ]
             for ce in cmp_entries:
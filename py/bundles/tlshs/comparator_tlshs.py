@@ -3,6 +3,8 @@ from difftest.bases import Comparator
 from difftest.cfg import ComparatorEntry
 from difftest.util import get_logger
 from difftest.testenv import inject_tlshs_trs
+from difftest.tcpstream import reassemble_tcp, get_tcp_payload
+from difftest.tlsstream import get_tls_hs_msgs, starts_with_tls_hs
 
 
 # iPOPO decorators
@@ -37,18 +39,22 @@ class ComparatorTlsHs( Comparator ):
         self._log.info( 'Uninstalled the %s service.' % __name__ )
 
 
-    # We have to pre-load the packets with the TLS
-    # layer of scapy. Therefore we override the _eq
-    # function and call the parent class method again.
-    def _eq( self, idx, a, b ):
-        ret_val = False
-        try:
-            a = TLS( a.load )
-            b = TLS( b.load )
-        except ( TypeError, KeyError, AttributeError ) as e:
-            self._log.error( str( e ) )
-        ret_val = super()._eq( idx, a, b )
-        return ret_val
+    # The TCP segments are reassembled per flow and direction,
+    # the handshake messages are compared instead of segments.
+    # Only the segments which start with a handshake record
+    # are timing checked (the time ranges are based on them).
+    def _preprocess( self, pkts ):
+        streams = reassemble_tcp( pkts )
+        for stream in streams:
+            if stream.has_gap():
+                self._log.warning( 'Segments missing in TCP ' +
+                                   'stream %s' % str( stream.get_key() ) )
+        msgs = get_tls_hs_msgs( streams )
+        timed = [ x for x in pkts \
+                  if starts_with_tls_hs( get_tcp_payload( x ) ) ]
+        self._log.info( '%d handshake messages in %d packets.' % \
+                        ( len( msgs ), len( pkts ) ) )
+        return ( msgs, timed )
 
 
     def enrich_cmp_cfg( self ):
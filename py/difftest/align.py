@@ -0,0 +1,266 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         align.py
+
+
+    Purpose:      This module contains
+                  the sequence alignment
+                  of two packet captures.
+                  The alignment is
+                  computed on packet keys
+                  with the O(ND) difference
+                  algorithm by E. W. Myers
+                  (linear space variant).
+
+
+    Remarks:      - The result is a list of
+                    opcodes in the same format
+                    as the ones of difflib:
+                    ( tag, i1, i2, j1, j2 )
+                    with tag being 'equal',
+                    'replace', 'delete' or
+                    'insert'.
+
+                  - If the edit distance of a
+                    region exceeds the cost
+                    limit, the region is
+                    reported as replaced.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+# Upper bound of the edit distance searched for
+# a single middle snake. Keeps the run time bounded
+# for completely different captures.
+ALIGN_MAX_COST = 2000
+
+
+# Maps packet projections to integer keys. Equal projections
+# get the same key, so the alignment compares integers only.
+class KeyInterner( object ):
+    def __init__( self ):
+        self.__keys = {}
+
+
+    def get_key( self, projection ):
+        projection = make_hashable( projection )
+        key = self.__keys.get( projection )
+        if key is None:
+            key = len( self.__keys )
+            self.__keys[ projection ] = key
+        return key
+
+
+
+def make_hashable( value ):
+    if isinstance( value, ( list, tuple ) ):
+        return tuple( [ make_hashable( x ) for x in value ] )
+    try:
+        hash( value )
+    except TypeError:
+        return repr( value )
+    return value
+
+
+def diff_opcodes( a, b, max_cost = ALIGN_MAX_COST ):
+    blocks = []
+    _match_blocks( a, 0, len( a ), b, 0, len( b ), blocks,
+                   max_cost )
+    blocks.sort()
+    return _blocks_to_opcodes( blocks, len( a ), len( b ) )
+
+
+# Collects the matching blocks ( i, j, n ) of the regions
+# a[ alo : ahi ] and b[ blo : bhi ].
+def _match_blocks( a, alo, ahi, b, blo, bhi, blocks, max_cost ):
+    # Common prefix and suffix are cheap and by far the
+    # most common case for similar captures.
+    n = 0
+    while alo < ahi and blo < bhi and a[ alo ] == b[ blo ]:
+        alo += 1
+        blo += 1
+        n += 1
+    if n > 0:
+        blocks.append( ( alo - n, blo - n, n ) )
+    n = 0
+    while ahi > alo and bhi > blo and \
+          a[ ahi - 1 ] == b[ bhi - 1 ]:
+        ahi -= 1
+        bhi -= 1
+        n += 1
+    if n > 0:
+        blocks.append( ( ahi, bhi, n ) )
+    if alo == ahi or blo == bhi:
+        return
+    snake = _middle_snake( a, alo, ahi, b, blo, bhi, max_cost )
+    if snake is None:
+        return
+    ( x0, y0, x1, y1 ) = snake
+    _match_blocks( a, alo, alo + x0, b, blo, blo + y0, blocks,
+                   max_cost )
+    if x1 > x0:
+        blocks.append( ( alo + x0, blo + y0, x1 - x0 ) )
+    _match_blocks( a, alo + x1, ahi, b, blo + y1, bhi, blocks,
+                   max_cost )
+
+
+# Returns the middle snake ( x0, y0, x1, y1 ) relative to the
+# region start or None if the cost limit was hit.
+def _middle_snake( a, alo, ahi, b, blo, bhi, max_cost ):
+    n = ahi - alo
+    m = bhi - blo
+    delta = n - m
+    odd = ( delta % 2 ) != 0
+    max_d = min( ( n + m + 1 ) // 2, max_cost )
+    off = max_d + 1
+    vf = [ 0 ] * ( 2 * off + 1 )
+    vb = [ 0 ] * ( 2 * off + 1 )
+    for d in range( max_d + 1 ):
+        # forward search
+        for k in range( -d, d + 1, 2 ):
+            if k == -d or ( k != d and \
+                            vf[ off + k - 1 ] < vf[ off + k + 1 ] ):
+                x = vf[ off + k + 1 ]
+            else:
+                x = vf[ off + k - 1 ] + 1
+            y = x - k
+            ( x0, y0 ) = ( x, y )
+            while x < n and y < m and \
+                  a[ alo + x ] == b[ blo + y ]:
+                x += 1
+                y += 1
+            vf[ off + k ] = x
+            if odd and ( delta - ( d - 1 ) ) <= k <= \
+                       ( delta + ( d - 1 ) ) and \
+               ( x + vb[ off + delta - k ] ) >= n:
+                return ( x0, y0, x, y )
+        # backward search on the reversed regions
+        for k in range( -d, d + 1, 2 ):
+            if k == -d or ( k != d and \
+                            vb[ off + k - 1 ] < vb[ off + k + 1 ] ):
+                x = vb[ off + k + 1 ]
+            else:
+                x = vb[ off + k - 1 ] + 1
+            y = x - k
+            ( x0, y0 ) = ( x, y )
+            while x < n and y < m and \
+                  a[ ahi - 1 - x ] == b[ bhi - 1 - y ]:
+                x += 1
+                y += 1
+            vb[ off + k ] = x
+            if not odd and -d <= ( delta - k ) <= d and \
+               ( x + vf[ off + delta - k ] ) >= n:
+                return ( n - x, m - y, n - x0, m - y0 )
+    return None
+
+
+def _blocks_to_opcodes( blocks, len_a, len_b ):
+    opcodes = []
+    i = 0
+    j = 0
+    for ( ai, bj, size ) in blocks + [ ( len_a, len_b, 0 ) ]:
+        tag = None
+        if i < ai and j < bj:
+            tag = 'replace'
+        elif i < ai:
+            tag = 'delete'
+        elif j < bj:
+            tag = 'insert'
+        if tag is not None:
+            opcodes.append( ( tag, i, ai, j, bj ) )
+        if size > 0:
+            if len( opcodes ) > 0 and opcodes[ -1 ][ 0 ] == 'equal' \
+               and opcodes[ -1 ][ 2 ] == ai:
+                # merge adjacent equal blocks
+                prev = opcodes.pop()
+                ( ai, bj, size ) = ( prev[ 1 ], prev[ 3 ],
+                                     size + ( ai - prev[ 1 ] ) )
+            opcodes.append( ( 'equal', ai, ai + size,
+                              bj, bj + size ) )
+        i = ai + size
+        j = bj + size
+    return opcodes
+
+
+# The captures are aligned on the packet projections first.
+# Aligned packet pairs are compared field by field, packets
+# without a counterpart are reported as deleted (missing on
+# the PUT) or inserted (additional on the PUT).
+def cmp_aligned( ctx, a, b ):
+    log = ctx.get_log()
+    budget = ctx.get_budget()
+    interner = KeyInterner()
+    a_keys = [ interner.get_key( x ) for x in ctx.project_all( a ) ]
+    b_keys = [ interner.get_key( x ) for x in ctx.project_all( b ) ]
+    opcodes = diff_opcodes( a_keys, b_keys )
+    cmp_ok = True
+    num = { 'equal' : 0, 'replace' : 0,
+            'delete' : 0, 'insert' : 0 }
+    for ( tag, i1, i2, j1, j2 ) in opcodes:
+        if budget.is_exhausted():
+            break
+        if tag == 'replace':
+            log.error( ( 'Expected packets %d to %d differ from ' +
+                         'actual packets %d to %d.' ) % \
+                       ( i1 + 1, i2, j1 + 1, j2 ) )
+        pairs = min( ( i2 - i1 ), ( j2 - j1 ) )
+        for ( i, j ) in zip( range( i1, i1 + pairs ),
+                             range( j1, j1 + pairs ) ):
+            if budget.is_exhausted():
+                break
+            if i != j:
+                log.debug( 'Expected packet %4d is compared ' +
+                           'with actual packet %4d', ( i + 1 ),
+                           ( j + 1 ) )
+            if not ctx.eq( ( i + 1 ), a[ i ], b[ j ] ):
+                cmp_ok = False
+            num[ tag ] += 1
+        # Missing and additional packets count as mismatches.
+        deleted = ctx.report_missing( range( i1 + pairs, i2 ),
+                                      'deleted' )
+        inserted = ctx.report_additional( range( j1 + pairs, j2 ),
+                                          'inserted',
+                                          budget_idx = ( i1 + pairs ) )
+        num[ 'delete' ] += deleted
+        num[ 'insert' ] += inserted
+        if ( deleted + inserted ) > 0:
+            cmp_ok = False
+    log.info( ( 'Alignment: %d equal, %d changed, %d deleted, ' +
+                '%d inserted packets.' ) % \
+              ( num[ 'equal' ], num[ 'replace' ],
+                num[ 'delete' ], num[ 'insert' ] ) )
+    return cmp_ok
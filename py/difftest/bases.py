@@ -61,20 +61,54 @@
 
 import os
 import sys
-import signal as sig
-import subprocess as sp
 import time
 import logging
+import threading
+import itertools as itt
+import multiprocessing as mp
 from abc import ABC, abstractmethod
 from scapy.all import conf, AsyncSniffer, wrpcap, rdpcap
+from scapy.data import DLT_EN10MB
+from scapy.layers.l2 import Ether
 from difftest.util import get_report_logger, log_ascii_fail, \
-                          log_pass, tear_down_report_logger
-from difftest.testenv import get_initial_cmp_cfg
+                          log_pass, tear_down_report_logger, \
+                          get_buffer_logger
+from difftest.testenv import get_initial_cmp_cfg, \
+                             get_golden_cache_cfg, \
+                             get_test_run_mode
+from difftest.golden import GoldenCache
+from difftest.genctl import get_generator_controller
+from difftest.netns import get_nsenter_cmd
+from difftest.plan import compile_cmp_plan, get_field_label
+from difftest.results import ResultStore
+from difftest.columnar import extract_columns
+from difftest.timing import chk_pkt_times, chk_time_ranges
+from difftest.normalise import Normaliser
+from difftest.budget import CmpBudget
+from difftest.flows import get_flow_jobs, cmp_flow_units, \
+                           format_flow_key
+from difftest.engines import CmpContext, select_engine, uses_plan, \
+                             get_positional_cmp_fn, get_match_cmp_fn, \
+                             cmp_streamed, get_pkt_times
+from difftest.model import get_model_key, load_golden_model, \
+                           save_golden_model
+from difftest.pcapio import iter_pcap, iter_pcap_times, peek, \
+                            find_stop_layer, LazyPacketList, \
+                            index_pcap, iter_pcap_range, \
+                            PcapStreamWriter
 
 
 ERR_TEXT_ABS_METHOD_CALL = 'Mehtod must be implemented ' + \
                            'in derived class.'
 
+# Upper bound of the wait for the sniffers to start.
+# Unit is seconds [s].
+SNIFFER_START_TIMEOUT = 5
+
+# Comparator instance which is inherited by the forked
+# worker processes of a comparison pool.
+_pool_comparator = None
+
 
 class Base( ABC ):
     def __init__( self, log, cfg ):
@@ -160,18 +194,44 @@ class TestCaseBase( ABC ):
 
     @abstractmethod
     def run( self, bundle_name = 'John Doe' ):
-        self._log.info( 'Starting %s case against Golden Platform.' \
-                        % bundle_name )
-        self._rec_service.start( target = 'GP' )
-        self._gen_service.start( target = 'GP' )
-        self._rec_service.stop( target = 'GP' )
-
-        self._log.info( ( 'Starting %s case against ' + \
-                          'Platform Under Test.' ) \
-                        % bundle_name )
-        self._rec_service.start( target = 'PUT' )
-        self._gen_service.start( target = 'PUT' )
-        self._rec_service.stop( target = 'PUT' )
+        golden = None
+        key = None
+        concurrent = False
+        # The host filters set for a concurrent run are part of
+        # the golden cache key.
+        if get_test_run_mode() == 'concurrent':
+            concurrent = self.__separate_targets()
+        cache_cfg = get_golden_cache_cfg()
+        if cache_cfg is not None:
+            golden = GoldenCache( self._log, cache_cfg )
+            gen_gp = self._gen_service.get_target_service( 'GP' )
+            rec_gp = self._rec_service.get_target_service( 'GP' )
+            key = golden.get_key( gen_gp.get_cfg(), rec_gp.get_cfg() )
+        if golden is not None and golden.restore( key, rec_gp ):
+            self._log.info( ( 'Golden Platform capture of the %s ' + \
+                              'case taken from the golden cache.' ) \
+                            % bundle_name )
+            concurrent = False
+        else:
+            if concurrent:
+                self._log.info( ( 'Starting %s case against Golden ' + \
+                                  'Platform and Platform Under ' + \
+                                  'Test concurrently.' ) \
+                                % bundle_name )
+                self.__run_concurrently( ( 'GP', 'PUT' ) )
+            else:
+                self._log.info( ( 'Starting %s case against ' + \
+                                  'Golden Platform.' ) \
+                                % bundle_name )
+                self.__run_target( 'GP' )
+            if golden is not None:
+                golden.store( key, gen_gp.get_cfg(), rec_gp )
+
+        if not concurrent:
+            self._log.info( ( 'Starting %s case against ' + \
+                              'Platform Under Test.' ) \
+                            % bundle_name )
+            self.__run_target( 'PUT' )
 
         self._log.info( 'Setting up comparator configuration' )
         if self._rec_service is not None:
@@ -196,81 +256,105 @@ class TestCaseBase( ABC ):
         self._cmp_service.stop()
 
 
+    # Records the target while its generator runs. The errors
+    # are collected if a list is given, for the threads of the
+    # concurrent run.
+    def __run_target( self, target, errors = None ):
+        try:
+            self._rec_service.start( target = target )
+            self._gen_service.start( target = target )
+            self._rec_service.stop( target = target )
+        except ( Exception, ) as e:
+            if errors is None:
+                raise
+            errors.append( e )
+
+
+    def __run_concurrently( self, targets ):
+        errors = []
+        threads = [ threading.Thread( target = self.__run_target,
+                                      args = ( x, errors ),
+                                      name = 'run-%s' % ( x, ) ) \
+                    for x in targets ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if len( errors ) > 0:
+            raise errors[ 0 ]
+
+
+    # Checks that the recordings of the GP and the PUT do not
+    # capture each other's traffic if they run at the same time.
+    # Interfaces recorded for both targets are restricted to the
+    # address of the target. Returns False if the traffic can
+    # not be kept apart, the host filters are not set then.
+    def __separate_targets( self ):
+        gp_ip = self._gen_service.get_target_service( 'GP' ) \
+                .get_cfg().get_platform_cfg().get_ip()
+        put_ip = self._gen_service.get_target_service( 'PUT' ) \
+                 .get_cfg().get_platform_cfg().get_ip()
+        gp_ifs = self._rec_service.get_target_service( 'GP' ) \
+                 .get_cfg().get_rec_ifs()
+        put_ifs = self._rec_service.get_target_service( 'PUT' ) \
+                  .get_cfg().get_rec_ifs()
+        shared = set( x.get_if_name() for x in gp_ifs ) & \
+                 set( x.get_if_name() for x in put_ifs )
+        if len( shared ) > 0:
+            if not gp_ip or not put_ip or gp_ip == put_ip:
+                self._log.warning( ( 'The GP and the PUT are both ' +
+                    'recorded on %s and can not be told apart by ' +
+                    'their addresses ( %s, %s ). Running ' +
+                    'sequentially.' ) % ( ', '.join( sorted( shared ) ),
+                                          gp_ip, put_ip ) )
+                return False
+        for ( rec_ifs, ip ) in ( ( gp_ifs, gp_ip ), ( put_ifs, put_ip ) ):
+            for rec_if in rec_ifs:
+                if rec_if.get_if_name() in shared:
+                    rec_if.set_host_filter( ip )
+                else:
+                    rec_if.set_host_filter( None )
+        return True
+
+
 
 class Generator( DiffTestComponentBase ):
     def __init__( self, log, cfg ):
         super().__init__( log, cfg )
-        self.__proc = None
+        self.__pid = None
 
 
+    # Runs the generator command until it ends by itself or its
+    # execution time is over. The sub process is supervised by
+    # the generator controller of this process.
     @abstractmethod
     def start( self ):
         cmd = self._cfg.get_gen_cmd()
         p_stdout = self._cfg.get_gen_stdout()
         p_stderr = self._cfg.get_gen_stderr()
-        self.__proc = sp.Popen( cmd, stdout = p_stdout,
-                                stderr = p_stderr )
-        if self._cfg.get_exec_time() == 0:
-            self.__proc.wait()
+        exec_time = self._cfg.get_exec_time()
+        if exec_time == 0:
+            deadline = None
+        elif exec_time is not None and exec_time > 0:
+            deadline = exec_time
         else:
-            if self._cfg.get_exec_time() > 0:
-                time.sleep( self._cfg.get_exec_time() )
-            else:
-                self._log.warning( 'Invalid process execution time. ' +
-                                   'Aborting here ...' )
-            self.__proc = self.__vanish_proc( signum = sig.SIGTERM )
+            self._log.warning( 'Invalid process execution time. ' +
+                               'Aborting here ...' )
+            deadline = 0
+        if self._cfg.get_setns():
+            cmd = get_nsenter_cmd( cmd )
+        ctl = get_generator_controller()
+        self.__pid = ctl.launch( cmd, self._log, deadline = deadline,
+                                 stdout = p_stdout, stderr = p_stderr )
+        ctl.wait( self.__pid )
 
 
     @abstractmethod
     def stop( self ):
-        self.__proc = self.__vanish_proc( signum = sig.SIGTERM )
-        if self.__proc is not None:
-            # trying to kill it.
-            self.__proc = self.__vanish_proc( signum = sig.SIGKILL )
-
-        if self.__proc is not None:
-            self._log.warning( 'Failed to vanish the sub process.' )
-
-
-    def __vanish_proc( self, signum = sig.SIGTERM ):
-        fn = None
-        ret_val = None
-
-        if self.__proc is None:
+        if self.__pid is None:
             self._log.error( 'Process was not created.' )
-            return ret_val
-
-        if self.__proc.poll() is not None:
-            self._log.info( ( 'Sub process already finished ' +
-                              'with return code %d' )
-                              % self.__proc.returncode )
-            return ret_val
-
-        if signum == sig.SIGTERM:
-            fn = self.__proc.terminate
-        elif signum == sig.SIGKILL:
-            fn = self.__proc.kill
-        else:
-            self._log.error( 'Abort method not available.' )
-            ret_val = self.__proc
-            return ret_val
-
-        if fn is not None:
-            fn()
-
-        try:
-            # timeout value is in seconds [s]
-            self.__proc.wait( timeout = 10 )
-            if abs( self.__proc.returncode ) != signum:
-                self._log.warning( 'Did not get expected ' +
-                                   'return code ' +
-                                   'after sub process abortion ...' )
-        except sp.TimeoutExpired:
-            self._log.error( 'Timeout during sub process ' +
-                             'abortion. Sub process still going ...' )
-            ret_val = self.__proc
-
-        return ret_val
+            return
+        get_generator_controller().stop( [ self.__pid ] )
 
 
 
@@ -280,7 +364,13 @@ class Recorder( DiffTestComponentBase ):
 
         self.__sniffers = []
         self.__packets = []
+        self.__writers = []
+        self.__sockets = []
+        self.__linktypes = []
         self.__recording = False
+        # Time of the last captured frame of all the interfaces,
+        # time.monotonic() based.
+        self.__last_frame = None
 
         self.__scapy_cfg()
 
@@ -297,23 +387,58 @@ class Recorder( DiffTestComponentBase ):
             prn_fn = None
             be_quiet = True
         rec_ifs = self._cfg.get_rec_ifs()
+        started = []
+        self.__last_frame = time.monotonic()
         for rec_if in rec_ifs:
-            snf = AsyncSniffer(
-                count = 0,
-                store = 1,
-                prn = prn_fn,
-                filter = rec_if.get_filter_expr(),
-                quiet = be_quiet,
-                timeout = None,
-                stop_filter = None,
-                iface = rec_if.get_if_name(),
-                started_callback = None
-                )
+            ( sock, linktype ) = self.__open_socket( rec_if )
+            wr = None
+            if self._cfg.get_rec_mode() == 'stream':
+                wr = PcapStreamWriter(
+                    self.get_pcap_filename( rec_if ),
+                    queue_size = self._cfg.get_queue_size(),
+                    batch_size = self._cfg.get_batch_size(),
+                    linktype = linktype )
+                wr.start()
+            snf_prn = self.__get_prn( wr, prn_fn )
+            started.append( threading.Event() )
+            if sock is None:
+                snf = AsyncSniffer(
+                    count = 0,
+                    store = int( wr is None ),
+                    prn = snf_prn,
+                    filter = self.__get_filter_expr( rec_if ),
+                    quiet = be_quiet,
+                    timeout = None,
+                    stop_filter = None,
+                    iface = rec_if.get_if_name(),
+                    started_callback = started[ -1 ].set
+                    )
+            else:
+                # The filter is already attached to the socket.
+                snf = AsyncSniffer(
+                    count = 0,
+                    store = int( wr is None ),
+                    prn = snf_prn,
+                    quiet = be_quiet,
+                    timeout = None,
+                    stop_filter = None,
+                    opened_socket = sock,
+                    started_callback = started[ -1 ].set
+                    )
+            self.__sockets.append( sock )
+            self.__linktypes.append( linktype )
             self.__sniffers.append( snf )
+            self.__writers.append( wr )
             snf.start()
             snf = None
-        # Give tcpdump a little time to start recording.
-        time.sleep( 1 )
+        # Wait until all the sniffers capture.
+        deadline = time.monotonic() + SNIFFER_START_TIMEOUT
+        for ( event, rec_if ) in zip( started, rec_ifs ):
+            if not event.wait( max( 0, deadline - time.monotonic() ) ):
+                self._log.warning( ( 'Sniffer on %s did not start ' +
+                                     'within %d s.' ) % \
+                                   ( rec_if.get_if_name(),
+                                     SNIFFER_START_TIMEOUT ) )
         self.__recording = True
 
 
@@ -322,25 +447,105 @@ class Recorder( DiffTestComponentBase ):
         if not self.__recording:
             self._log.info( 'Recording already stopped.' )
             return
-        time.sleep( self._cfg.get_pause_before_stop() )
+        self.__wait_for_idle_link()
         for sniffer in self.__sniffers:
             pkts = sniffer.stop( join = True )
             self.__packets.append( pkts )
-        for ( pkts, rec_if ) in \
-            zip( self.__packets, self._cfg.get_rec_ifs() ):
-            if_name = rec_if.get_if_name()
-            wr_path = rec_if.get_wr_path()
-            target_str = rec_if.get_target_str()
-            filename = ( wr_path + os.path.sep + if_name + '_' + \
-                         target_str + '.pcap' )
+        for sock in self.__sockets:
+            if sock is not None:
+                sock.close()
+        for ( pkts, wr, linktype, rec_if ) in \
+            zip( self.__packets, self.__writers, self.__linktypes,
+                 self._cfg.get_rec_ifs() ):
+            filename = self.get_pcap_filename( rec_if )
             rec_if.set_pcap_path( filename )
-            wrpcap( filename, pkts, sync = True )
+            if wr is None:
+                wrpcap( filename, pkts, sync = True,
+                        linktype = linktype )
+            else:
+                # Only the tail of the capture is left to flush.
+                wr.close()
+                if wr.get_error() is not None:
+                    self._log.error( 'Writing %s failed: %s' % \
+                                     ( filename,
+                                       str( wr.get_error() ) ) )
+                self._log.debug( '%d packets written to %s' % \
+                                 ( wr.get_count(), filename ) )
             os.chmod( filename, 0o666 )
         del self.__packets[ : ]
         del self.__sniffers[ : ]
+        del self.__writers[ : ]
+        del self.__sockets[ : ]
+        del self.__linktypes[ : ]
         self.__recording = False
 
 
+    def get_pcap_filename( self, rec_if ):
+        if_name = rec_if.get_if_name()
+        wr_path = rec_if.get_wr_path()
+        target_str = rec_if.get_target_str()
+        filename = ( wr_path + os.path.sep + if_name + '_' + \
+                     target_str + '.pcap' )
+        return filename
+
+
+    # In raw capture mode the socket is opened here and its
+    # link layer class is replaced by the raw layer. That way
+    # the sniffer hands over raw frames with timestamps and
+    # does not dissect anything. The original link type is
+    # kept for the pcap file header.
+    def __open_socket( self, rec_if ):
+        if not self._cfg.get_raw_capture():
+            return ( None, None )
+        sock = conf.L2listen( iface = rec_if.get_if_name(),
+                              filter = self.__get_filter_expr( rec_if ) )
+        linktype = conf.l2types.layer2num.get( sock.LL, DLT_EN10MB )
+        sock.LL = conf.raw_layer
+        return ( sock, linktype )
+
+
+    # The filter expression, restricted to the host
+    # filter address of the interface if there is one.
+    def __get_filter_expr( self, rec_if ):
+        filter_expr = rec_if.get_filter_expr()
+        host = rec_if.get_host_filter()
+        if host is None:
+            return filter_expr
+        if filter_expr is None or filter_expr.strip() == '':
+            return ( 'host %s' % ( host, ) )
+        return ( '( %s ) and host %s' % ( filter_expr, host ) )
+
+
+    # Waits until no frame was captured for the idle timeout,
+    # at most for the pause before stop. Without idle timeout
+    # the whole pause is waited.
+    def __wait_for_idle_link( self ):
+        pause = self._cfg.get_pause_before_stop()
+        idle_timeout = self._cfg.get_idle_timeout()
+        if idle_timeout <= 0:
+            time.sleep( pause )
+            return
+        deadline = time.monotonic() + pause
+        while True:
+            now = time.monotonic()
+            idle_end = self.__last_frame + idle_timeout
+            if now >= idle_end or now >= deadline:
+                break
+            time.sleep( min( idle_end, deadline ) - now )
+
+
+    # Sniffer callback. Notes the time of the frame, in stream
+    # mode the packets are handed over to the writer thread.
+    def __get_prn( self, writer, prn_fn ):
+        def prn( pkt ):
+            self.__last_frame = time.monotonic()
+            if writer is not None:
+                writer.put( pkt )
+            if prn_fn is not None:
+                return prn_fn( pkt )
+        return prn
+
+
     # scapy configuration
     def __scapy_cfg( self, socket_layer = 2 ):
         conf.use_pcap = True
@@ -366,7 +571,19 @@ class Platform( DiffTestComponentBase ):
 class Comparator( DiffTestComparatorBase ):
     def __init__( self, log, cfg ):
         super().__init__( log, cfg )
-        self.__rptlog = None
+        self.__stop_layer = None
+        self.__verdict = None
+        self.__engine = None
+        self.__plan = None
+        self.__normaliser = None
+        self.__budget = CmpBudget()
+        self.__result_store = None
+        # Context of the current capture pair, chunk or flow
+        # (see engines.py).
+        self.__ctx = self.__get_ctx( None, None )
+        # ( expected units, actual units, expected times,
+        #   actual times ) of the flow comparison.
+        self.__flow_data = None
 
 
     @abstractmethod
@@ -380,54 +597,304 @@ class Comparator( DiffTestComparatorBase ):
         pcap_pairs = self._cfg.get_cmp_pair_pcap_locations()
         rpt_locations = self._cfg.get_cmp_rpt_locations()
         assert( len( pcap_pairs ) == len( rpt_locations ) )
-        for ( rpt_loc, pcap_locs ) in zip( rpt_locations, pcap_pairs ):
-            self.__rptlog = get_report_logger( rpt_loc,
-                also_stdout = True )
-            exp_pkts = rdpcap( pcap_locs[ 0 ] )
-            act_pkts = rdpcap( pcap_locs[ 1 ] )
-            empty = False
-            if len( exp_pkts ) == 0:
-                self.__rptlog.info( 'Expected packet list is empty.' )
-                empty = True
-            if len( act_pkts ) == 0:
-                self.__rptlog.info( 'Actual packet list is empty.' )
-                empty = True
-            if empty:
-                self.__rptlog.error( 'Not doing any comparison.' )
-                log_ascii_fail( self.__rptlog.error )
-                return
-            if len( exp_pkts ) != len( act_pkts ):
-                self.__rptlog.info( 'Expected and actual captures ' +
-                    'differ in length. Nevertheless trying to make ' +
-                    'a comparison ...' )
-            self._cmp( exp_pkts, act_pkts )
+        self.__stop_layer = None
+        # The comparator entries are complete after the setup of
+        # the derived comparator, compile them once right here.
+        self.__engine = select_engine( self._cfg.get_engine(),
+                                       self._log )
+        self.__plan = None
+        if uses_plan( self.__engine ):
+            self.__plan = compile_cmp_plan(
+                self._cfg.get_cmp_entries() )
+        if self._cfg.get_lazy_dissect():
+            self.__stop_layer = find_stop_layer(
+                [ e.get_scapy_type() \
+                  for e in self._cfg.get_cmp_entries() ] )
+            self._log.info( 'Lazy dissection, stopping after ' +
+                            'layer: %s' % str( self.__stop_layer ) )
+        self.__budget = CmpBudget( self._cfg.get_max_mismatches(),
+                                   self._cfg.get_max_cmp_time(),
+                                   self._cfg.get_stop_on_timing() )
+        self.__ctx = self.__get_ctx( None, None )
+        self.__result_store = None
+        if self._cfg.get_results_db() is not None:
+            self.__result_store = ResultStore(
+                self._cfg.get_results_db() )
+        self.__normaliser = None
+        if len( self._cfg.get_normalise_rules() ) > 0:
+            self.__normaliser = Normaliser(
+                self._cfg.get_normalise_rules() )
+            self._log.info( 'Normalising the captures: %s' % \
+                            ', '.join( self.__normaliser.get_rules() ) )
+        if self.__is_whole_capture() and \
+           ( self._cfg.get_read_mode() == 'stream' or
+             self._cfg.get_chunk_size() > 0 ):
+            self._log.warning( 'The captures are preprocessed or ' +
+                               'normalised, using the list read mode.' )
+        pairs = list( zip( rpt_locations, pcap_pairs ) )
+        workers = self.__get_num_workers( len( pairs ) )
+        # In chunked mode and in flow match mode the workers are
+        # used for the chunks or flows of a single pair, the pairs
+        # are compared one by one.
+        if workers > 1 and self._cfg.get_chunk_size() == 0 and \
+           self._cfg.get_match_mode() != 'flow':
+            verdicts = self.__cmp_pairs_parallel( pairs, workers )
+        else:
+            verdicts = [ self._cmp_pair( rpt_loc, pcap_locs ) \
+                         for ( rpt_loc, pcap_locs ) in pairs ]
+        self.__verdict = all( verdicts )
+        if self.__verdict:
+            self._log.info( 'All %d capture pairs passed.' % \
+                            len( verdicts ) )
+        else:
+            self._log.error( '%d of %d capture pairs failed.' % \
+                             ( verdicts.count( False ),
+                               len( verdicts ) ) )
+
+
+    # Compares a single capture pair and writes the report into
+    # the report location of this pair. Returns the verdict.
+    def _cmp_pair( self, rpt_loc, pcap_locs ):
+        rptlog = get_report_logger( rpt_loc, also_stdout = True )
+        self.__budget.start()
+        results = None
+        if self.__result_store is not None:
+            results = []
+        self.__ctx = self.__get_ctx( rptlog, results )
+        try:
+            verdict = self.__cmp_pcap_pair( pcap_locs )
+            if self.__result_store is not None:
+                self.__result_store.add_pair( rpt_loc, pcap_locs,
+                                              verdict, results )
+            return verdict
+        finally:
+            tear_down_report_logger( rptlog )
+            self.__ctx = self.__get_ctx( None, None )
+
+
+    def __cmp_pcap_pair( self, pcap_locs ):
+        if self._cfg.get_chunk_size() > 0 and \
+           not self.__is_whole_capture():
+            return self.__cmp_pcap_chunked( pcap_locs )
+        if self._cfg.get_read_mode() == 'stream' and \
+           not self.__is_whole_capture():
+            return self.__cmp_pcap_stream( pcap_locs )
+        exp_pkts = self.__get_golden_model( pcap_locs[ 0 ] )
+        if exp_pkts is None:
+            exp_pkts = self.__read_pkts( pcap_locs[ 0 ] )
+        act_pkts = self.__read_pkts( pcap_locs[ 1 ] )
+        if not self.__chk_not_empty( len( exp_pkts ),
+                                     len( act_pkts ) ):
+            return False
+        if len( exp_pkts ) != len( act_pkts ):
+            self.__log_len_differ()
+        return self._cmp( exp_pkts, act_pkts )
+
+
+    # Compares the packets start to end - 1 of a capture pair
+    # and checks the inter packet times which start within this
+    # range. The report messages are buffered and returned in
+    # the order: comparison, GP timing, PUT timing. The budget
+    # and the results of the chunk are returned as well, None
+    # if the budget was exhausted before the chunk started.
+    def _cmp_chunk( self, pcap_locs, start, end, offsets, nums ):
+        if self.__ctx.get_budget().is_exhausted():
+            return None
+        pair_ctx = self.__ctx
+        ( log, records ) = get_buffer_logger()
+        self.__ctx = pair_ctx.fork( log )
+        try:
+            pkts = []
+            for ( loc, offset, num ) in zip( pcap_locs, offsets, nums ):
+                # One packet more for the inter packet time
+                # across the chunk border.
+                cnt = max( 0, min( ( end + 1 ), num ) - start )
+                if offset is None:
+                    pkts.append( [] )
+                else:
+                    pkts.append( list( iter_pcap_range(
+                        loc, offset, cnt, self.__stop_layer ) ) )
+            # The timing check runs first with stop_on_timing,
+            # see _cmp.
+            time_chk = None
+            if self.__ctx.get_budget().stops_on_timing():
+                time_chk = self.__chk_chunk_times( pkts, start,
+                                                   records )
+            del records[ : ]
+            num_cmp = ( end - start )
+            cmp_fn = get_positional_cmp_fn( self.__engine )
+            cmp_ok = cmp_fn( self.__ctx, pkts[ 0 ][ : num_cmp ],
+                             pkts[ 1 ][ : num_cmp ],
+                             first_idx = ( start + 1 ) )
+            chunk_records = [ records[ : ] ]
+            if time_chk is None:
+                time_chk = self.__chk_chunk_times( pkts, start,
+                                                   records )
+            ( time_ok, time_records ) = time_chk
+            return ( cmp_ok, time_ok, ( chunk_records + time_records ),
+                     self.__ctx.get_budget(), self.__ctx.get_results() )
+        finally:
+            tear_down_report_logger( log )
+            self.__ctx = pair_ctx
+
+
+    # Checks the inter packet times of both sides of a chunk.
+    # Returns the results and the buffered report messages of
+    # both sides.
+    def __chk_chunk_times( self, pkts, start, records ):
+        time_ok = []
+        time_records = []
+        for ( d, tr, p ) in zip( ( 'GP', 'PUT' ),
+                                 self.__get_time_ranges(), pkts ):
+            del records[ : ]
+            if tr is not None:
+                time_ok.append( chk_pkt_times( self.__ctx, d, tr,
+                    [ x.time for x in p ], first_idx = ( start + 1 ) ) )
+            else:
+                time_ok.append( True )
+            time_records.append( records[ : ] )
+        return ( time_ok, time_records )
+
+
+    # Compares the units of a single flow and checks the inter
+    # packet times of its packets. The flow is given by the unit
+    # and packet indices of both captures. The report messages
+    # are buffered and returned, together with the budget and
+    # the results of the flow, None if the budget was exhausted
+    # before the flow started.
+    def _cmp_flow( self, key, a_idxs, b_idxs, a_timed_idxs,
+                   b_timed_idxs ):
+        if self.__ctx.get_budget().is_exhausted():
+            return None
+        pair_ctx = self.__ctx
+        flow_str = format_flow_key( key )
+        ( log, records ) = get_buffer_logger()
+        self.__ctx = pair_ctx.fork( log )
+        try:
+            ( a, b, _, _ ) = self.__flow_data
+            # The timing check runs first with stop_on_timing,
+            # see _cmp.
+            time_chk = None
+            if self.__ctx.get_budget().stops_on_timing():
+                time_chk = self.__chk_flow_times( flow_str, a_timed_idxs,
+                                                  b_timed_idxs )
+            cmp_ok = cmp_flow_units( self.__ctx, key, a, b, a_idxs,
+                                     b_idxs )
+            if time_chk is None:
+                time_chk = self.__chk_flow_times( flow_str, a_timed_idxs,
+                                                  b_timed_idxs )
+            return ( ( cmp_ok and time_chk ), records[ : ],
+                     self.__ctx.get_budget(), self.__ctx.get_results() )
+        finally:
+            tear_down_report_logger( log )
+            self.__ctx = pair_ctx
+
+
+    # Checks the inter packet times of both sides of a flow,
+    # given by the packet indices of the timed packets.
+    def __chk_flow_times( self, flow_str, a_timed_idxs, b_timed_idxs ):
+        ( _, _, a_times, b_times ) = self.__flow_data
+        time_chk = True
+        for ( d, tr, times, idxs ) in zip( ( 'GP', 'PUT' ),
+                                           self.__get_time_ranges(),
+                                           ( a_times, b_times ),
+                                           ( a_timed_idxs,
+                                             b_timed_idxs ) ):
+            if tr is not None and len( idxs ) > 0:
+                self.__ctx.get_log().debug( ( 'Flow %s: checking ' +
+                                              'the packet times on ' +
+                                              '%s' ) % ( flow_str, d ) )
+                time_chk = chk_pkt_times( self.__ctx, d, tr,
+                    [ times[ i ] for i in idxs ],
+                    pkt_idxs = idxs ) and time_chk
+        return time_chk
+
+
+    def get_verdict( self ):
+        return self.__verdict
 
 
     @abstractmethod
     def stop( self ):
         self._log.info( 'Stopping comparator.' )
-        if self.__rptlog is not None:
-            tear_down_report_logger( self.__rptlog )
-            self.__rptlog = None
+        if self.__ctx.get_log() is not None:
+            tear_down_report_logger( self.__ctx.get_log() )
+            self.__ctx = self.__get_ctx( None, None )
 
 
     def _cmp( self, a, b ):
-        # Wireshark packet number starting at 1. :-/
-        idx_gen = range( 1, ( len( a ) + 1 ) )
-        cmp_res = [ self._eq( idx, c, d ) \
-                    for ( idx, c, d ) in zip( idx_gen, a, b ) ]
-        time_chk = self.__process_time_ranges( a, b )
-        if all( cmp_res ) and time_chk:
-            self.__rptlog.info( 'ooooooo All packet comparisons ' +
-                'were successful. ooooooo' )
-            log_pass( self.__rptlog.info )
-        else:
-            self.__rptlog.error( 'fffffff Not all packet ' +
-                'comparisons were successful. fffffff' )
-            log_ascii_fail( self.__rptlog.error )
+        ( a_units, a_timed ) = self._preprocess( a )
+        ( b_units, b_timed ) = self._preprocess( b )
+        if self._cfg.get_match_mode() == 'flow':
+            return self.__log_verdict( self.__cmp_flows(
+                a_units, b_units, a_timed, b_timed ) )
+        # With stop_on_timing the timing check runs first, so a
+        # timing violation saves the comparison of the packets.
+        time_chk = None
+        if self.__ctx.get_budget().stops_on_timing():
+            time_chk = self.__process_time_ranges(
+                get_pkt_times( a_timed ), get_pkt_times( b_timed ) )
+        cmp_fn = get_match_cmp_fn( self._cfg.get_match_mode(),
+                                   self.__engine,
+                                   self._cfg.get_match_window() )
+        cmp_ok = cmp_fn( self.__ctx, a_units, b_units )
+        if time_chk is None:
+            time_chk = self.__process_time_ranges(
+                get_pkt_times( a_timed ), get_pkt_times( b_timed ) )
+        return self.__log_verdict( cmp_ok and time_chk )
+
+
+    # Turns a capture into the units which are compared (with
+    # _eq) and the packets which are timing checked. Derived
+    # comparators may compare e.g. reassembled messages instead
+    # of single packets. Preprocessing requires the list read
+    # mode, the captures are needed as a whole.
+    def _preprocess( self, pkts ):
+        return ( pkts, pkts )
+
+
+    # Streaming variant of _cmp. Only the currently compared
+    # packet pair is held in memory. The timing check is done
+    # in a second pass which reads the timestamps only, it is
+    # the first pass with stop_on_timing (see _cmp).
+    def _cmp_stream( self, a, b, a_times, b_times ):
+        time_chk = None
+        if self.__ctx.get_budget().stops_on_timing():
+            time_chk = self.__process_time_ranges( a_times, b_times )
+        ( cmp_ok, num_a, num_b ) = cmp_streamed( self.__ctx, a, b )
+        if num_a != num_b:
+            self.__log_len_differ()
+            self.__ctx.get_log().info( ( 'Expected packets: %d, ' + \
+                                         'actual packets: %d' ) % \
+                                       ( num_a, num_b ) )
+        if time_chk is None:
+            time_chk = self.__process_time_ranges( a_times, b_times )
+        return self.__log_verdict( cmp_ok and time_chk )
+
+
+    # Projection of a packet onto the fields of the comparator
+    # entries. Two packets with equal projections are equal as
+    # far as the default compare function is concerned.
+    def _project( self, pkt ):
+        if self.__plan is not None:
+            return self.__plan.project( pkt )
+        proj = []
+        for entry in self._cfg.get_cmp_entries():
+            scpy_type = entry.get_scapy_type()
+            if scpy_type in pkt:
+                layer = pkt[ scpy_type ]
+                proj.append( tuple( [ x( layer ) for x in \
+                                      entry.get_field_getters() ] ) )
+            else:
+                proj.append( None )
+        return tuple( proj )
 
 
     def _eq( self, idx, a, b ):
+        rptlog = self.__ctx.get_log()
+        if self.__plan is not None:
+            return self.__plan.eq( rptlog, idx, a, b,
+                                   self.__ctx.get_results() )
         ret_val = False
         cmp_entries = self._cfg.get_cmp_entries()
         cmp_merge = []
@@ -439,101 +906,347 @@ class Comparator( DiffTestComparatorBase ):
             if cmp_fn is None:
                 cmp_fn = self.__field_cmp_fn
             if scpy_type in a and scpy_type in b:
-                cmp = [ cmp_fn( self.__rptlog, idx,
+                cmp = [ cmp_fn( rptlog, idx,
                                 x( a[ scpy_type ] ),
                                 x( b[ scpy_type ] ) ) \
                     for x in field_get_fns ]
                 # list concatenation
                 cmp_merge += cmp
+                for ( k, ( x, ok ) ) in enumerate( zip( field_get_fns,
+                                                        cmp ) ):
+                    if not ok:
+                        self.__ctx.add_result( 'field', idx,
+                            get_field_label( scpy_type, x, k ),
+                            x( a[ scpy_type ] ), x( b[ scpy_type ] ) )
             else:
-                if scpy_type in a != scpy_type in b:
+                if ( scpy_type in a ) != ( scpy_type in b ):
                     pkt_mismatch = True
-                    self.__rptlog.error( str( scpy_type ) +
-                        ' is not present in packet a AND packet b.' )
+                    rptlog.error( '%s is not present in ' +
+                        'packet a AND packet b.', scpy_type )
+                    self.__ctx.add_result( 'layer', idx,
+                        scpy_type.__name__, scpy_type in a,
+                        scpy_type in b )
         if all( cmp_merge ) and not pkt_mismatch:
             ret_val = True
         return ret_val
 
 
+    # Comparison context of a capture pair, see engines.py.
+    def __get_ctx( self, rptlog, results ):
+        return CmpContext( rptlog, self.__budget, results, self._eq,
+                           self.__project_all, self.__plan )
+
+
+    # The golden model of the expected capture, compiled on first
+    # use. Only the columnar engine makes use of the precompiled
+    # columns, None otherwise.
+    def __get_golden_model( self, pcap_loc ):
+        model_path = self._cfg.get_golden_model_path()
+        if model_path is None or self.__engine != 'columnar' or \
+           self._cfg.get_match_mode() != 'positional' or \
+           self.__is_whole_capture():
+            return None
+        key = get_model_key( pcap_loc,
+            [ type( self ).__module__ + '.' + type( self ).__qualname__,
+              self.__plan.get_signature() ] )
+        model = load_golden_model( model_path, key, pcap_loc,
+                                   self.__stop_layer )
+        if model is None:
+            self._log.info( 'Compiling the golden model of %s' % \
+                            ( pcap_loc, ) )
+            pkts = LazyPacketList( pcap_loc, self.__stop_layer )
+            layout = [ len( x[ 1 ] ) for x in self.__plan.get_entries() ]
+            save_golden_model( model_path, key, pcap_loc,
+                extract_columns( self.__project_all( pkts ), layout ),
+                pkts.get_times() )
+            model = load_golden_model( model_path, key, pcap_loc,
+                                       self.__stop_layer )
+        return model
+
+    def __is_preprocessing( self ):
+        return type( self )._preprocess is not Comparator._preprocess
+
+
+    # Preprocessing and normalisation work on whole captures
+    # in memory.
+    def __is_whole_capture( self ):
+        return self.__is_preprocessing() or \
+               self.__normaliser is not None
+
+
+    # Reads a capture as a whole. The raw frames are normalised
+    # before any packet is dissected.
+    def __read_pkts( self, pcap_loc ):
+        if self.__normaliser is None:
+            if self._cfg.get_lazy_dissect():
+                return LazyPacketList( pcap_loc, self.__stop_layer )
+            return rdpcap( pcap_loc )
+        pkts = LazyPacketList( pcap_loc, self.__stop_layer )
+        pkts.set_frames( self.__normaliser.normalise_frames(
+            pkts.get_frames() ) )
+        if not self._cfg.get_lazy_dissect():
+            pkts = list( pkts )
+        return pkts
+
+
+    # Projections of the first num packets. The packets of lazy
+    # packet lists are projected from their raw frames if all
+    # the field getters are raw fields, only the frames with an
+    # unsupported layout are dissected.
+    def __project_all( self, pkts, num = None ):
+        if self.__plan is None or not self.__plan.is_raw() or \
+           not isinstance( pkts, LazyPacketList ) or \
+           pkts.get_ll_cls() is not Ether or \
+           type( self )._project is not Comparator._project:
+            return [ self._project( x ) for x in \
+                     itt.islice( pkts, num ) ]
+        projs = []
+        for ( i, frame ) in enumerate( itt.islice( pkts.get_frames(),
+                                                   num ) ):
+            proj = self.__plan.project_raw( frame )
+            if proj is None:
+                proj = self._project( pkts[ i ] )
+            projs.append( proj )
+        return projs
+
+
+    # Both captures are indexed by flow, the flows are compared
+    # and timing checked independently of each other. Thereby
+    # concurrent flows may interleave differently on the GP and
+    # the PUT. The flows are spread across the workers.
+    def __cmp_flows( self, a, b, a_timed, b_timed ):
+        rptlog = self.__ctx.get_log()
+        ( jobs, num_exp, num_act ) = get_flow_jobs(
+            a, b, a_timed, b_timed, self._cfg.get_target_ips() )
+        workers = self.__get_num_workers( len( jobs ) )
+        rptlog.info( ( 'Comparing %d flows ( %d expected, %d actual ) ' +
+                       'with %d worker processes.' ) % \
+                     ( len( jobs ), num_exp, num_act, workers ) )
+        for ( d, tr ) in zip( ( 'GP', 'PUT' ),
+                              self.__get_time_ranges() ):
+            if tr is None:
+                rptlog.info( ( 'No timing values present ' +
+                               'for target: %s' ) % ( d, ) )
+            else:
+                rptlog.info( ( 'Timing ranges to check for ' +
+                               '%s: ' % ( d, ) ) + str( tr ) )
+        self.__flow_data = ( a, b, list( get_pkt_times( a_timed ) ),
+                             list( get_pkt_times( b_timed ) ) )
+        try:
+            if workers > 1:
+                results = self.__run_pool( _cmp_flow_worker, jobs,
+                                           workers, share_budget = True )
+            else:
+                results = self.__run_jobs( self._cmp_flow, jobs )
+        finally:
+            self.__flow_data = None
+        for ( _, flow_records, _, _ ) in results:
+            for ( lvl, msg ) in flow_records:
+                rptlog.log( lvl, msg )
+        return all( [ r[ 0 ] for r in results ] )
+
+
+    def __cmp_pcap_stream( self, pcap_locs ):
+        ( exp_first, exp_pkts ) = peek(
+            iter_pcap( pcap_locs[ 0 ], self.__stop_layer ) )
+        ( act_first, act_pkts ) = peek(
+            iter_pcap( pcap_locs[ 1 ], self.__stop_layer ) )
+        if not self.__chk_not_empty( int( exp_first is not None ),
+                                     int( act_first is not None ) ):
+            return False
+        return self._cmp_stream( exp_pkts, act_pkts,
+                                 iter_pcap_times( pcap_locs[ 0 ] ),
+                                 iter_pcap_times( pcap_locs[ 1 ] ) )
+
+
+    # A single capture pair is split into chunks of packets.
+    # The chunks are compared by worker processes which read
+    # their packet range directly from the pcap files. The
+    # report messages of the chunks are merged in order.
+    def __cmp_pcap_chunked( self, pcap_locs ):
+        rptlog = self.__ctx.get_log()
+        chunk_size = self._cfg.get_chunk_size()
+        ( nums, offsets ) = zip( *[ index_pcap( loc, chunk_size ) \
+                                    for loc in pcap_locs ] )
+        if not self.__chk_not_empty( nums[ 0 ], nums[ 1 ] ):
+            return False
+        if nums[ 0 ] != nums[ 1 ]:
+            self.__log_len_differ()
+        chunks = []
+        for ( k, start ) in enumerate(
+            range( 0, max( nums ), chunk_size ) ):
+            offs = tuple( [ o[ k ] if k < len( o ) else None \
+                            for o in offsets ] )
+            chunks.append( ( pcap_locs, start,
+                             min( ( start + chunk_size ), min( nums ) ),
+                             offs, nums ) )
+        workers = self.__get_num_workers( len( chunks ) )
+        rptlog.info( ( 'Comparing %d chunks of %d packets ' +
+                       'with %d worker processes.' ) % \
+                     ( len( chunks ), chunk_size, workers ) )
+        if workers > 1:
+            results = self.__run_pool( _cmp_chunk_worker, chunks,
+                                       workers, share_budget = True )
+        else:
+            results = self.__run_jobs( self._cmp_chunk, chunks )
+        for ( _, _, chunk_records, _, _ ) in results:
+            for ( lvl, msg ) in chunk_records[ 0 ]:
+                rptlog.log( lvl, msg )
+        cmp_ok = all( [ r[ 0 ] for r in results ] )
+        time_chk = True
+        for ( side, ( d, tr ) ) in enumerate(
+            zip( ( 'GP', 'PUT' ), self.__get_time_ranges() ) ):
+            if tr is None:
+                rptlog.info( ( 'No timing values present ' +
+                               'for target: %s' ) % ( d, ) )
+                continue
+            rptlog.info( ( 'Timing ranges to check for %s: ' % \
+                           ( d, ) ) + str( tr ) )
+            for ( _, time_ok, chunk_records, _, _ ) in results:
+                for ( lvl, msg ) in chunk_records[ side + 1 ]:
+                    rptlog.log( lvl, msg )
+                time_chk = time_chk and time_ok[ side ]
+        return self.__log_verdict( cmp_ok and time_chk )
+
+
+    # Runs the jobs one by one until the budget is exhausted.
+    # The budget and the results of each job (the last two
+    # elements of its return value) are merged.
+    def __run_jobs( self, job_fn, jobs ):
+        results = []
+        for job in jobs:
+            if self.__ctx.get_budget().is_exhausted():
+                break
+            results.append( job_fn( *job ) )
+            self.__ctx.merge( results[ -1 ][ -2 ],
+                              results[ -1 ][ -1 ] )
+        return results
+
+
+    def __get_num_workers( self, num_jobs ):
+        workers = self._cfg.get_workers()
+        if workers == 0:
+            workers = os.cpu_count()
+        return max( 1, min( workers, num_jobs ) )
+
+
+    # The chunks and flows of a pair (share_budget) count their
+    # mismatches against the budget of the pair, in all the
+    # workers at the same time. The jobs which start after the
+    # budget is exhausted are skipped, as in __run_jobs. Workers
+    # which find a mismatch at the same time may pass the limit
+    # by one packet each at most. The budgets and the results of
+    # the jobs are merged then (see __run_jobs).
+    def __run_pool( self, worker_fn, jobs, workers,
+                    share_budget = False ):
+        global _pool_comparator
+        _pool_comparator = self
+        mp_ctx = mp.get_context( 'fork' )
+        budget = self.__ctx.get_budget()
+        if share_budget:
+            budget.share( mp_ctx.Value( 'l', 0 ) )
+        try:
+            with mp_ctx.Pool( processes = workers ) as pool:
+                results = pool.starmap( worker_fn, jobs )
+        finally:
+            _pool_comparator = None
+            budget.share( None )
+        if not share_budget:
+            return results
+        done = [ r for r in results if r is not None ]
+        for r in done:
+            self.__ctx.merge( r[ -2 ], r[ -1 ] )
+        if len( done ) < len( results ):
+            # Records why the skipped jobs were skipped.
+            budget.is_exhausted()
+        return done
+
+
+    # The capture pairs are compared in forked worker processes.
+    # Each worker has its own copy of the comparator and thereby
+    # its own report logger. Only the verdicts are sent back.
+    def __cmp_pairs_parallel( self, pairs, workers ):
+        self._log.info( ( 'Comparing %d capture pairs with %d ' + \
+                          'worker processes.' ) % \
+                        ( len( pairs ), workers ) )
+        return self.__run_pool( _cmp_pair_worker, pairs, workers )
+
+
+    def __chk_not_empty( self, num_exp, num_act ):
+        rptlog = self.__ctx.get_log()
+        empty = False
+        if num_exp == 0:
+            rptlog.info( 'Expected packet list is empty.' )
+            empty = True
+        if num_act == 0:
+            rptlog.info( 'Actual packet list is empty.' )
+            empty = True
+        if empty:
+            rptlog.error( 'Not doing any comparison.' )
+            log_ascii_fail( rptlog.error )
+        return not empty
+
+
+    def __log_len_differ( self ):
+        self.__ctx.get_log().info( 'Expected and actual captures ' +
+            'differ in length. Nevertheless trying to make ' +
+            'a comparison ...' )
+
+
+    def __log_verdict( self, passed ):
+        rptlog = self.__ctx.get_log()
+        summary = self.__ctx.get_budget().get_summary()
+        if summary is not None:
+            rptlog.error( summary )
+            passed = False
+        if passed:
+            rptlog.info( 'ooooooo All packet comparisons ' +
+                'were successful. ooooooo' )
+            log_pass( rptlog.info )
+        else:
+            rptlog.error( 'fffffff Not all packet ' +
+                'comparisons were successful. fffffff' )
+            log_ascii_fail( rptlog.error )
+        return passed
+
+
     # This is the default packet compare function
     # which is used if the comparator entry has no
     # specific compare function defined.
     def __field_cmp_fn( self, log, idx, a, b ):
         ret_val = ( a == b )
         if not ret_val:
-            exp = str( a )
-            act = str( b )
-            log.error( ( 'Packet number %4d: ' + \
-                         'Expected value: %s, ' + \
-                         'actual value: %s' ) % \
-                         ( idx, exp, act ) )
+            log.error( 'Packet number %4d: ' + \
+                       'Expected value: %s, ' + \
+                       'actual value: %s', idx, a, b )
         return ret_val
 
 
-    def __process_time_ranges( self, exp_pkts, act_pkts ):
-        time_ranges_gp = self._cfg.get_inter_pkt_times_gp()
-        time_ranges_put = self._cfg.get_inter_pkt_times_put()
-        descrs = ( 'GP', 'PUT' )
-        trs = ( time_ranges_gp, time_ranges_put )
-        pkts = ( exp_pkts, act_pkts )
-        assert( len( descrs ) == len( trs ) == len( pkts ) )
-        results = []
-        for ( d, tr, p ) in zip( descrs, trs, pkts ):
-            if tr is not None:
-                self.__rptlog.info( ( 'Timing ranges to check ' +
-                                      'for %s: ' % ( d, ) ) +
-                                    str( tr ) )
-                res = self.__chk_pkt_times( d, tr, p )
-                results.append( res )
-            else:
-                self.__rptlog.info( ( 'No timing values present ' +
-                                      'for target: %s' ) % ( d, ) )
-                results.append( True )
-        return all( results )
-
-
-    def __chk_pkt_times( self, d, tr, p ):
-        sigma_times = 3
-        num_pkt = len( p )
-        num_tr = len( tr )
-        mult = ( ( num_pkt // num_tr ) + 1 )
-        tr_ext = tr * mult
-        idx_gen = range( 1, ( len( p ) + 1 ) )
-        results = []
-        for ( idx, a, b, ( mu, sigma ) ) in \
-            zip( idx_gen, p[ 0 : ], p[ 1 : ], tr_ext ):
-            diff = float( b.time - a.time )
-            self.__rptlog.debug( ( 'Between packet %4d and %4d ' +
-                                   '( %s ):' ) % \
-                                 ( idx, ( idx + 1 ), d ) )
-            self.__rptlog.debug( 'diff : %f s' % diff )
-            self.__rptlog.debug( 'mu   : %f s' % mu )
-            self.__rptlog.debug( 'sigma: %f s' % sigma )
-            left = ( mu - ( sigma_times * sigma ) ) \
-                   if ( mu - ( sigma_times * sigma ) ) >= 0.0 \
-                   else 0.0
-            right = ( mu + ( sigma_times * sigma ) )
-            self.__rptlog.debug( ( 'Expected range: ' + \
-                                   '[ %f, ..., %f ] s' ) % \
-                                   ( left, right ) )
-            if diff >= left and diff <= right:
-                self.__rptlog.debug( ( 'Inter packet time in range ' + \
-                                       'between packet %4d and %4d' ) \
-                                       % ( idx, ( idx + 1 ) ) )
-                results.append( True )
-            else:
-                self.__rptlog.error( ( 'Timing violation on %s ' + \
-                                       'between packet ' + \
-                                       '%4d and %4d' ) % \
-                                       ( d, idx, ( idx + 1 ) ) )
-                self.__rptlog.error( ( 'Expected range: ' + \
-                                       '[ %f, ..., %f ] s' ) % \
-                                       ( left, right ) )
-                self.__rptlog.error( 'Actual value: %f s' % diff )
-                results.append( False )
-        self.__rptlog.debug( 'Packet times check: %s' % \
-                             ( str( all( results ) ), ) )
-        return all( results )
+    # ( GP, PUT ) inter packet time ranges, None if not checked.
+    def __get_time_ranges( self ):
+        return ( self._cfg.get_inter_pkt_times_gp(),
+                 self._cfg.get_inter_pkt_times_put() )
+
+
+    def __process_time_ranges( self, exp_times, act_times ):
+        return chk_time_ranges( self.__ctx, self.__get_time_ranges(),
+                                exp_times, act_times )
+
+
+
+def _cmp_pair_worker( rpt_loc, pcap_locs ):
+    return _pool_comparator._cmp_pair( rpt_loc, pcap_locs )
+
+
+def _cmp_chunk_worker( pcap_locs, start, end, offsets, nums ):
+    return _pool_comparator._cmp_chunk( pcap_locs, start, end,
+                                        offsets, nums )
+
+
+def _cmp_flow_worker( key, a_idxs, b_idxs, a_timed_idxs,
+                      b_timed_idxs ):
+    return _pool_comparator._cmp_flow( key, a_idxs, b_idxs,
+                                       a_timed_idxs, b_timed_idxs )
 
 
 
@@ -560,6 +1273,10 @@ class AggregServiceBundle( DiffTestComponentBase ):
         return self._sub_services
 
 
+    def get_target_service( self, target ):
+        return self.__get_service( target )
+
+
     def _validate( self, bundle_name ):
         self._log.info( 'Installed the %s service.' % bundle_name )
 
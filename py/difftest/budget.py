@@ -0,0 +1,186 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         budget.py
+
+
+    Purpose:      This module contains
+                  the comparison budget.
+                  A comparison stops early
+                  after a number of
+                  mismatching packets, the
+                  first timing violation or
+                  a time limit.
+
+
+    Remarks:      - A comparison which stopped
+                    early never passes.
+
+                  - Chunks and flows compared
+                    by workers get a budget of
+                    their own (see fork), which
+                    is merged back afterwards.
+                    The worker processes share
+                    the mismatch count (see
+                    share), the limit holds
+                    across all the workers.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import time
+
+
+class CmpBudget( object ):
+    def __init__( self, max_mismatches = 0, max_time = 0,
+                  stop_on_timing = False ):
+        # 0 means no limit, the unit of the time is seconds [s].
+        self.__max_mismatches = max_mismatches
+        self.__max_time = max_time
+        self.__stop_on_timing = stop_on_timing
+        self.__deadline = None
+        self.__mismatches = 0
+        # Highest packet number compared so far.
+        self.__progress = 0
+        self.__reason = None
+        # Mismatch count shared with the worker processes,
+        # a multiprocessing Value.
+        self.__shared = None
+
+
+    # Resets the budget at the start of a comparison.
+    def start( self ):
+        self.__deadline = None
+        if self.__max_time > 0:
+            self.__deadline = time.monotonic() + self.__max_time
+        self.__mismatches = 0
+        self.__progress = 0
+        self.__reason = None
+
+
+    # Returns a budget with the remaining mismatches
+    # and the same deadline.
+    def fork( self ):
+        budget = CmpBudget( self.__max_mismatches, self.__max_time,
+                            self.__stop_on_timing )
+        budget.__deadline = self.__deadline
+        budget.__shared = self.__shared
+        if self.__max_mismatches > 0 and self.__shared is None:
+            budget.__max_mismatches = max( 1, ( self.__max_mismatches -
+                                                self.__mismatches ) )
+        return budget
+
+
+    # Shares the mismatch count with the budgets forked from this
+    # one, across forked worker processes too. counter is a
+    # multiprocessing Value, None ends the sharing.
+    def share( self, counter ):
+        if counter is not None:
+            counter.value = self.__mismatches
+        self.__shared = counter
+
+
+    # The shared counter stays with the process, it is
+    # passed on by fork only.
+    def __getstate__( self ):
+        state = self.__dict__.copy()
+        state[ '_CmpBudget__shared' ] = None
+        return state
+
+
+    def merge( self, budget ):
+        self.__mismatches += budget.__mismatches
+        self.__progress = max( self.__progress, budget.__progress )
+        if self.__reason is None:
+            self.__reason = budget.__reason
+
+
+    def add_result( self, idx, ok ):
+        self.__progress = max( self.__progress, idx )
+        if not ok:
+            self.__mismatches += 1
+            if self.__shared is not None:
+                with self.__shared.get_lock():
+                    self.__shared.value += 1
+
+
+    # idx is the packet number of the first violation.
+    def add_timing_result( self, ok, idx = None ):
+        if not ok and self.__stop_on_timing and self.__reason is None:
+            self.__reason = 'timing violation'
+            if idx is not None:
+                self.__reason += ' at packet number %d' % ( idx, )
+
+
+    def stops_on_timing( self ):
+        return self.__stop_on_timing
+
+
+    # To be asked before more packets are compared only: the
+    # comparison counts as stopped early from here on, unlike
+    # a comparison which reached a limit with its last packet.
+    def is_exhausted( self ):
+        self.__chk_mismatches()
+        if self.__reason is None and self.__deadline is not None and \
+           time.monotonic() > self.__deadline:
+            self.__reason = 'time limit of %g s reached' % \
+                            ( self.__max_time, )
+        return self.__reason is not None
+
+
+    # True if the comparison stopped early.
+    def is_stopped( self ):
+        return self.__reason is not None
+
+
+    # None if the comparison did not stop early.
+    def get_summary( self ):
+        if self.__reason is None:
+            return None
+        return ( 'Comparison stopped early ( %s ) after packet ' +
+                 'number %d, %d mismatching packets up to ' +
+                 'there.' ) % ( self.__reason, self.__progress,
+                                self.__mismatches )
+
+
+    def __chk_mismatches( self ):
+        mismatches = self.__mismatches
+        if self.__shared is not None:
+            mismatches = self.__shared.value
+        if self.__reason is None and self.__max_mismatches > 0 and \
+           mismatches >= self.__max_mismatches:
+            self.__reason = ( 'limit of %d mismatching packets ' +
+                              'reached' ) % ( self.__max_mismatches, )
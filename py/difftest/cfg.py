@@ -63,6 +63,9 @@ class GeneratorCfg( object ):
         self.__gen_cmd      = gen_cmd
         self.__stdout       = stdout
         self.__stderr       = stderr
+        # Run 'ip netns exec <name>' prefixed commands with
+        # nsenter instead of the ip command.
+        self.__setns        = False
 
 
     def get_gen_if( self ):
@@ -89,6 +92,10 @@ class GeneratorCfg( object ):
         return self.__stderr
 
 
+    def get_setns( self ):
+        return self.__setns
+
+
     def set_gen_cmd( self, gen_cmd ):
         self.__gen_cmd = gen_cmd
 
@@ -97,6 +104,10 @@ class GeneratorCfg( object ):
         self.__exec_time = exec_time
 
 
+    def set_setns( self, setns ):
+        self.__setns = setns
+
+
 
 class RecInterfaceCfg( object ):
     def __init__( self, if_name, target_str, wr_path,
@@ -108,6 +119,10 @@ class RecInterfaceCfg( object ):
         self.__socket_layer = socket_layer
         self.__filter_expr  = filter_expr
         self.__pcap_path    = None
+        # Address the capture is restricted to in addition to the
+        # filter expression, None captures the filter expression
+        # as is. Set by the concurrent run mode.
+        self.__host_filter  = None
 
 
     def get_if_name( self ):
@@ -134,6 +149,10 @@ class RecInterfaceCfg( object ):
         return self.__pcap_path
 
 
+    def get_host_filter( self ):
+        return self.__host_filter
+
+
     def set_wr_path( self, wr_path ):
         self.__wr_path = wr_path
 
@@ -146,12 +165,29 @@ class RecInterfaceCfg( object ):
         self.__pcap_path = pcap_path
 
 
+    def set_host_filter( self, host_filter ):
+        self.__host_filter = host_filter
+
+
 
 class RecorderCfg( object ):
     def __init__( self, rec_ifs,
                   pause_before_stop ):
         self.__rec_ifs           = rec_ifs
         self.__pause_before_stop = pause_before_stop
+        # 'memory' keeps all the packets until the recording
+        # stops, 'stream' appends them to the pcap file during
+        # the recording.
+        self.__rec_mode          = 'memory'
+        self.__queue_size        = 10000
+        self.__batch_size        = 256
+        # Store the raw frames and timestamps only, no dissection
+        # during the recording.
+        self.__raw_capture       = False
+        # The recording stops as soon as no frame was captured
+        # for this time, the pause before stop is the upper
+        # bound. 0 waits for the whole pause. Unit is seconds [s].
+        self.__idle_timeout      = 0
 
 
     def get_rec_ifs( self ):
@@ -162,6 +198,26 @@ class RecorderCfg( object ):
         return self.__pause_before_stop
 
 
+    def get_rec_mode( self ):
+        return self.__rec_mode
+
+
+    def get_queue_size( self ):
+        return self.__queue_size
+
+
+    def get_batch_size( self ):
+        return self.__batch_size
+
+
+    def get_raw_capture( self ):
+        return self.__raw_capture
+
+
+    def get_idle_timeout( self ):
+        return self.__idle_timeout
+
+
     def set_rec_ifs( self, rec_ifs ):
         self.__rec_ifs = rec_ifs
 
@@ -170,6 +226,26 @@ class RecorderCfg( object ):
         self.__pause_before_stop = pause_before_stop
 
 
+    def set_rec_mode( self, rec_mode ):
+        self.__rec_mode = rec_mode
+
+
+    def set_queue_size( self, queue_size ):
+        self.__queue_size = queue_size
+
+
+    def set_batch_size( self, batch_size ):
+        self.__batch_size = batch_size
+
+
+    def set_raw_capture( self, raw_capture ):
+        self.__raw_capture = raw_capture
+
+
+    def set_idle_timeout( self, idle_timeout ):
+        self.__idle_timeout = idle_timeout
+
+
 
 class ComparatorEntry( object ):
     def __init__( self, scapy_type, field_getters,
@@ -202,6 +278,51 @@ class CmpCfg( object ):
         self.__cmp_entries = []
         self.__inter_pkt_times_gp = None
         self.__inter_pkt_times_put = None
+        # 'list' reads the whole captures into memory,
+        # 'stream' walks both captures packet by packet.
+        self.__read_mode = 'list'
+        # Dissect the packets on access only, and only up to
+        # the layers which are referenced by the cmp entries.
+        self.__lazy_dissect = False
+        # 'positional' compares the packets in capture order,
+        # 'align' aligns the captures like a text diff first,
+        # 'flow' compares the captures flow by flow, 'window'
+        # matches equal packets within a time window.
+        self.__match_mode = 'positional'
+        # Time window of the window match mode. Unit is
+        # seconds [s].
+        self.__match_window = 0.1
+        # Number of worker processes, 0 means one per CPU.
+        self.__workers = 1
+        # Number of packets per chunk of a single capture pair,
+        # 0 disables the chunked comparison.
+        self.__chunk_size = 0
+        # 'interpreted' walks the comparator entries for every
+        # packet pair, 'plan' compiles them once beforehand,
+        # 'columnar' compares NumPy columns of the fields and
+        # 'fingerprint' compares digests of the fields.
+        self.__engine = 'plan'
+        # Directory of the precompiled golden models,
+        # None disables the golden models.
+        self.__golden_model_path = None
+        # Addresses of the GP and the PUT, ( GP, PUT ). Both are
+        # mapped to the same role in the flow match mode.
+        self.__target_ips = ( None, None )
+        # Normalisation rules applied to the raw frames of both
+        # captures before the comparison, e.g. [ 'IP.id',
+        # 'chksum', 'tcp_seq' ]. Empty disables it.
+        self.__normalise_rules = []
+        # The comparison of a capture pair stops after this number
+        # of mismatching packets, 0 means no limit.
+        self.__max_mismatches = 0
+        # Time limit of the comparison of a capture pair, 0 means
+        # no limit. Unit is seconds [s].
+        self.__max_cmp_time = 0
+        # Stop the comparison at the first timing violation.
+        self.__stop_on_timing = False
+        # SQLite database of the structured comparison results,
+        # None disables it.
+        self.__results_db = None
 
 
     def get_cmp_pair_pcap_locations( self ):
@@ -224,6 +345,62 @@ class CmpCfg( object ):
         return self.__inter_pkt_times_put
 
 
+    def get_read_mode( self ):
+        return self.__read_mode
+
+
+    def get_lazy_dissect( self ):
+        return self.__lazy_dissect
+
+
+    def get_match_mode( self ):
+        return self.__match_mode
+
+
+    def get_match_window( self ):
+        return self.__match_window
+
+
+    def get_workers( self ):
+        return self.__workers
+
+
+    def get_chunk_size( self ):
+        return self.__chunk_size
+
+
+    def get_engine( self ):
+        return self.__engine
+
+
+    def get_golden_model_path( self ):
+        return self.__golden_model_path
+
+
+    def get_target_ips( self ):
+        return self.__target_ips
+
+
+    def get_normalise_rules( self ):
+        return self.__normalise_rules
+
+
+    def get_max_mismatches( self ):
+        return self.__max_mismatches
+
+
+    def get_max_cmp_time( self ):
+        return self.__max_cmp_time
+
+
+    def get_stop_on_timing( self ):
+        return self.__stop_on_timing
+
+
+    def get_results_db( self ):
+        return self.__results_db
+
+
     def add_cmp_entry( self, cmp_entry ):
         self.__cmp_entries.append( cmp_entry )
 
@@ -244,6 +421,62 @@ class CmpCfg( object ):
         self.__inter_pkt_times_put = inter_pkt_times_put
 
 
+    def set_read_mode( self, read_mode ):
+        self.__read_mode = read_mode
+
+
+    def set_lazy_dissect( self, lazy_dissect ):
+        self.__lazy_dissect = lazy_dissect
+
+
+    def set_match_mode( self, match_mode ):
+        self.__match_mode = match_mode
+
+
+    def set_match_window( self, match_window ):
+        self.__match_window = match_window
+
+
+    def set_workers( self, workers ):
+        self.__workers = workers
+
+
+    def set_chunk_size( self, chunk_size ):
+        self.__chunk_size = chunk_size
+
+
+    def set_engine( self, engine ):
+        self.__engine = engine
+
+
+    def set_golden_model_path( self, golden_model_path ):
+        self.__golden_model_path = golden_model_path
+
+
+    def set_target_ips( self, target_ips ):
+        self.__target_ips = target_ips
+
+
+    def set_normalise_rules( self, normalise_rules ):
+        self.__normalise_rules = normalise_rules
+
+
+    def set_max_mismatches( self, max_mismatches ):
+        self.__max_mismatches = max_mismatches
+
+
+    def set_max_cmp_time( self, max_cmp_time ):
+        self.__max_cmp_time = max_cmp_time
+
+
+    def set_stop_on_timing( self, stop_on_timing ):
+        self.__stop_on_timing = stop_on_timing
+
+
+    def set_results_db( self, results_db ):
+        self.__results_db = results_db
+
+
 
 class PlatformCfg( object ):
     def __init__( self, ip, netmask,
@@ -269,3 +502,30 @@ class PlatformCfg( object ):
     def get_port( self ):
         return self.__port
 
+
+
+
+class GoldenCacheCfg( object ):
+    def __init__( self, path, version_tag ):
+        # Directory of the cached Golden Platform captures.
+        self.__path        = path
+        # User supplied tag, part of the cache key. A new tag
+        # invalidates all the cached captures (e.g. after a
+        # change of the Golden Platform).
+        self.__version_tag = version_tag
+
+
+    def get_path( self ):
+        return self.__path
+
+
+    def get_version_tag( self ):
+        return self.__version_tag
+
+
+    def set_path( self, path ):
+        self.__path = path
+
+
+    def set_version_tag( self, version_tag ):
+        self.__version_tag = version_tag
@@ -0,0 +1,151 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         columnar.py
+
+
+    Purpose:      This module contains
+                  the columnar packet
+                  comparison. The fields
+                  of the comparator entries
+                  are extracted into NumPy
+                  columns in a single pass
+                  per capture, the columns
+                  of both captures are then
+                  compared as a whole.
+
+
+    Remarks:      - NumPy is optional. Without
+                    NumPy the columnar engine
+                    is not available.
+
+                  - Only the rows which differ
+                    are reported, this is done
+                    from the packets again.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+from difftest.model import GoldenModel
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+NUMPY_AVAILABLE = np is not None
+
+
+# Extracts the columns of a sequence of packet projections
+# (see Comparator._project). The layout holds the number
+# of fields for each comparator entry. Returns a presence
+# column per entry and a value column per entry field.
+def extract_columns( projs, layout ):
+    num = len( projs )
+    presence = []
+    values = []
+    per_entry = zip( *projs ) if num > 0 else [ () ] * len( layout )
+    for ( fields, num_fields ) in zip( per_entry, layout ):
+        presence.append( np.fromiter( ( x is not None for x in fields ),
+                                      dtype = bool, count = num ) )
+        values.append( [ to_column( [ None if x is None else x[ f ] \
+                                      for x in fields ] ) \
+                         for f in range( num_fields ) ] )
+    return ( presence, values )
+
+
+# Integer fields end up in a native integer column, all
+# other fields (strings, lists, flags, ...) in an object
+# column which is compared element by element.
+def to_column( values ):
+    if all( [ type( x ) is int for x in values ] ):
+        try:
+            return np.array( values, dtype = np.int64 )
+        except OverflowError:
+            pass
+    col = np.empty( len( values ), dtype = object )
+    for ( i, x ) in enumerate( values ):
+        col[ i ] = x
+    return col
+
+
+# Returns the indices of the rows which have to be compared
+# packet by packet. These are the rows with differing fields
+# or layers and the rows with present layers of the entries
+# which have a specific compare function.
+def find_mismatch_rows( cols_a, cols_b, specific ):
+    ( presence_a, values_a ) = cols_a
+    ( presence_b, values_b ) = cols_b
+    num = min( [ len( x ) for x in presence_a + presence_b ],
+               default = 0 )
+    mask = np.zeros( num, dtype = bool )
+    for ( pa, pb, va, vb, spec ) in zip( presence_a, presence_b,
+                                         values_a, values_b,
+                                         specific ):
+        pa = pa[ : num ]
+        pb = pb[ : num ]
+        mask |= ( pa != pb )
+        both = pa & pb
+        if spec:
+            mask |= both
+            continue
+        for ( ca, cb ) in zip( va, vb ):
+            ( ca, cb ) = ( ca[ : num ], cb[ : num ] )
+            if ca.dtype != cb.dtype:
+                ( ca, cb ) = ( ca.astype( object ), cb.astype( object ) )
+            mask |= both & ( ca != cb )
+    return np.flatnonzero( mask ).tolist()
+
+
+# The fields of both captures are extracted into columns and
+# compared as a whole. Only the differing rows are compared
+# (and reported) packet by packet again. The columns of a
+# golden model are precompiled.
+def cmp_columnar( ctx, a, b, first_idx = 1 ):
+    num = min( len( a ), len( b ) )
+    plan_entries = ctx.get_plan().get_entries()
+    layout = [ len( x[ 1 ] ) for x in plan_entries ]
+    specific = [ x[ 2 ] is not None for x in plan_entries ]
+    cols = [ pkts.get_columns() if isinstance( pkts, GoldenModel ) \
+             else extract_columns( ctx.project_all( pkts, num ),
+                                   layout ) \
+             for pkts in ( a, b ) ]
+    rows = find_mismatch_rows( cols[ 0 ], cols[ 1 ], specific )
+    ctx.get_log().debug( ( '%d of %d packet pairs differ in the ' +
+                           'columnar comparison.' ) % \
+                         ( len( rows ), num ) )
+    return ctx.cmp_pairs( ( ( first_idx + i ), a[ i ], b[ i ] ) \
+                          for i in rows )
@@ -0,0 +1,278 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         engines.py
+
+
+    Purpose:      This module contains
+                  the selection of the
+                  comparison engine and
+                  of the match mode, and
+                  the comparison context
+                  which the engines work
+                  on. The comparator only
+                  reads the captures and
+                  drives the engines.
+
+
+    Remarks:      - The engines are functions
+                    fn( ctx, a, b ) of the
+                    comparison context and the
+                    expected and actual units,
+                    the positional engines take
+                    the packet number of the
+                    first pair as well (chunks).
+
+                  - The flow match mode is
+                    driven by the comparator,
+                    the flows are compared
+                    positionally (see flows.py).
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import functools
+import itertools as itt
+from difftest.results import make_result
+from difftest.align import cmp_aligned
+from difftest.window import cmp_windowed
+from difftest.columnar import cmp_columnar, NUMPY_AVAILABLE
+from difftest.fingerprint import cmp_fingerprinted
+from difftest.model import GoldenModel
+from difftest.pcapio import LazyPacketList
+
+
+# Engines which compile the comparator entries into a plan.
+PLAN_ENGINES = ( 'plan', 'columnar', 'fingerprint' )
+
+
+# The engine which is actually used, the columnar engine
+# needs NumPy.
+def select_engine( engine, log ):
+    if engine == 'columnar' and not NUMPY_AVAILABLE:
+        log.warning( 'NumPy is not available, using the plan ' +
+                     'engine instead of the columnar engine.' )
+        return 'plan'
+    return engine
+
+
+def uses_plan( engine ):
+    return engine in PLAN_ENGINES
+
+
+# Returns the engine fn( ctx, a, b, first_idx = 1 ) which
+# compares the packets in capture order. The interpreted and
+# the plan engine differ in the packet compare function only
+# (see Comparator._eq).
+def get_positional_cmp_fn( engine ):
+    if engine == 'columnar':
+        return cmp_columnar
+    if engine == 'fingerprint':
+        return cmp_fingerprinted
+    return cmp_positional
+
+
+# Returns the engine fn( ctx, a, b ) of a match mode other
+# than flow.
+def get_match_cmp_fn( match_mode, engine, match_window ):
+    if match_mode == 'align':
+        return cmp_aligned
+    if match_mode == 'window':
+        return functools.partial( cmp_windowed,
+                                  window = match_window )
+    return get_positional_cmp_fn( engine )
+
+
+def cmp_positional( ctx, a, b, first_idx = 1 ):
+    # Wireshark packet number starting at 1. :-/
+    idx_gen = range( first_idx, ( first_idx + len( a ) ) )
+    return ctx.cmp_pairs( zip( idx_gen, a, b ) )
+
+
+# Compares two packet iterables pair by pair, only the current
+# pair is held in memory. Returns ( comparison result, number
+# of expected packets, number of actual packets ), the packets
+# after an early stop are not counted.
+def cmp_streamed( ctx, a, b ):
+    idx = 0
+    cmp_ok = True
+    num_a = 0
+    num_b = 0
+    for ( c, d ) in itt.zip_longest( a, b ):
+        if ctx.get_budget().is_exhausted():
+            break
+        if c is not None:
+            num_a += 1
+        if d is not None:
+            num_b += 1
+        if c is None or d is None:
+            continue
+        idx += 1
+        if not ctx.eq( idx, c, d ):
+            cmp_ok = False
+    return ( cmp_ok, num_a, num_b )
+
+
+# Lazy packet lists and golden models hand out the
+# timestamps without dissecting the packets.
+def get_pkt_times( pkts ):
+    if isinstance( pkts, ( LazyPacketList, GoldenModel ) ):
+        return pkts.get_times()
+    return ( x.time for x in pkts )
+
+
+
+# State of the comparison of a capture pair, or of a chunk or
+# a flow of it: the report logger, the budget and the results
+# (None if they are not stored). The packet pairs are compared
+# with eq_fn( idx, a, b ), the packets are projected onto the
+# compared fields with project_fn( pkts, num ). Both default to
+# the plan.
+class CmpContext( object ):
+    def __init__( self, log, budget, results = None, eq_fn = None,
+                  project_fn = None, plan = None ):
+        self.__log = log
+        self.__budget = budget
+        self.__results = results
+        self.__eq_fn = eq_fn
+        self.__project_fn = project_fn
+        self.__plan = plan
+
+
+    def get_log( self ):
+        return self.__log
+
+
+    def get_budget( self ):
+        return self.__budget
+
+
+    def get_results( self ):
+        return self.__results
+
+
+    def get_plan( self ):
+        return self.__plan
+
+
+    # Context of a chunk or a flow with a budget of its own
+    # (see CmpBudget.fork), see merge.
+    def fork( self, log ):
+        return CmpContext( log, self.__budget.fork(),
+                           None if self.__results is None else [],
+                           self.__eq_fn, self.__project_fn,
+                           self.__plan )
+
+
+    # Merges the budget and the results of a forked context.
+    def merge( self, budget, results ):
+        self.__budget.merge( budget )
+        if self.__results is not None and results is not None:
+            self.__results += results
+
+
+    def add_result( self, kind, idx = None, field = None,
+                    expected = None, actual = None ):
+        if self.__results is not None:
+            self.__results.append( make_result( kind, idx, field,
+                                                expected, actual ) )
+
+
+    # eq_fn within the budget, the mismatches are counted.
+    def eq( self, idx, a, b ):
+        if self.__eq_fn is None:
+            ok = self.__plan.eq( self.__log, idx, a, b, self.__results )
+        else:
+            ok = self.__eq_fn( idx, a, b )
+        self.__budget.add_result( idx, ok )
+        return ok
+
+
+    # Compares ( packet number, a, b ) tuples until the budget
+    # is exhausted.
+    def cmp_pairs( self, pairs ):
+        cmp_ok = True
+        for ( idx, c, d ) in pairs:
+            if self.__budget.is_exhausted():
+                break
+            if not self.eq( idx, c, d ):
+                cmp_ok = False
+        return cmp_ok
+
+
+    # Reports the expected packets without a counterpart, until
+    # the budget is exhausted. The reason is appended to the
+    # message, the field of the results is None or the flow.
+    # Returns the number of reported packets.
+    def report_missing( self, idxs, reason, field = None ):
+        num = 0
+        for i in idxs:
+            if self.__budget.is_exhausted():
+                break
+            self.__log.error( 'Packet number %4d: Missing in ' +
+                'actual capture ( %s ).', ( i + 1 ), reason )
+            self.add_result( 'missing', ( i + 1 ), field = field )
+            self.__budget.add_result( ( i + 1 ), False )
+            num += 1
+        return num
+
+
+    # Reports the actual packets without a counterpart, see
+    # report_missing. The mismatches are counted at budget_idx.
+    def report_additional( self, idxs, reason, field = None,
+                           budget_idx = 0 ):
+        num = 0
+        for j in idxs:
+            if self.__budget.is_exhausted():
+                break
+            self.__log.error( 'Actual packet number %4d: Not in ' +
+                'expected capture ( %s ).', ( j + 1 ), reason )
+            self.add_result( 'additional', ( j + 1 ), field = field )
+            self.__budget.add_result( budget_idx, False )
+            num += 1
+        return num
+
+
+    # Projections of the first num packets.
+    def project_all( self, pkts, num = None ):
+        if self.__project_fn is None:
+            return [ self.__plan.project( x ) for x in \
+                     itt.islice( pkts, num ) ]
+        return self.__project_fn( pkts, num )
+
+
+    def get_times( self, pkts ):
+        return get_pkt_times( pkts )
@@ -0,0 +1,109 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         fingerprint.py
+
+
+    Purpose:      This module contains
+                  the packet fingerprints.
+                  A fingerprint is a short
+                  BLAKE2 digest of a packet
+                  projection, packets with
+                  equal fingerprints need no
+                  field by field comparison.
+
+
+    Remarks:      - The fingerprint covers the
+                    representation of the field
+                    values. Equal values with a
+                    different representation
+                    lead to a detailed comparison,
+                    which decides then.
+
+                  - Packets with present layers
+                    of entries which have a
+                    specific compare function get
+                    no fingerprint, they are
+                    always compared in detail.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import hashlib
+
+
+# Digest size in bytes.
+FINGERPRINT_SIZE = 8
+
+
+# Fingerprints of a sequence of packet projections (see
+# Comparator._project). Specific holds a flag per comparator
+# entry which is True if the entry has a specific compare
+# function. Returns a fingerprint (bytes) or None per packet.
+def get_fingerprints( projs, specific ):
+    spec_idxs = [ i for ( i, x ) in enumerate( specific ) if x ]
+    fps = []
+    for proj in projs:
+        if any( [ proj[ i ] is not None for i in spec_idxs ] ):
+            fps.append( None )
+            continue
+        fps.append( hashlib.blake2b( repr( proj ).encode(),
+            digest_size = FINGERPRINT_SIZE ).digest() )
+    return fps
+
+
+# Returns the indices of the packet pairs which have to be
+# compared field by field.
+def find_mismatch_fps( fps_a, fps_b ):
+    return [ i for ( i, ( x, y ) ) in enumerate( zip( fps_a, fps_b ) ) \
+             if x is None or x != y ]
+
+
+# The projections of both captures are hashed in bulk, only
+# the packet pairs with differing fingerprints are compared
+# (and reported) field by field.
+def cmp_fingerprinted( ctx, a, b, first_idx = 1 ):
+    num = min( len( a ), len( b ) )
+    specific = [ x[ 2 ] is not None for x in \
+                 ctx.get_plan().get_entries() ]
+    ( fps_a, fps_b ) = [ get_fingerprints(
+        ctx.project_all( pkts, num ), specific ) \
+        for pkts in ( a, b ) ]
+    rows = find_mismatch_fps( fps_a, fps_b )
+    ctx.get_log().debug( ( '%d of %d packet pairs differ in their ' +
+                           'fingerprints.' ) % ( len( rows ), num ) )
+    return ctx.cmp_pairs( ( ( first_idx + i ), a[ i ], b[ i ] ) \
+                          for i in rows )
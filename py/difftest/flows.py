@@ -0,0 +1,203 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         flows.py
+
+
+    Purpose:      This module contains
+                  the flow index of a
+                  capture. The packets are
+                  assigned to their flows
+                  by a hash table lookup of
+                  the normalised 5-tuple in
+                  a single pass.
+
+
+    Remarks:      - The address of the target
+                    platform (GP or PUT) is
+                    replaced by its role, so
+                    the flows of both captures
+                    share the same keys.
+
+                  - The ports of the other
+                    endpoint are ephemeral, the
+                    connections to the same
+                    service are numbered in the
+                    order of their first packet
+                    instead.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+from scapy.layers.inet import IP, TCP, UDP
+from scapy.layers.inet6 import IPv6
+
+
+ROLE_TARGET = 'target'
+# Flow of all the packets without an IP layer.
+FLOW_OTHER = ( 'other', )
+
+
+# Returns ( protocol, ( source address, source port ),
+# ( destination address, destination port ) ) of a packet,
+# None for packets without an IP layer. The ports of
+# protocols other than TCP and UDP are zero.
+def get_five_tuple( pkt ):
+    ip = pkt.getlayer( IP )
+    if ip is not None:
+        proto = ip.proto
+    else:
+        ip = pkt.getlayer( IPv6 )
+        if ip is None:
+            return None
+        proto = ip.nh
+    l4 = pkt.getlayer( TCP )
+    if l4 is None:
+        l4 = pkt.getlayer( UDP )
+    if l4 is None:
+        ports = ( 0, 0 )
+    else:
+        ports = ( l4.sport, l4.dport )
+    return ( proto, ( ip.src, ports[ 0 ] ), ( ip.dst, ports[ 1 ] ) )
+
+
+# Returns a dict flow key : list of packet indices, the flows
+# in the order of their first packet. Both directions of a
+# connection belong to the same flow.
+def index_flows( pkts, target_ip = None ):
+    flows = {}
+    # Direction independent 5-tuple : flow key
+    conn_keys = {}
+    # Connection counters per flow key without number
+    conn_nums = {}
+    for ( idx, pkt ) in enumerate( pkts ):
+        five_tuple = get_five_tuple( pkt )
+        if five_tuple is None:
+            key = FLOW_OTHER
+        else:
+            ( proto, src, dst ) = five_tuple
+            conn = ( proto, ) + tuple( sorted( ( src, dst ) ) )
+            key = conn_keys.get( conn )
+            if key is None:
+                key = _get_flow_base( proto, src, dst, target_ip )
+                num = conn_nums.get( key, 0 )
+                conn_nums[ key ] = ( num + 1 )
+                key = key + ( num, )
+                conn_keys[ conn ] = key
+        pkt_idxs = flows.get( key )
+        if pkt_idxs is None:
+            pkt_idxs = []
+            flows[ key ] = pkt_idxs
+        pkt_idxs.append( idx )
+    return flows
+
+
+# Returns the jobs of the flow match mode, one per flow key:
+# ( key, unit indices of a, unit indices of b, packet indices
+# of the timed packets of a and of b ), and the number of
+# expected and actual flows. The timed packets are the units
+# unless the captures are preprocessed.
+def get_flow_jobs( a, b, a_timed, b_timed, target_ips ):
+    ( ip_exp, ip_act ) = target_ips
+    flows = [ index_flows( a, ip_exp ), index_flows( b, ip_act ) ]
+    if a_timed is a and b_timed is b:
+        flows += flows
+    else:
+        flows += [ index_flows( a_timed, ip_exp ),
+                   index_flows( b_timed, ip_act ) ]
+    keys = {}
+    for f in flows:
+        keys.update( dict.fromkeys( f ) )
+    jobs = [ tuple( [ key ] + [ f.get( key, [] ) for f in flows ] ) \
+             for key in keys ]
+    return ( jobs, len( flows[ 0 ] ), len( flows[ 1 ] ) )
+
+
+# Compares the units of a single flow, given by their indices.
+# A flow which is missing on one side is reported as a whole,
+# the units left over in the longer flow count as mismatches
+# (as in the align match mode).
+def cmp_flow_units( ctx, key, a, b, a_idxs, b_idxs ):
+    log = ctx.get_log()
+    flow_str = format_flow_key( key )
+    if len( a_idxs ) == 0 and len( b_idxs ) > 0:
+        log.error( 'Flow %s: Not in expected capture ( %d units ).' % \
+                   ( flow_str, len( b_idxs ) ) )
+        ctx.add_result( 'additional', field = flow_str,
+                        actual = len( b_idxs ) )
+        return False
+    if len( a_idxs ) > 0 and len( b_idxs ) == 0:
+        log.error( 'Flow %s: Missing in actual capture ( %d units ).' % \
+                   ( flow_str, len( a_idxs ) ) )
+        ctx.add_result( 'missing', field = flow_str,
+                        expected = len( a_idxs ) )
+        return False
+    if len( a_idxs ) == 0:
+        return True
+    log.info( 'Flow %s: %d expected, %d actual units.' % \
+              ( flow_str, len( a_idxs ), len( b_idxs ) ) )
+    # The packet numbers are those of the captures.
+    cmp_ok = ctx.cmp_pairs( ( ( i + 1 ), a[ i ], b[ j ] ) \
+                            for ( i, j ) in zip( a_idxs, b_idxs ) )
+    num = min( len( a_idxs ), len( b_idxs ) )
+    reason = 'flow %s' % ( flow_str, )
+    if ctx.report_missing( a_idxs[ num : ], reason,
+                           field = flow_str ) > 0:
+        cmp_ok = False
+    if ctx.report_additional( b_idxs[ num : ], reason,
+                              field = flow_str ) > 0:
+        cmp_ok = False
+    return cmp_ok
+
+
+def format_flow_key( key ):
+    if key == FLOW_OTHER:
+        return 'non IP'
+    ( proto, addr_a, port_a, addr_b, num ) = key
+    return 'proto %d %s:%d <-> %s #%d' % \
+           ( proto, addr_a, port_a, addr_b, num )
+
+
+# ( protocol, target role, service port, other address ) if
+# the target platform is an endpoint of the connection,
+# ( protocol, lower address, 0, higher address ) otherwise.
+def _get_flow_base( proto, src, dst, target_ip ):
+    if dst[ 0 ] == target_ip:
+        return ( proto, ROLE_TARGET, dst[ 1 ], src[ 0 ] )
+    if src[ 0 ] == target_ip:
+        return ( proto, ROLE_TARGET, src[ 1 ], dst[ 0 ] )
+    ( addr_a, addr_b ) = sorted( ( src[ 0 ], dst[ 0 ] ) )
+    return ( proto, addr_a, 0, addr_b )
@@ -0,0 +1,243 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+
+    File:         genctl.py
+
+
+    Purpose:      This module contains
+                  the generator controller.
+                  The generator commands are
+                  run as asyncio sub processes
+                  on an event loop of their
+                  own, so many generators can
+                  be supervised at the same
+                  time.
+
+
+    Remarks:      - A generator with a deadline
+                    is terminated when the
+                    deadline expires, SIGKILL
+                    follows if SIGTERM does not
+                    end it in time.
+
+                  - Every generator runs in a
+                    process group of its own,
+                    the signals are sent to the
+                    whole group. Sub processes
+                    of the generator command
+                    (e.g. of a shell) end with
+                    it.
+
+                  - Output which is not
+                    redirected is read line by
+                    line and logged, it never
+                    blocks the generator.
+
+                  - The event loop runs in a
+                    daemon thread, the methods
+                    of the controller may be
+                    called from any thread.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import os
+import asyncio
+import threading
+import signal as sig
+
+
+# Time a sub process gets to end after a signal.
+# Unit is seconds [s].
+TERM_TIMEOUT = 10
+# Time the output of an ended sub process is read on.
+# Unit is seconds [s].
+DRAIN_TIMEOUT = 1
+
+# Controller of this process, see get_generator_controller.
+_controller = None
+_controller_lock = threading.Lock()
+
+
+def get_generator_controller():
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = GeneratorController()
+    return _controller
+
+
+
+class GeneratorController( object ):
+    def __init__( self, term_timeout = TERM_TIMEOUT ):
+        self.__term_timeout = term_timeout
+        # pid : ( process, log, supervision task )
+        self.__procs = {}
+        self.__loop = asyncio.new_event_loop()
+        self.__thread = threading.Thread(
+            target = self.__loop.run_forever,
+            name = 'gen-controller', daemon = True )
+        self.__thread.start()
+
+
+    def get_term_timeout( self ):
+        return self.__term_timeout
+
+
+    # Starts a generator command. The process is terminated after
+    # deadline seconds, None lets it run until it ends by itself.
+    # stdout and stderr None log the output, everything else is
+    # passed to the sub process (e.g. a file or DEVNULL).
+    # Returns the pid of the process.
+    def launch( self, cmd, log, deadline = None,
+                stdout = None, stderr = None ):
+        return self.__call( self.__launch( cmd, log, deadline,
+                                           stdout, stderr ) )
+
+
+    # Blocks until the process ended or was ended at its deadline.
+    # Returns the return code, None if the process has ended and
+    # was forgotten before.
+    def wait( self, pid ):
+        return self.__call( self.__wait( pid ) )
+
+
+    # Ends the processes, all of them at the same time.
+    def stop( self, pids ):
+        self.__call( self.__stop( pids ) )
+
+
+    def stop_all( self ):
+        self.stop( list( self.__procs.keys() ) )
+
+
+    def __call( self, coro ):
+        return asyncio.run_coroutine_threadsafe(
+            coro, self.__loop ).result()
+
+
+    async def __launch( self, cmd, log, deadline, stdout, stderr ):
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout = asyncio.subprocess.PIPE if stdout is None \
+                     else stdout,
+            stderr = asyncio.subprocess.PIPE if stderr is None \
+                     else stderr,
+            start_new_session = True )
+        readers = []
+        for ( stream, log_fn ) in ( ( proc.stdout, log.info ),
+                                    ( proc.stderr, log.warning ) ):
+            if stream is not None:
+                readers.append( asyncio.ensure_future(
+                    self.__read_output( stream, log_fn ) ) )
+        task = asyncio.ensure_future(
+            self.__supervise( proc, log, deadline, readers ) )
+        self.__procs[ proc.pid ] = ( proc, log, task )
+        # The process is forgotten as soon as it has ended, the
+        # waiting callers hold the task already.
+        task.add_done_callback(
+            lambda x: self.__forget( proc.pid, x ) )
+        return proc.pid
+
+
+    def __forget( self, pid, task ):
+        entry = self.__procs.get( pid )
+        if entry is not None and entry[ 2 ] is task:
+            del self.__procs[ pid ]
+
+
+    async def __read_output( self, stream, log_fn ):
+        while True:
+            line = await stream.readline()
+            if len( line ) == 0:
+                break
+            log_fn( '%s', line.decode( errors = 'replace' ).rstrip() )
+
+
+    async def __supervise( self, proc, log, deadline, readers ):
+        try:
+            await asyncio.wait_for( proc.wait(), deadline )
+        except asyncio.TimeoutError:
+            await self.__vanish( proc, log )
+        if len( readers ) > 0:
+            ( _, pending ) = await asyncio.wait(
+                readers, timeout = DRAIN_TIMEOUT )
+            for reader in pending:
+                reader.cancel()
+        return proc.returncode
+
+
+    async def __wait( self, pid ):
+        if pid not in self.__procs:
+            return None
+        ( _, _, task ) = self.__procs[ pid ]
+        return await asyncio.shield( task )
+
+
+    async def __stop( self, pids ):
+        procs = [ self.__procs.pop( x ) for x in pids \
+                  if x in self.__procs ]
+        await asyncio.gather( *[ self.__vanish( proc, log ) \
+                                 for ( proc, log, _ ) in procs ] )
+        await asyncio.gather( *[ task for ( _, _, task ) in procs ] )
+
+
+    # SIGTERM first, SIGKILL if the process does not end in time.
+    async def __vanish( self, proc, log ):
+        if proc.returncode is not None:
+            log.info( 'Sub process already finished with ' +
+                      'return code %d', proc.returncode )
+            return
+        for signum in ( sig.SIGTERM, sig.SIGKILL ):
+            try:
+                os.killpg( proc.pid, signum )
+            except ProcessLookupError:
+                # ended in the meantime
+                pass
+            try:
+                await asyncio.wait_for( proc.wait(),
+                                        self.__term_timeout )
+            except asyncio.TimeoutError:
+                log.error( 'Timeout during sub process abortion ' +
+                           '( signal %d ). Sub process still ' +
+                           'going ...', signum )
+                continue
+            if abs( proc.returncode ) != signum:
+                log.warning( 'Did not get expected return code ' +
+                             'after sub process abortion ...' )
+            return
+        log.warning( 'Failed to vanish the sub process.' )
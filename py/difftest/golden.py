@@ -0,0 +1,178 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         golden.py
+
+
+    Purpose:      This module contains
+                  the golden cache. The
+                  Golden Platform captures
+                  are stored under a key
+                  which is derived from the
+                  configuration of the
+                  recording. A test case
+                  run with the same key
+                  reuses the stored captures
+                  and records the Platform
+                  Under Test only.
+
+
+    Remarks:      - The key covers the
+                    generator command (incl.
+                    target IP and interface),
+                    the execution time, the
+                    recording interfaces,
+                    filters and host filters,
+                    the raw capture and idle
+                    timeout settings of the
+                    recorder and the version
+                    tag of the configuration.
+
+                  - A cache entry is a
+                    directory named by the
+                    key, it is created
+                    atomically.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+
+KEY_FILE_NAME = 'key.json'
+
+
+class GoldenCache( object ):
+    def __init__( self, log, cache_cfg ):
+        self.__log = log
+        self.__path = cache_cfg.get_path()
+        self.__version_tag = cache_cfg.get_version_tag()
+
+
+    # Key of the Golden Platform capture which is recorded
+    # with the given generator and recorder configuration.
+    def get_key( self, gen_cfg, rec_cfg ):
+        key_data = self.__get_key_data( gen_cfg, rec_cfg )
+        key_str = json.dumps( key_data, sort_keys = True )
+        return hashlib.sha256( key_str.encode( 'utf-8' ) ).hexdigest()
+
+
+    def get_entry_path( self, key ):
+        return ( self.__path + os.path.sep + key )
+
+
+    # Copies the cached captures to the locations of the
+    # recorder and announces them to the comparator through
+    # the recording interfaces. Returns False on a miss.
+    def restore( self, key, recorder ):
+        rec_ifs = recorder.get_cfg().get_rec_ifs()
+        cached = self.__get_cached_pcaps( key, len( rec_ifs ) )
+        if cached is None:
+            return False
+        for ( src, rec_if ) in zip( cached, rec_ifs ):
+            filename = recorder.get_pcap_filename( rec_if )
+            shutil.copyfile( src, filename )
+            os.chmod( filename, 0o666 )
+            rec_if.set_pcap_path( filename )
+        self.__log.debug( 'Golden cache hit: %s' % key )
+        return True
+
+
+    # Stores the recorded captures. An existing entry
+    # is never overwritten.
+    def store( self, key, gen_cfg, recorder ):
+        rec_cfg = recorder.get_cfg()
+        entry_path = self.get_entry_path( key )
+        if os.path.isdir( entry_path ):
+            return
+        pcap_paths = [ x.get_pcap_path() for x in rec_cfg.get_rec_ifs() ]
+        if not all( [ x is not None and os.path.isfile( x ) \
+                      for x in pcap_paths ] ):
+            self.__log.warning( 'Golden Platform capture incomplete, ' +
+                                'not stored in the golden cache.' )
+            return
+        os.makedirs( self.__path, exist_ok = True )
+        tmp_path = tempfile.mkdtemp( prefix = '.' + key + '_',
+                                     dir = self.__path )
+        try:
+            for ( idx, src ) in enumerate( pcap_paths ):
+                shutil.copyfile( src, self.__get_pcap_path( tmp_path,
+                                                            idx ) )
+            with open( tmp_path + os.path.sep + KEY_FILE_NAME,
+                       'w' ) as f:
+                json.dump( self.__get_key_data( gen_cfg, rec_cfg ), f,
+                           sort_keys = True, indent = 4 )
+            os.rename( tmp_path, entry_path )
+        except OSError as e:
+            # Another run stored the same entry in the meantime
+            # or the cache location is not writable.
+            self.__log.warning( 'Golden cache entry %s not stored: %s' % \
+                                ( key, str( e ) ) )
+            shutil.rmtree( tmp_path, ignore_errors = True )
+            return
+        self.__log.debug( 'Golden cache entry stored: %s' % key )
+
+
+    def __get_cached_pcaps( self, key, num ):
+        entry_path = self.get_entry_path( key )
+        cached = [ self.__get_pcap_path( entry_path, idx ) \
+                   for idx in range( num ) ]
+        if not all( [ os.path.isfile( x ) for x in cached ] ):
+            return None
+        return cached
+
+
+    def __get_pcap_path( self, entry_path, idx ):
+        return ( entry_path + os.path.sep + ( '%d.pcap' % idx ) )
+
+
+    def __get_key_data( self, gen_cfg, rec_cfg ):
+        return {
+            'version_tag' : self.__version_tag,
+            'gen_cmd' : list( gen_cfg.get_gen_cmd() ),
+            'gen_if' : gen_cfg.get_gen_if(),
+            'target_ip' : gen_cfg.get_platform_cfg().get_ip(),
+            'exec_time' : gen_cfg.get_exec_time(),
+            'pause_before_stop' : rec_cfg.get_pause_before_stop(),
+            'idle_timeout' : rec_cfg.get_idle_timeout(),
+            'raw_capture' : rec_cfg.get_raw_capture(),
+            'rec_ifs' : [ ( x.get_if_name(), x.get_filter_expr(),
+                            x.get_host_filter() ) \
+                          for x in rec_cfg.get_rec_ifs() ] }
@@ -0,0 +1,251 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         model.py
+
+
+    Purpose:      This module contains
+                  the golden model. A
+                  golden model is the
+                  precompiled expected side
+                  of a comparison: the field
+                  columns of the comparator
+                  entries, the layer presence
+                  bitmaps, the timestamps and
+                  the file offsets of the
+                  packets of a capture.
+
+
+    Remarks:      - A model is a directory of
+                    .npy files. The numeric
+                    arrays are memory mapped
+                    on load.
+
+                  - The model key covers the
+                    content of the capture
+                    and the comparator entries.
+                    A model is never updated,
+                    a changed capture or entry
+                    gets a new model. A capture
+                    is hashed once per process
+                    as long as its path, size
+                    and modification time do not
+                    change.
+
+                  - Object columns (strings,
+                    lists, ...) are pickled and
+                    therefore loaded as a whole.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from decimal import Decimal
+try:
+    import numpy as np
+except ImportError:
+    np = None
+from difftest.pcapio import index_pcap, iter_pcap, iter_pcap_range
+
+
+MODEL_FORMAT_VERSION = 1
+META_FILE_NAME = 'meta.json'
+
+
+# Content hashes of the captures, ( path, size, modification
+# time ) : hash.
+_content_hashes = {}
+
+
+# Key of the model of a capture, derived from the
+# content of the capture and the comparator signature.
+def get_model_key( pcap_path, signature ):
+    h = hashlib.sha256()
+    h.update( json.dumps( [ MODEL_FORMAT_VERSION, signature ],
+                          sort_keys = True ).encode( 'utf-8' ) )
+    h.update( _get_content_hash( pcap_path ).encode( 'utf-8' ) )
+    return h.hexdigest()
+
+
+# The file status only saves hashing the same capture again,
+# e.g. for several test cases of a run. Copies of a capture
+# (as restored from the golden cache) have the same content
+# hash and therefore the same model.
+def _get_content_hash( pcap_path ):
+    st = os.stat( pcap_path )
+    stat_key = ( os.path.abspath( pcap_path ), st.st_size,
+                 st.st_mtime_ns )
+    content_hash = _content_hashes.get( stat_key )
+    if content_hash is None:
+        h = hashlib.sha256()
+        with open( pcap_path, 'rb' ) as f:
+            for block in iter( lambda: f.read( 1 << 20 ), b'' ):
+                h.update( block )
+        content_hash = h.hexdigest()
+        _content_hashes[ stat_key ] = content_hash
+    return content_hash
+
+
+# Writes the model of a capture. The columns are the ones of
+# columnar.extract_columns, the timestamps the ones of the
+# capture packets.
+def save_golden_model( model_path, key, pcap_path, columns, times ):
+    ( presence, values ) = columns
+    times = list( times )
+    t_first = times[ 0 ] if len( times ) > 0 else Decimal( 0 )
+    ( num, offsets ) = index_pcap( pcap_path )
+    os.makedirs( model_path, exist_ok = True )
+    entry_path = model_path + os.path.sep + key
+    tmp_path = tempfile.mkdtemp( prefix = '.' + key + '_',
+                                 dir = model_path )
+    try:
+        _save( tmp_path, 'times', np.array(
+            [ float( t - t_first ) for t in times ], dtype = float ) )
+        _save( tmp_path, 'offsets', np.array( offsets,
+                                              dtype = np.int64 ) )
+        # One bit per comparator entry and packet.
+        if len( presence ) > 0:
+            bitmap = np.packbits( np.stack( presence, axis = 1 ),
+                                  axis = 1 )
+        else:
+            bitmap = np.zeros( ( num, 0 ), dtype = np.uint8 )
+        _save( tmp_path, 'presence', bitmap )
+        for ( e, cols ) in enumerate( values ):
+            for ( f, col ) in enumerate( cols ):
+                _save( tmp_path, 'col_%d_%d' % ( e, f ), col )
+        meta = { 'version' : MODEL_FORMAT_VERSION,
+                 'pcap' : pcap_path,
+                 'num' : num,
+                 't_first' : str( t_first ),
+                 'layout' : [ len( x ) for x in values ] }
+        with open( tmp_path + os.path.sep + META_FILE_NAME, 'w' ) as f:
+            json.dump( meta, f, indent = 4 )
+        os.rename( tmp_path, entry_path )
+    except OSError:
+        shutil.rmtree( tmp_path, ignore_errors = True )
+        if not os.path.isdir( entry_path ):
+            raise
+
+
+def _save( path, name, array ):
+    np.save( path + os.path.sep + name + '.npy', array,
+             allow_pickle = ( array.dtype == object ) )
+
+
+# Returns the model of the capture or None if there is none.
+def load_golden_model( model_path, key, pcap_path, stop_layer = None ):
+    entry_path = model_path + os.path.sep + key
+    try:
+        with open( entry_path + os.path.sep + META_FILE_NAME ) as f:
+            meta = json.load( f )
+    except ( OSError, ValueError ):
+        return None
+    if meta.get( 'version' ) != MODEL_FORMAT_VERSION:
+        return None
+    return GoldenModel( entry_path, meta, pcap_path, stop_layer )
+
+
+
+# Expected side of a comparison. Behaves like a lazy packet
+# list: a packet is read (and dissected) from the capture file
+# on access only.
+class GoldenModel( object ):
+    def __init__( self, entry_path, meta, pcap_path, stop_layer ):
+        self.__pcap_path = pcap_path
+        self.__stop_layer = stop_layer
+        self.__num = meta[ 'num' ]
+        self.__t_first = Decimal( meta[ 't_first' ] )
+        self.__layout = meta[ 'layout' ]
+        load = lambda x: np.load( entry_path + os.path.sep + x + '.npy',
+                                  mmap_mode = 'r' )
+        self.__times = load( 'times' )
+        self.__offsets = load( 'offsets' )
+        bitmap = load( 'presence' )
+        self.__presence = [ x.astype( bool ) for x in np.unpackbits(
+            bitmap, axis = 1, count = len( self.__layout ) ).T ]
+        self.__values = []
+        for ( e, num_fields ) in enumerate( self.__layout ):
+            cols = []
+            for f in range( num_fields ):
+                name = entry_path + os.path.sep + \
+                       ( 'col_%d_%d.npy' % ( e, f ) )
+                try:
+                    cols.append( np.load( name, mmap_mode = 'r' ) )
+                except ValueError:
+                    # object column
+                    cols.append( np.load( name, allow_pickle = True ) )
+            self.__values.append( cols )
+
+
+    def __len__( self ):
+        return self.__num
+
+
+    def __getitem__( self, idx ):
+        if idx < 0:
+            idx += self.__num
+        if idx < 0 or idx >= self.__num:
+            raise IndexError( 'golden model index out of range' )
+        return next( iter_pcap_range( self.__pcap_path,
+                                      int( self.__offsets[ idx ] ), 1,
+                                      self.__stop_layer ) )
+
+
+    def __iter__( self ):
+        return iter_pcap( self.__pcap_path, self.__stop_layer )
+
+
+    def get_layout( self ):
+        return self.__layout
+
+
+    # Columns in the format of columnar.extract_columns.
+    def get_columns( self ):
+        return ( self.__presence, self.__values )
+
+
+    # Timestamps relative to the first packet,
+    # which is all the timing check needs.
+    def get_times( self ):
+        return self.__times
+
+
+    def get_first_time( self ):
+        return self.__t_first
@@ -0,0 +1,101 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+
+    File:         netns.py
+
+
+    Purpose:      This module contains
+                  the network namespace
+                  prefix of the generator
+                  commands. Commands prefixed
+                  with 'ip netns exec <name>'
+                  are run with 'nsenter' in
+                  the namespace instead, which
+                  only enters the network
+                  namespace (setns) and then
+                  executes the command.
+
+
+    Remarks:      - Unlike 'ip netns exec',
+                    no mount namespace is
+                    created and /sys is not
+                    remounted. A namespace
+                    with files in
+                    /etc/netns/<name> (which
+                    the ip command bind mounts
+                    over /etc) is entered by
+                    the ip command.
+
+                  - Needs the CAP_SYS_ADMIN
+                    capability, like the ip
+                    command.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import os
+
+
+NETNS_RUN_DIR = '/var/run/netns'
+NETNS_ETC_DIR = '/etc/netns'
+NETNS_EXEC_PREFIX = ( 'ip', 'netns', 'exec' )
+NSENTER_CMD = 'nsenter'
+
+
+# Splits 'ip netns exec <name> <command>' into the namespace
+# name and the command. The name is None for other commands
+# and for namespaces with their own /etc files, these are
+# left to the ip command.
+def split_netns_cmd( cmd ):
+    n = len( NETNS_EXEC_PREFIX )
+    if len( cmd ) > ( n + 1 ) and \
+       os.path.basename( cmd[ 0 ] ) == NETNS_EXEC_PREFIX[ 0 ] and \
+       tuple( cmd[ 1 : n ] ) == NETNS_EXEC_PREFIX[ 1 : ] and \
+       not os.path.isdir( os.path.join( NETNS_ETC_DIR, cmd[ n ] ) ):
+        return ( cmd[ n ], cmd[ ( n + 1 ) : ] )
+    return ( None, cmd )
+
+
+# The command with its 'ip netns exec' prefix replaced
+# by 'nsenter', see split_netns_cmd.
+def get_nsenter_cmd( cmd ):
+    ( name, cmd ) = split_netns_cmd( cmd )
+    if name is None:
+        return cmd
+    return [ NSENTER_CMD,
+             '--net=' + os.path.join( NETNS_RUN_DIR, name ),
+             '--' ] + list( cmd )
@@ -0,0 +1,219 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         normalise.py
+
+
+    Purpose:      This module contains
+                  the normalisation of the
+                  raw frames of a capture.
+                  Header fields which
+                  legitimately differ between
+                  the GP and the PUT are
+                  masked before the frames
+                  are compared.
+
+
+    Remarks:      - A capture is normalised as
+                    a whole in one buffer. The
+                    fields are masked for all
+                    the frames at once (NumPy),
+                    or frame by frame without.
+
+                  - Rules:
+                    <Layer>.<field>  masks the
+                                     field, e.g.
+                                     IP.id, IP.ttl
+                    chksum           zeroes the
+                                     IP, ICMP, TCP
+                                     and UDP
+                                     checksums
+                    tcp_seq          makes the TCP
+                                     sequence and
+                                     acknowledgment
+                                     numbers relative
+
+                  - Frames other than Ethernet
+                    and unfragmented IPv4 are
+                    left untouched.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import struct
+from scapy.layers.inet import IP, ICMP, TCP, UDP
+from difftest.rawfield import RAW_LAYOUTS, locate_layers, \
+                              icmp_id_seq_types, ICMP_ID_SEQ_FIELDS
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+RULE_CHKSUM = 'chksum'
+RULE_TCP_SEQ = 'tcp_seq'
+CHKSUM_LAYERS = ( IP, ICMP, TCP, UDP )
+SEQ_MOD = ( 1 << 32 )
+TCP_FLAG_ACK = 0x10
+
+_UINT32 = struct.Struct( '!I' )
+
+
+# Parses a comma separated list of rules. Raises a ValueError
+# on unknown rules.
+def parse_normalise_rules( rules_str ):
+    rules = [ x.strip() for x in rules_str.split( ',' ) ]
+    rules = [ x for x in rules if len( x ) > 0 ]
+    for rule in rules:
+        if rule not in ( RULE_CHKSUM, RULE_TCP_SEQ ):
+            _get_field_layout( rule )
+    return rules
+
+
+# Returns ( scapy type, field name, raw field layout ).
+def _get_field_layout( rule ):
+    layers = dict( [ ( x.__name__, x ) for x in RAW_LAYOUTS ] )
+    ( layer_name, _, field_name ) = rule.partition( '.' )
+    scapy_type = layers.get( layer_name )
+    if scapy_type is None or \
+       field_name not in RAW_LAYOUTS[ scapy_type ]:
+        raise ValueError( 'Unknown normalisation rule: %s' % rule )
+    return ( scapy_type, field_name,
+             RAW_LAYOUTS[ scapy_type ][ field_name ] )
+
+
+
+class Normaliser( object ):
+    def __init__( self, rules ):
+        self.__rules = tuple( rules )
+        # ( scapy type, offset in the layer, byte masks,
+        #   ICMP id/seq field )
+        self.__masks = []
+        field_rules = []
+        for rule in rules:
+            if rule == RULE_CHKSUM:
+                field_rules += [ '%s.chksum' % x.__name__ \
+                                 for x in CHKSUM_LAYERS ]
+            elif rule != RULE_TCP_SEQ:
+                field_rules.append( rule )
+        for rule in field_rules:
+            ( scapy_type, field_name, layout ) = \
+                _get_field_layout( rule )
+            ( fmt, offset, shift, mask, _ ) = layout
+            size = struct.calcsize( fmt )
+            bits = ( ( 1 << ( size * 8 ) ) - 1 )
+            if mask is not None:
+                bits = ( mask << shift )
+            keep = ( ~bits ) & ( ( 1 << ( size * 8 ) ) - 1 )
+            self.__masks.append( ( scapy_type, offset,
+                keep.to_bytes( size, 'big' ),
+                ( scapy_type is ICMP and
+                  field_name in ICMP_ID_SEQ_FIELDS ) ) )
+        self.__tcp_seq = RULE_TCP_SEQ in rules
+
+
+    def get_rules( self ):
+        return self.__rules
+
+
+    # Returns the normalised copies of a sequence of frames.
+    def normalise_frames( self, frames ):
+        frames = list( frames )
+        buf = bytearray( b''.join( frames ) )
+        starts = []
+        pos = 0
+        for frame in frames:
+            starts.append( pos )
+            pos += len( frame )
+        # Absolute offsets of the layers, scapy type : offsets
+        layer_offs = dict( [ ( x, [] ) for x in RAW_LAYOUTS ] )
+        # ( IP offset, TCP offset ) of the TCP segments
+        tcp_hdrs = []
+        for ( frame, start ) in zip( frames, starts ):
+            offsets = locate_layers( frame )
+            if offsets is None:
+                continue
+            for ( scapy_type, offset ) in offsets.items():
+                layer_offs[ scapy_type ].append( start + offset )
+            if TCP in offsets:
+                tcp_hdrs.append( ( ( start + offsets[ IP ] ),
+                                   ( start + offsets[ TCP ] ) ) )
+        if self.__tcp_seq:
+            self.__make_tcp_seq_relative( buf, tcp_hdrs )
+        for ( scapy_type, offset, keep, cond ) in self.__masks:
+            offs = layer_offs[ scapy_type ]
+            if cond:
+                offs = [ x for x in offs \
+                         if buf[ x ] in icmp_id_seq_types ]
+            self.__mask_field( buf, offs, offset, keep )
+        return [ bytes( buf[ start : ( start + len( frame ) ) ] ) \
+                 for ( frame, start ) in zip( frames, starts ) ]
+
+
+    def __mask_field( self, buf, layer_offs, offset, keep ):
+        if len( layer_offs ) == 0:
+            return
+        if np is not None:
+            view = np.frombuffer( buf, dtype = np.uint8 )
+            pos = np.array( layer_offs, dtype = np.int64 ) + offset
+            for ( k, byte_mask ) in enumerate( keep ):
+                view[ pos + k ] &= byte_mask
+            return
+        for layer_off in layer_offs:
+            for ( k, byte_mask ) in enumerate( keep ):
+                buf[ layer_off + offset + k ] &= byte_mask
+
+
+    # The sequence numbers of each direction are made relative
+    # to the first one seen, the acknowledgment numbers to the
+    # first sequence number of the opposite direction.
+    def __make_tcp_seq_relative( self, buf, tcp_hdrs ):
+        first_seqs = {}
+        for ( ip_off, tcp_off ) in tcp_hdrs:
+            addrs = bytes( buf[ ( ip_off + 12 ) : ( ip_off + 20 ) ] )
+            ports = bytes( buf[ tcp_off : ( tcp_off + 4 ) ] )
+            key = ( addrs, ports )
+            rkey = ( addrs[ 4 : ] + addrs[ : 4 ],
+                     ports[ 2 : ] + ports[ : 2 ] )
+            seq = _UINT32.unpack_from( buf, tcp_off + 4 )[ 0 ]
+            first_seq = first_seqs.setdefault( key, seq )
+            _UINT32.pack_into( buf, tcp_off + 4,
+                               ( seq - first_seq ) % SEQ_MOD )
+            if ( buf[ tcp_off + 13 ] & TCP_FLAG_ACK ) != 0 and \
+               rkey in first_seqs:
+                ack = _UINT32.unpack_from( buf, tcp_off + 8 )[ 0 ]
+                _UINT32.pack_into( buf, tcp_off + 8,
+                    ( ack - first_seqs[ rkey ] ) % SEQ_MOD )
@@ -0,0 +1,351 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         pcapio.py
+
+
+    Purpose:      This module contains
+                  the pcap file input and
+                  output helpers which
+                  are used from the
+                  recorder and the
+                  comparator components.
+
+
+    Remarks:      - The readers are generators.
+                    Only the packet which is
+                    currently processed lives
+                    in memory.
+
+                  - The lazy readers keep the
+                    raw frames only. A frame is
+                    dissected when it is accessed
+                    and, if possible, only up to
+                    the deepest layer which is
+                    of interest.
+
+                  - The stream writer appends
+                    packets to a pcap file from
+                    a separate thread. The
+                    packets are handed over by
+                    a bounded queue.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import os
+import queue
+import struct
+import inspect
+import threading
+from decimal import Decimal
+from scapy.all import conf, Packet, PcapReader, RawPcapReader, \
+                      PcapWriter
+from scapy.utils import EDecimal
+
+
+# End of stream marker for the writer queue.
+_EOS = object()
+
+# Older scapy versions always dissect a frame as a whole.
+STOP_DISSECTION_SUPPORTED = hasattr( Packet, 'stop_dissection_after' )
+
+
+# Reads a pcap file packet by packet. The file is closed
+# as soon as the generator is exhausted or garbage collected.
+# With a stop layer given, the dissection of each packet ends
+# after this layer.
+def iter_pcap( path, stop_layer = None ):
+    if stop_layer is None:
+        with PcapReader( path ) as rdr:
+            for pkt in rdr:
+                yield pkt
+    else:
+        cls = get_pcap_ll_cls( path )
+        for ( raw, ts ) in iter_pcap_records( path ):
+            yield dissect( cls, raw, ts, stop_layer )
+
+
+# Reads the raw frames and the timestamps of a pcap file.
+def iter_pcap_records( path ):
+    with RawPcapReader( path ) as rdr:
+        power = Decimal( 10 ) ** Decimal( -9 if rdr.nano else -6 )
+        for ( raw, meta ) in rdr:
+            yield ( raw, EDecimal( meta.sec + power * meta.usec ) )
+
+
+# Reads the packet timestamps of a pcap file without
+# dissecting the packets at all.
+def iter_pcap_times( path ):
+    for ( _, ts ) in iter_pcap_records( path ):
+        yield ts
+
+
+# Reads the record headers of a pcap file only, the packet data
+# is skipped. Returns the number of records and the file offsets
+# of every n-th record. With these offsets a capture can be read
+# in ranges (see iter_pcap_range).
+def index_pcap( path, every = 1 ):
+    offsets = []
+    cnt = 0
+    with open( path, 'rb' ) as f:
+        ( endian, _, _ ) = _read_pcap_header( f )
+        offset = f.tell()
+        while True:
+            hdr = f.read( 16 )
+            if len( hdr ) < 16:
+                break
+            if ( cnt % every ) == 0:
+                offsets.append( offset )
+            caplen = struct.unpack( endian + 'I', hdr[ 8 : 12 ] )[ 0 ]
+            offset = f.seek( caplen, os.SEEK_CUR )
+            cnt += 1
+    return ( cnt, offsets )
+
+
+# Reads count packets starting at the record at the given
+# file offset.
+def iter_pcap_range( path, offset, count, stop_layer = None ):
+    with open( path, 'rb' ) as f:
+        ( endian, nano, linktype ) = _read_pcap_header( f )
+        cls = conf.l2types.num2layer.get( linktype, conf.raw_layer )
+        power = Decimal( 10 ) ** Decimal( -9 if nano else -6 )
+        f.seek( offset )
+        for _ in range( count ):
+            hdr = f.read( 16 )
+            if len( hdr ) < 16:
+                break
+            ( sec, frac, caplen, _ ) = struct.unpack( endian + 'IIII',
+                                                      hdr )
+            raw = f.read( caplen )
+            yield dissect( cls, raw, EDecimal( sec + power * frac ),
+                           stop_layer )
+
+
+def _read_pcap_header( f ):
+    magic = f.read( 4 )
+    if magic in ( b'\xa1\xb2\xc3\xd4', b'\xa1\xb2\x3c\x4d' ):
+        endian = '>'
+    elif magic in ( b'\xd4\xc3\xb2\xa1', b'\x4d\x3c\xb2\xa1' ):
+        endian = '<'
+    else:
+        raise ValueError( 'Not a pcap capture file (bad magic: %r)' % \
+                          ( magic, ) )
+    nano = magic in ( b'\xa1\xb2\x3c\x4d', b'\x4d\x3c\xb2\xa1' )
+    hdr = f.read( 20 )
+    if len( hdr ) < 20:
+        raise ValueError( 'Invalid pcap file (too short)' )
+    linktype = struct.unpack( endian + 'I', hdr[ 16 : 20 ] )[ 0 ]
+    return ( endian, nano, linktype )
+
+
+# Returns the scapy class of the link layer of a pcap file.
+def get_pcap_ll_cls( path ):
+    with RawPcapReader( path ) as rdr:
+        linktype = rdr.linktype
+    return conf.l2types.num2layer.get( linktype, conf.raw_layer )
+
+
+def dissect( cls, raw, ts, stop_layer = None ):
+    try:
+        if stop_layer is not None and STOP_DISSECTION_SUPPORTED:
+            pkt = cls( raw, stop_dissection_after = stop_layer )
+        else:
+            pkt = cls( raw )
+    except ( Exception, ):
+        # Same fallback as the scapy pcap reader.
+        pkt = conf.raw_layer( raw )
+    pkt.time = ts
+    return pkt
+
+
+# Returns the layer after which the dissection can stop, such
+# that all the given layers are still dissected. This is the
+# layer which can be reached (through the scapy layer bindings)
+# from all the other layers. None means full dissection.
+def find_stop_layer( scapy_types ):
+    scapy_types = set( scapy_types )
+    if len( scapy_types ) == 0:
+        return None
+    deepest = [ t for t in scapy_types \
+                if len( _get_reachable_layers( t ) & scapy_types ) \
+                   == 0 ]
+    if len( deepest ) != 1:
+        return None
+    stop_layer = deepest[ 0 ]
+    others = scapy_types - { stop_layer }
+    if all( [ stop_layer in _get_reachable_layers( t ) \
+              for t in others ] ):
+        return stop_layer
+    return None
+
+
+def _get_reachable_layers( scapy_type ):
+    reachable = set()
+    todo = [ scapy_type ]
+    while len( todo ) > 0:
+        cls = todo.pop()
+        for ( _, nxt ) in getattr( cls, 'payload_guess', [] ):
+            if inspect.isclass( nxt ) and nxt not in reachable:
+                reachable.add( nxt )
+                todo.append( nxt )
+    return reachable
+
+
+# Sequence of packets which keeps the raw frames only. A packet
+# is dissected on every access, nothing dissected is cached.
+class LazyPacketList( object ):
+    def __init__( self, path, stop_layer = None ):
+        self.__cls = get_pcap_ll_cls( path )
+        self.__stop_layer = stop_layer
+        self.__records = list( iter_pcap_records( path ) )
+
+
+    def __len__( self ):
+        return len( self.__records )
+
+
+    def __getitem__( self, idx ):
+        ( raw, ts ) = self.__records[ idx ]
+        return dissect( self.__cls, raw, ts, self.__stop_layer )
+
+
+    def __iter__( self ):
+        for ( raw, ts ) in self.__records:
+            yield dissect( self.__cls, raw, ts, self.__stop_layer )
+
+
+    def get_times( self ):
+        return ( ts for ( _, ts ) in self.__records )
+
+
+    def get_frames( self ):
+        return ( raw for ( raw, _ ) in self.__records )
+
+
+    def get_ll_cls( self ):
+        return self.__cls
+
+
+    # Replaces the raw frames (e.g. by normalised ones),
+    # the timestamps are kept.
+    def set_frames( self, frames ):
+        self.__records = [ ( raw, ts ) for ( raw, ( _, ts ) ) in \
+                           zip( frames, self.__records ) ]
+
+
+# Returns the first element of an iterator and an iterator
+# which still yields all the elements (including the first).
+def peek( it ):
+    it = iter( it )
+    try:
+        first = next( it )
+    except StopIteration:
+        return ( None, iter( () ) )
+
+    def chained():
+        yield first
+        yield from it
+
+    return ( first, chained() )
+
+
+class PcapStreamWriter( object ):
+    def __init__( self, filename, queue_size = 10000,
+                  batch_size = 256, linktype = None ):
+        self.__filename = filename
+        self.__batch_size = batch_size
+        # put() blocks as soon as the queue is full. That way
+        # the memory usage is bounded even if the disk can not
+        # keep up with the packet rate.
+        self.__queue = queue.Queue( maxsize = queue_size )
+        self.__writer = PcapWriter( filename, sync = False,
+                                    linktype = linktype )
+        self.__thread = threading.Thread( target = self.__run,
+            name = 'pcap-writer', daemon = True )
+        self.__error = None
+        self.__count = 0
+
+
+    def get_filename( self ):
+        return self.__filename
+
+
+    def get_count( self ):
+        return self.__count
+
+
+    def get_error( self ):
+        return self.__error
+
+
+    def start( self ):
+        self.__thread.start()
+
+
+    def put( self, pkt ):
+        self.__queue.put( pkt )
+
+
+    # Flushes the remaining packets and closes the file.
+    def close( self ):
+        self.__queue.put( _EOS )
+        self.__thread.join()
+        self.__writer.close()
+
+
+    def __run( self ):
+        done = False
+        while not done:
+            batch = [ self.__queue.get() ]
+            while len( batch ) < self.__batch_size:
+                try:
+                    batch.append( self.__queue.get_nowait() )
+                except queue.Empty:
+                    break
+            if batch[ -1 ] is _EOS:
+                batch.pop()
+                done = True
+            if len( batch ) == 0 or self.__error is not None:
+                # Keep on draining the queue after an error,
+                # the producer must never be blocked.
+                continue
+            try:
+                self.__writer.write( batch )
+                self.__writer.flush()
+                self.__count += len( batch )
+            except ( OSError, ValueError ) as e:
+                self.__error = e
@@ -0,0 +1,257 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         plan.py
+
+
+    Purpose:      This module contains
+                  the compiled comparison
+                  plan. The comparator
+                  entries of a comparator
+                  configuration are
+                  flattened once before
+                  the comparison, the
+                  plan is then executed
+                  for every packet pair.
+
+
+    Remarks:      - Field getters of the form
+                    lambda x: x.a.b are
+                    replaced by attribute
+                    getters (operator module).
+
+                  - The default field compare
+                    function is inlined.
+
+                  - If all the field getters are
+                    raw fields, the packets can
+                    be projected from their raw
+                    frames (see rawfield.py).
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import dis
+import hashlib
+import operator
+from difftest.rawfield import RawField, locate_layers
+from difftest.results import make_result
+
+
+# Bytecode instructions which do not change the
+# semantics of a simple attribute getter.
+_IGNORED_OPS = ( 'RESUME', 'CACHE', 'NOP', 'COPY_FREE_VARS' )
+
+
+def compile_cmp_plan( cmp_entries ):
+    plan_entries = []
+    signature = []
+    labels = []
+    for entry in cmp_entries:
+        getters = tuple( [ resolve_getter( x ) \
+                           for x in entry.get_field_getters() ] )
+        plan_entries.append( ( entry.get_scapy_type(), getters,
+                               entry.get_pkt_cmp_fn() ) )
+        signature.append( ( get_type_signature( entry.get_scapy_type() ),
+                            [ get_getter_signature( x ) \
+                              for x in entry.get_field_getters() ],
+                            entry.get_pkt_cmp_fn() is not None ) )
+        labels.append( tuple( [ get_field_label( entry.get_scapy_type(),
+                                                 x, k ) \
+            for ( k, x ) in enumerate( entry.get_field_getters() ) ] ) )
+    return CmpPlan( plan_entries, signature, labels )
+
+
+# Returns an attribute getter for getters of the form
+# lambda x: x.a.b and the getter itself otherwise.
+def resolve_getter( fn ):
+    path = get_attr_path( fn )
+    if path is None:
+        return fn
+    return operator.attrgetter( path )
+
+
+def get_attr_path( fn ):
+    code = getattr( fn, '__code__', None )
+    if code is None or code.co_argcount != 1 or \
+       code.co_kwonlyargcount != 0:
+        return None
+    arg_name = code.co_varnames[ 0 ]
+    instrs = [ x for x in dis.get_instructions( fn ) \
+               if x.opname not in _IGNORED_OPS ]
+    if len( instrs ) < 3 or \
+       instrs[ 0 ].opname != 'LOAD_FAST' or \
+       instrs[ 0 ].argval != arg_name or \
+       instrs[ -1 ].opname != 'RETURN_VALUE':
+        return None
+    attrs = instrs[ 1 : -1 ]
+    if not all( [ x.opname == 'LOAD_ATTR' for x in attrs ] ):
+        return None
+    return '.'.join( [ x.argval for x in attrs ] )
+
+
+
+# Field name of a getter in the structured results, e.g.
+# ICMP.seq, or the getter position if it has no name.
+def get_field_label( scapy_type, fn, pos ):
+    if isinstance( fn, RawField ):
+        name = fn.get_field_name()
+    else:
+        name = get_attr_path( fn )
+        if name is None:
+            name = 'getter %d' % ( pos, )
+    return '%s.%s' % ( scapy_type.__name__, name )
+
+
+def get_type_signature( scapy_type ):
+    return ( scapy_type.__module__ + '.' + scapy_type.__name__ )
+
+
+# Stable description of a field getter. Two getters with
+# the same signature extract the same values.
+def get_getter_signature( fn ):
+    path = get_attr_path( fn )
+    if path is not None:
+        return 'attr:' + path
+    code = getattr( fn, '__code__', None )
+    if code is None:
+        return 'repr:' + repr( fn )
+    return 'code:' + hashlib.sha256( code.co_code +
+        repr( ( code.co_consts, code.co_names ) ).encode( 'utf-8' ) ) \
+        .hexdigest()
+
+
+
+class CmpPlan( object ):
+    def __init__( self, plan_entries, signature = None,
+                  labels = None ):
+        # Tuples of ( scapy type, field getters, compare function ).
+        # A compare function of None means the default compare
+        # function, which is inlined.
+        self.__entries = tuple( plan_entries )
+        self.__signature = signature
+        # Field labels of the getters, per entry.
+        if labels is None:
+            labels = [ tuple( [ get_field_label( scpy_type, x, k ) \
+                                for ( k, x ) in enumerate( getters ) ] ) \
+                       for ( scpy_type, getters, _ ) in self.__entries ]
+        self.__labels = tuple( labels )
+        self.__raw = all( [ isinstance( x, RawField ) and x.is_raw() and \
+                            x.get_scapy_type() is scpy_type \
+                            for ( scpy_type, getters, _ ) in \
+                            self.__entries for x in getters ] )
+
+
+    def get_entries( self ):
+        return self.__entries
+
+
+    def is_raw( self ):
+        return self.__raw
+
+
+    def get_signature( self ):
+        return self.__signature
+
+
+    def get_labels( self ):
+        return self.__labels
+
+
+    # Same semantics as the (interpreted) Comparator._eq. The
+    # mismatches are appended to the results if given.
+    def eq( self, log, idx, a, b, results = None ):
+        ret_val = True
+        for ( ( scpy_type, getters, cmp_fn ), labels ) in \
+            zip( self.__entries, self.__labels ):
+            # A single layer lookup per packet and entry.
+            la = a.getlayer( scpy_type )
+            lb = b.getlayer( scpy_type )
+            if la is not None and lb is not None:
+                for ( x, label ) in zip( getters, labels ):
+                    va = x( la )
+                    vb = x( lb )
+                    if cmp_fn is None:
+                        ok = ( va == vb )
+                        if not ok:
+                            log.error( 'Packet number %4d: ' + \
+                                       'Expected value: %s, ' + \
+                                       'actual value: %s', idx, va, vb )
+                    else:
+                        ok = cmp_fn( log, idx, va, vb )
+                    if not ok:
+                        ret_val = False
+                        if results is not None:
+                            results.append( make_result( 'field', idx,
+                                                         label, va, vb ) )
+            elif la is not None or lb is not None:
+                log.error( '%s is not present in packet a ' +
+                    'AND packet b.', scpy_type )
+                ret_val = False
+                if results is not None:
+                    results.append( make_result( 'layer', idx,
+                        scpy_type.__name__, la is not None,
+                        lb is not None ) )
+        return ret_val
+
+
+    def project( self, pkt ):
+        proj = []
+        for ( scpy_type, getters, _ ) in self.__entries:
+            layer = pkt.getlayer( scpy_type )
+            if layer is None:
+                proj.append( None )
+            else:
+                proj.append( tuple( [ x( layer ) for x in getters ] ) )
+        return tuple( proj )
+
+
+    # Projection of a raw Ethernet frame, same result as project()
+    # on the dissected frame. Returns None if the frame has to be
+    # dissected.
+    def project_raw( self, frame ):
+        offsets = locate_layers( frame )
+        if offsets is None:
+            return None
+        proj = []
+        for ( scpy_type, getters, _ ) in self.__entries:
+            offset = offsets.get( scpy_type )
+            if offset is None:
+                proj.append( None )
+            else:
+                proj.append( tuple( [ x.read( frame, offset ) \
+                                      for x in getters ] ) )
+        return tuple( proj )
@@ -0,0 +1,219 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         rawfield.py
+
+
+    Purpose:      This module contains
+                  the raw field extractors.
+                  A raw field reads a header
+                  field of a fixed layout
+                  header directly from the
+                  bytes of a frame, without
+                  the dissection of scapy.
+
+
+    Remarks:      - Supported are Ethernet,
+                    IPv4, ICMP, TCP and UDP.
+
+                  - Frames with any other or
+                    a variable layout (VLAN,
+                    IPv6, fragments, ...) are
+                    dissected by scapy as
+                    usual.
+
+                  - Raw fields are also plain
+                    field getters, used on a
+                    dissected layer they fall
+                    back to scapy.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import socket
+import struct
+from scapy.layers.l2 import Ether
+from scapy.layers.inet import IP, ICMP, TCP, UDP
+try:
+    from scapy.layers.inet import icmp_id_seq_types
+except ImportError:
+    icmp_id_seq_types = [ 0, 8, 13, 14, 15, 16, 17, 18 ]
+
+
+ETH_HDR_LEN = 14
+ETH_TYPE_IPV4 = 0x0800
+IP_PROTOS = { socket.IPPROTO_ICMP : ICMP,
+              socket.IPPROTO_TCP : TCP,
+              socket.IPPROTO_UDP : UDP }
+# Minimal header lengths of the layers after IPv4.
+L4_HDR_LENS = { ICMP : 8, TCP : 20, UDP : 8 }
+
+
+def _mac2str( value ):
+    return ':'.join( [ '%02x' % x for x in value ] )
+
+
+# Raw field layouts:
+# field name : ( struct format, offset, shift, mask, conversion )
+RAW_LAYOUTS = {
+    Ether : {
+        'dst' : ( '6s', 0, 0, None, _mac2str ),
+        'src' : ( '6s', 6, 0, None, _mac2str ),
+        'type' : ( '!H', 12, 0, None, None ) },
+    IP : {
+        'version' : ( '!B', 0, 4, 0xf, None ),
+        'ihl' : ( '!B', 0, 0, 0xf, None ),
+        'tos' : ( '!B', 1, 0, None, None ),
+        'len' : ( '!H', 2, 0, None, None ),
+        'id' : ( '!H', 4, 0, None, None ),
+        'flags' : ( '!H', 6, 13, 0x7, None ),
+        'frag' : ( '!H', 6, 0, 0x1fff, None ),
+        'ttl' : ( '!B', 8, 0, None, None ),
+        'proto' : ( '!B', 9, 0, None, None ),
+        'chksum' : ( '!H', 10, 0, None, None ),
+        'src' : ( '4s', 12, 0, None, socket.inet_ntoa ),
+        'dst' : ( '4s', 16, 0, None, socket.inet_ntoa ) },
+    ICMP : {
+        'type' : ( '!B', 0, 0, None, None ),
+        'code' : ( '!B', 1, 0, None, None ),
+        'chksum' : ( '!H', 2, 0, None, None ),
+        'id' : ( '!H', 4, 0, None, None ),
+        'seq' : ( '!H', 6, 0, None, None ) },
+    TCP : {
+        'sport' : ( '!H', 0, 0, None, None ),
+        'dport' : ( '!H', 2, 0, None, None ),
+        'seq' : ( '!I', 4, 0, None, None ),
+        'ack' : ( '!I', 8, 0, None, None ),
+        'dataofs' : ( '!B', 12, 4, 0xf, None ),
+        'reserved' : ( '!B', 12, 1, 0x7, None ),
+        'flags' : ( '!H', 12, 0, 0x1ff, None ),
+        'window' : ( '!H', 14, 0, None, None ),
+        'chksum' : ( '!H', 16, 0, None, None ),
+        'urgptr' : ( '!H', 18, 0, None, None ) },
+    UDP : {
+        'sport' : ( '!H', 0, 0, None, None ),
+        'dport' : ( '!H', 2, 0, None, None ),
+        'len' : ( '!H', 4, 0, None, None ),
+        'chksum' : ( '!H', 6, 0, None, None ) }
+}
+
+# ICMP fields which are only present for some ICMP types.
+ICMP_ID_SEQ_FIELDS = ( 'id', 'seq' )
+
+_UINT16 = struct.Struct( '!H' )
+
+
+# Field getter which reads a header field at a precomputed
+# offset, e.g. RawField( ICMP, 'seq' ). The values are the
+# plain numbers (or address strings) of the header fields.
+class RawField( object ):
+    def __init__( self, scapy_type, field_name ):
+        self.__scapy_type = scapy_type
+        self.__field_name = field_name
+        layout = RAW_LAYOUTS.get( scapy_type, {} ).get( field_name )
+        self.__raw = layout is not None
+        if self.__raw:
+            ( fmt, self.__offset, self.__shift, self.__mask,
+              self.__conv ) = layout
+            self.__struct = struct.Struct( fmt )
+        self.__conditional = ( scapy_type is ICMP and
+                               field_name in ICMP_ID_SEQ_FIELDS )
+
+
+    def __repr__( self ):
+        return 'RawField( %s, %s )' % ( self.__scapy_type.__name__,
+                                        repr( self.__field_name ) )
+
+
+    def get_scapy_type( self ):
+        return self.__scapy_type
+
+
+    def get_field_name( self ):
+        return self.__field_name
+
+
+    def is_raw( self ):
+        return self.__raw
+
+
+    # Fallback on a dissected layer. The value is converted
+    # to the same representation as the one of read().
+    def __call__( self, layer ):
+        value = getattr( layer, self.__field_name )
+        if self.__raw and self.__conv is None and value is not None:
+            value = int( value )
+        return value
+
+
+    # Reads the field of the layer at the given offset of a frame.
+    def read( self, frame, layer_offset ):
+        if self.__conditional and \
+           frame[ layer_offset ] not in icmp_id_seq_types:
+            return None
+        value = self.__struct.unpack_from(
+            frame, ( layer_offset + self.__offset ) )[ 0 ]
+        if self.__shift > 0:
+            value >>= self.__shift
+        if self.__mask is not None:
+            value &= self.__mask
+        if self.__conv is not None:
+            value = self.__conv( value )
+        return value
+
+
+
+# Returns the offsets of the layers of an Ethernet frame
+# ( scapy type : offset ) or None if the frame has to be
+# dissected by scapy.
+def locate_layers( frame ):
+    if len( frame ) < ( ETH_HDR_LEN + 20 ) or \
+       _UINT16.unpack_from( frame, 12 )[ 0 ] != ETH_TYPE_IPV4:
+        return None
+    ip_off = ETH_HDR_LEN
+    version_ihl = frame[ ip_off ]
+    ihl = version_ihl & 0xf
+    # IPv4 only, no fragments (flags MF and fragment offset).
+    if ( version_ihl >> 4 ) != 4 or ihl < 5 or \
+       ( _UINT16.unpack_from( frame, ip_off + 6 )[ 0 ] & 0x3fff ) \
+       != 0:
+        return None
+    l4_type = IP_PROTOS.get( frame[ ip_off + 9 ] )
+    l4_off = ip_off + ( ihl * 4 )
+    if l4_type is None or \
+       len( frame ) < ( l4_off + L4_HDR_LENS[ l4_type ] ):
+        return None
+    return { Ether : 0, IP : ip_off, l4_type : l4_off }
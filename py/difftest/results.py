@@ -0,0 +1,144 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         results.py
+
+
+    Purpose:      This module contains
+                  the store of the structured
+                  comparison results. Every
+                  mismatch, timing violation,
+                  missing layer and missing
+                  packet is one row of an
+                  SQLite database, indexed
+                  by run, test case and field.
+
+
+    Remarks:      - The rows of a capture pair
+                    are written in a single
+                    transaction at the end of its
+                    comparison. Forked workers
+                    open a connection of their
+                    own.
+
+                  - Result kinds: field, layer,
+                    timing, missing, additional
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import os
+import sqlite3
+import datetime as dt
+
+
+# Seconds to wait for the lock of a concurrent writer.
+DB_TIMEOUT = 60
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS pairs ( ' +
+    'pair_id INTEGER PRIMARY KEY, run TEXT, test_case TEXT, ' +
+    'rec_if TEXT, exp_pcap TEXT, act_pcap TEXT, ' +
+    'verdict INTEGER, created TEXT )',
+    'CREATE TABLE IF NOT EXISTS results ( ' +
+    'pair_id INTEGER REFERENCES pairs ( pair_id ), run TEXT, ' +
+    'test_case TEXT, kind TEXT, pkt_idx INTEGER, field TEXT, ' +
+    'expected TEXT, actual TEXT )',
+    'CREATE INDEX IF NOT EXISTS pairs_run ON pairs ( run, test_case )',
+    'CREATE INDEX IF NOT EXISTS results_run ON results ( run, test_case )',
+    'CREATE INDEX IF NOT EXISTS results_test_case ' +
+    'ON results ( test_case, field )',
+    'CREATE INDEX IF NOT EXISTS results_field ON results ( field, kind )',
+    'CREATE INDEX IF NOT EXISTS results_pair ON results ( pair_id )' )
+
+
+# A result row: ( kind, packet number, field, expected, actual ).
+# The values are stored as text, None stays NULL.
+def make_result( kind, pkt_idx = None, field = None,
+                 expected = None, actual = None ):
+    return ( kind, pkt_idx, field,
+             None if expected is None else str( expected ),
+             None if actual is None else str( actual ) )
+
+
+# The report location of a capture pair is
+# <base>/<run>/<test case>/<recording interface>.
+def split_rpt_loc( rpt_loc ):
+    parts = os.path.normpath( os.path.abspath( rpt_loc ) ) \
+            .split( os.path.sep )
+    parts = [ '' ] * 3 + parts
+    return ( parts[ -3 ], parts[ -2 ], parts[ -1 ] )
+
+
+
+class ResultStore( object ):
+    def __init__( self, db_path ):
+        self.__db_path = db_path
+
+
+    def get_db_path( self ):
+        return self.__db_path
+
+
+    # Writes the results of a capture pair. Returns the pair id.
+    def add_pair( self, rpt_loc, pcap_locs, verdict, rows ):
+        ( run, test_case, rec_if ) = split_rpt_loc( rpt_loc )
+        db_dir = os.path.dirname( self.__db_path )
+        if db_dir != '':
+            os.makedirs( db_dir, exist_ok = True )
+        conn = sqlite3.connect( self.__db_path, timeout = DB_TIMEOUT )
+        try:
+            conn.execute( 'PRAGMA journal_mode = WAL' )
+            with conn:
+                for stmt in _SCHEMA:
+                    conn.execute( stmt )
+                cur = conn.execute(
+                    'INSERT INTO pairs ( run, test_case, rec_if, ' +
+                    'exp_pcap, act_pcap, verdict, created ) ' +
+                    'VALUES ( ?, ?, ?, ?, ?, ?, ? )',
+                    ( run, test_case, rec_if, pcap_locs[ 0 ],
+                      pcap_locs[ 1 ], int( bool( verdict ) ),
+                      dt.datetime.now().isoformat() ) )
+                pair_id = cur.lastrowid
+                conn.executemany(
+                    'INSERT INTO results ( pair_id, run, test_case, ' +
+                    'kind, pkt_idx, field, expected, actual ) ' +
+                    'VALUES ( ?, ?, ?, ?, ?, ?, ?, ? )',
+                    [ ( pair_id, run, test_case ) + tuple( r ) \
+                      for r in rows ] )
+        finally:
+            conn.close()
+        return pair_id
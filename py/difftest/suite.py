@@ -0,0 +1,127 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+
+    File:         suite.py
+
+
+    Purpose:      This module contains
+                  the test suite scheduler.
+                  The test cases are run on
+                  a pool of worker processes,
+                  each worker holds one
+                  resource slot of the
+                  virtual network while it
+                  runs a test case.
+
+
+    Remarks:      - A slot is a ( generator
+                    namespace, GP namespace,
+                    PUT namespace ) triple of
+                    the virtual switch (see
+                    vnet/vswitch.bash). No two
+                    workers use the same slot
+                    at the same time.
+
+                  - Every test case runs in a
+                    fresh worker process, so
+                    the configuration of its
+                    slot does not leak into
+                    other test cases.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import sys
+import traceback
+import multiprocessing as mp
+
+
+# Slots which are not in use, shared by the worker processes.
+_free_slots = None
+
+
+def _init_worker( free_slots ):
+    global _free_slots
+    _free_slots = free_slots
+
+
+# Runs a test case in the next free slot. The verdict
+# is None if the test case aborted. The configuration errors
+# exit (SystemExit), which would end the worker process and
+# block the pool, so these are caught as well.
+def _run_in_slot( run_case_fn, case ):
+    slot = _free_slots.get()
+    try:
+        verdict = run_case_fn( case, slot )
+    except ( BaseException, ):
+        sys.stderr.write( traceback.format_exc() )
+        verdict = None
+    finally:
+        _free_slots.put( slot )
+    return ( slot, verdict )
+
+
+
+class SuiteScheduler( object ):
+    def __init__( self, log, slots ):
+        self.__log = log
+        self.__slots = slots
+
+
+    def get_slots( self ):
+        return self.__slots
+
+
+    # Runs run_case_fn( case, slot ) for all the test cases, one
+    # worker per slot. run_case_fn must be a module level function.
+    # Returns the ( slot, verdict ) of the test cases in order.
+    def run( self, run_case_fn, cases ):
+        free_slots = mp.Queue()
+        for slot in self.__slots:
+            free_slots.put( slot )
+        workers = min( len( self.__slots ), len( cases ) )
+        self.__log.info( 'Running %d test cases in %d slots.' % \
+                         ( len( cases ), len( self.__slots ) ) )
+        with mp.Pool( processes = max( 1, workers ),
+                      initializer = _init_worker,
+                      initargs = ( free_slots, ),
+                      maxtasksperchild = 1 ) as pool:
+            results = pool.starmap( _run_in_slot,
+                                    [ ( run_case_fn, x ) \
+                                      for x in cases ],
+                                    chunksize = 1 )
+        return results
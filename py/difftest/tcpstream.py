@@ -0,0 +1,186 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         tcpstream.py
+
+
+    Purpose:      This module contains
+                  the TCP stream reassembly.
+                  The TCP segments of a
+                  capture are assembled to
+                  one byte stream per flow
+                  and direction in a single
+                  pass over the capture.
+
+
+    Remarks:      - Retransmitted and
+                    overlapping segments are
+                    taken into account once,
+                    out of order segments are
+                    held back until the gap
+                    before them is closed.
+
+                  - For every byte of a stream
+                    the packet with which it
+                    became available can be
+                    looked up.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import bisect
+from scapy.layers.inet import IP, TCP
+from scapy.layers.inet6 import IPv6
+
+
+SEQ_MOD = ( 1 << 32 )
+TCP_FLAG_SYN = 0x02
+
+
+# Returns the byte streams of all the TCP flows and directions
+# of a packet sequence, in the order of their first packet.
+def reassemble_tcp( pkts ):
+    streams = {}
+    for ( idx, pkt ) in enumerate( pkts ):
+        tcp = pkt.getlayer( TCP )
+        if tcp is None:
+            continue
+        ip = pkt.getlayer( IP )
+        if ip is None:
+            ip = pkt.getlayer( IPv6 )
+            if ip is None:
+                continue
+        key = ( ip.src, tcp.sport, ip.dst, tcp.dport )
+        stream = streams.get( key )
+        if stream is None:
+            stream = TcpStream( key )
+            streams[ key ] = stream
+        stream.add_segment( idx, pkt.time, tcp.seq,
+                            ( int( tcp.flags ) & TCP_FLAG_SYN ) != 0,
+                            get_tcp_payload( pkt ) )
+    return list( streams.values() )
+
+
+# The TCP payload of a packet without the link layer padding.
+def get_tcp_payload( pkt ):
+    tcp = pkt.getlayer( TCP )
+    if tcp is None:
+        return b''
+    data = bytes( tcp.payload )
+    hdr_len = ( tcp.dataofs or 5 ) * 4
+    ip = pkt.getlayer( IP )
+    if ip is not None and ip.len is not None:
+        data = data[ : max( 0, ip.len - ( ip.ihl * 4 ) - hdr_len ) ]
+    else:
+        ip = pkt.getlayer( IPv6 )
+        if ip is not None and ip.nh == 6 and ip.plen is not None:
+            data = data[ : max( 0, ip.plen - hdr_len ) ]
+    return data
+
+
+
+class TcpStream( object ):
+    def __init__( self, key ):
+        # ( source address, source port,
+        #   destination address, destination port )
+        self.__key = key
+        self.__base_seq = None
+        self.__next = 0
+        self.__data = bytearray()
+        # Out of order segments, relative seq : data
+        self.__pending = {}
+        # Stream offsets of the last bytes of the delivered
+        # parts and their packets ( packet index, time ).
+        self.__last_offsets = []
+        self.__pkts = []
+
+
+    def get_key( self ):
+        return self.__key
+
+
+    def get_data( self ):
+        return bytes( self.__data )
+
+
+    # True if segments are missing, the stream
+    # ends in front of the first missing byte.
+    def has_gap( self ):
+        return len( self.__pending ) > 0
+
+
+    # Returns ( packet index, time ) of the packet with which the
+    # byte at the given stream offset became available. For bytes
+    # of out of order segments, this is the packet closing the gap.
+    def get_pkt_at( self, offset ):
+        pos = bisect.bisect_left( self.__last_offsets, offset )
+        if pos >= len( self.__pkts ):
+            return None
+        return self.__pkts[ pos ]
+
+
+    def add_segment( self, idx, ts, seq, syn, data ):
+        if syn:
+            # The first data byte follows the SYN.
+            seq = ( seq + 1 ) % SEQ_MOD
+            if self.__base_seq is None:
+                self.__base_seq = seq
+        if len( data ) == 0:
+            return
+        if self.__base_seq is None:
+            self.__base_seq = seq
+        rel = ( seq - self.__base_seq ) % SEQ_MOD
+        prev = self.__pending.get( rel )
+        if prev is None or len( prev ) < len( data ):
+            self.__pending[ rel ] = data
+        self.__drain( idx, ts )
+
+
+    def __drain( self, idx, ts ):
+        progressed = True
+        while progressed and len( self.__pending ) > 0:
+            progressed = False
+            for rel in sorted( self.__pending ):
+                if rel > self.__next:
+                    break
+                data = self.__pending.pop( rel )
+                end = rel + len( data )
+                if end > self.__next:
+                    self.__data += data[ ( self.__next - rel ) : ]
+                    self.__next = end
+                    self.__last_offsets.append( end - 1 )
+                    self.__pkts.append( ( idx, ts ) )
+                progressed = True
@@ -7,15 +7,34 @@ from difftest.cfg import PlatformCfg, \
                          RecInterfaceCfg, \
                          RecorderCfg, \
                          CmpCfg, \
-                         ComparatorEntry
+                         ComparatorEntry, \
+                         GoldenCacheCfg
 from difftest.util import create_directory, \
                           create_timestamp_str, \
                           get_cfg_value, \
+                          get_cfg_int, \
+                          get_cfg_float, \
+                          get_cfg_bool, \
                           get_dev_null, \
                           parse_literal_string
+from difftest.columnar import NUMPY_AVAILABLE
+from difftest.normalise import parse_normalise_rules
 
 dump_location_base = None
 
+CMP_READ_MODES = ( 'list', 'stream' )
+CMP_MATCH_MODES = ( 'positional', 'align', 'flow', 'window' )
+CMP_ENGINES = ( 'interpreted', 'plan', 'columnar', 'fingerprint' )
+REC_MODES = ( 'memory', 'stream' )
+TEST_RUN_MODES = ( 'sequential', 'concurrent' )
+
+# Naming of the virtual switch, see vnet/vnetenv.
+VNET_MIN_PORTS = 1
+VNET_MAX_PORTS = 8
+VNET_VETH_BASE_NAME = 'veth'
+VNET_OVS_PORT_BASE_NAME = 'ovs-p'
+VNET_IP_ADDR_BASE = '192.168.50.1'
+
 # Golden Platform ...
 def get_gp_cfg():
     platf_cfg = PlatformCfg(
@@ -82,6 +101,8 @@ def get_gen_cfg( platf_cfg, gen_if_name ):
         gen_cmd = None,
         stdout = out,
         stderr = err )
+    gen_cfg.set_setns( get_cfg_bool( 'GENERATOR', 'setns',
+                                     fallback = gen_cfg.get_setns() ) )
     return gen_cfg
 
 
@@ -152,15 +173,134 @@ def assemble_rec_ifs( rec_if_0_name, single_if_bool_str,
 def get_gp_rec_cfg():
     rec_ifs = assemble_gp_rec_ifs()
     rec_cfg = RecorderCfg( rec_ifs, None )
+    rec_cfg = inject_rec_settings( rec_cfg )
     return rec_cfg
 
 
 def get_put_rec_cfg():
     rec_ifs = assemble_put_rec_ifs()
     rec_cfg = RecorderCfg( rec_ifs, None )
+    rec_cfg = inject_rec_settings( rec_cfg )
+    return rec_cfg
+
+
+# General recorder settings, valid for all test cases.
+def inject_rec_settings( rec_cfg ):
+    rec_mode = get_cfg_value( 'RECORDER', 'mode',
+                              fallback = rec_cfg.get_rec_mode() )
+    if rec_mode not in REC_MODES:
+        sys.stderr.write( ( 'Unknown recorder mode: %s. ' + \
+                            'Valid modes: %s\n' ) % \
+                          ( rec_mode, str( REC_MODES ) ) )
+        sys.exit( os.EX_USAGE )
+    queue_size = get_cfg_int( 'RECORDER', 'queue_size',
+                              fallback = rec_cfg.get_queue_size() )
+    batch_size = get_cfg_int( 'RECORDER', 'batch_size',
+                              fallback = rec_cfg.get_batch_size() )
+    if queue_size <= 0 or batch_size <= 0:
+        sys.stderr.write( 'Recorder queue and batch size must ' + \
+                          'be greater than zero.\n' )
+        sys.exit( os.EX_USAGE )
+    rec_cfg.set_rec_mode( rec_mode )
+    rec_cfg.set_queue_size( queue_size )
+    rec_cfg.set_batch_size( batch_size )
+    rec_cfg.set_raw_capture( get_cfg_bool( 'RECORDER', 'raw_capture',
+        fallback = rec_cfg.get_raw_capture() ) )
+    idle_timeout = get_cfg_float( 'RECORDER', 'idle_timeout',
+                                  fallback = rec_cfg.get_idle_timeout() )
+    if idle_timeout < 0:
+        sys.stderr.write( 'The recorder idle timeout must not be ' + \
+                          'negative.\n' )
+        sys.exit( os.EX_USAGE )
+    rec_cfg.set_idle_timeout( idle_timeout )
     return rec_cfg
 
 
+# 'sequential' runs a test case against the GP and then against
+# the PUT, 'concurrent' runs it against both at the same time.
+def get_test_run_mode():
+    run_mode = get_cfg_value( 'TEST_RUN', 'mode',
+                              fallback = 'sequential' )
+    if run_mode not in TEST_RUN_MODES:
+        sys.stderr.write( ( 'Unknown test run mode: %s. ' + \
+                            'Valid modes: %s\n' ) % \
+                          ( run_mode, str( TEST_RUN_MODES ) ) )
+        sys.exit( os.EX_USAGE )
+    return run_mode
+
+
+# Resource slots of the test suite scheduler, a list of
+# ( generator namespace, GP namespace, PUT namespace ) numbers.
+# Empty if the test cases are run one after another.
+def get_suite_slots():
+    slots_str = get_cfg_value( 'TEST_SUITE', 'slots', fallback = '' )
+    if slots_str.strip() == '':
+        return []
+    slots = parse_literal_string( slots_str )
+    if not chk_suite_slots( slots ):
+        sys.stderr.write( ( 'Invalid test suite slots: %s. A slot ' + \
+                            'is a tuple of three distinct ' + \
+                            'namespace numbers ( %d ... %d ), ' + \
+                            'slots must not share namespaces.\n' ) % \
+                          ( str( slots ), VNET_MIN_PORTS,
+                            VNET_MAX_PORTS ) )
+        sys.exit( os.EX_USAGE )
+    return slots
+
+
+def chk_suite_slots( slots ):
+    if type( slots ) != list:
+        return False
+    nss = []
+    for slot in slots:
+        if type( slot ) != tuple or len( slot ) != 3:
+            return False
+        nss += list( slot )
+    res = [ type( x ) == int and \
+            x >= VNET_MIN_PORTS and x <= VNET_MAX_PORTS \
+            for x in nss ]
+    return all( res ) and len( set( nss ) ) == len( nss )
+
+
+# The ini file values which are specific to a slot. The GP and
+# the PUT are recorded on their own switch ports, the captures
+# of a slot go to a directory of their own. case_section is the
+# ini section of the test case (generator command prefix).
+def get_slot_overrides( slot, case_section ):
+    ( gen_ns, gp_ns, put_ns ) = slot
+    gen_if = VNET_VETH_BASE_NAME + str( gen_ns )
+    gp_port = VNET_OVS_PORT_BASE_NAME + str( gp_ns )
+    put_port = VNET_OVS_PORT_BASE_NAME + str( put_ns )
+    base_path = get_cfg_value( 'PCAP_DUMP_LOCATION', 'base_path' )
+    overrides = {
+        ( 'GOLDEN_PLATFORM', 'ip' ) : VNET_IP_ADDR_BASE + str( gp_ns ),
+        ( 'PLATFORM_UNDER_TEST', 'ip' ) : \
+            VNET_IP_ADDR_BASE + str( put_ns ),
+        ( 'GEN_INTERFACE_GP', 'name' ) : gen_if,
+        ( 'GEN_INTERFACE_PUT', 'name' ) : gen_if,
+        ( 'REC_INTERFACE_GP_0', 'name' ) : gp_port,
+        ( 'REC_INTERFACE_GP_1', 'name' ) : gp_port,
+        ( 'REC_INTERFACE_PUT_0', 'name' ) : put_port,
+        ( 'REC_INTERFACE_PUT_1', 'name' ) : put_port,
+        ( 'PCAP_DUMP_LOCATION', 'base_path' ) : \
+            base_path + os.path.sep + ( 'slot_%d' % ( gen_ns, ) ),
+        ( case_section, 'prefix' ) : 'ip netns exec ns%d' % ( gen_ns, ) }
+    return overrides
+
+
+# Golden cache configuration, None if the cache is disabled.
+def get_golden_cache_cfg():
+    if not get_cfg_bool( 'GOLDEN_CACHE', 'enabled',
+                         fallback = False ):
+        return None
+    path = get_cfg_value( 'GOLDEN_CACHE', 'path' )
+    version_tag = get_cfg_value( 'GOLDEN_CACHE', 'version' )
+    if path == '':
+        sys.stderr.write( 'The golden cache needs a path.\n' )
+        sys.exit( os.EX_USAGE )
+    return GoldenCacheCfg( path, version_tag )
+
+
 def mk_rec_dir_tree_and_f_expr( cmd_name, rec_cfg, rec_filter_expr,
                                 rec_pause_before_stop_str ):
     cmd_dump_dir = ( get_pcap_dump_loc() + os.path.sep + cmd_name )
@@ -211,6 +351,100 @@ def get_initial_cmp_cfg( recorder_service ):
             os.path.dirname( pcap_exp_loc ) )
     assert( len( cmp_cfg.get_cmp_pair_pcap_locations() ) == \
             len( cmp_cfg.get_cmp_pair_pcap_locations() ) )
+    cmp_cfg = inject_cmp_settings( cmp_cfg )
+    return cmp_cfg
+
+
+# General comparator settings, valid for all test cases.
+def inject_cmp_settings( cmp_cfg ):
+    read_mode = get_cfg_value( 'COMPARATOR', 'read_mode',
+                               fallback = cmp_cfg.get_read_mode() )
+    if read_mode not in CMP_READ_MODES:
+        sys.stderr.write( ( 'Unknown comparator read mode: %s. ' + \
+                            'Valid modes: %s\n' ) % \
+                          ( read_mode, str( CMP_READ_MODES ) ) )
+        sys.exit( os.EX_USAGE )
+    match_mode = get_cfg_value( 'COMPARATOR', 'match_mode',
+                                fallback = cmp_cfg.get_match_mode() )
+    if match_mode not in CMP_MATCH_MODES:
+        sys.stderr.write( ( 'Unknown comparator match mode: %s. ' + \
+                            'Valid modes: %s\n' ) % \
+                          ( match_mode, str( CMP_MATCH_MODES ) ) )
+        sys.exit( os.EX_USAGE )
+    if read_mode == 'stream' and match_mode != 'positional':
+        sys.stderr.write( 'The stream read mode supports the ' + \
+                          'positional match mode only.\n' )
+        sys.exit( os.EX_USAGE )
+    cmp_cfg.set_read_mode( read_mode )
+    cmp_cfg.set_match_mode( match_mode )
+    match_window = get_cfg_float( 'COMPARATOR', 'match_window',
+                                  fallback = cmp_cfg.get_match_window() )
+    if match_window < 0:
+        sys.stderr.write( 'The comparator match window must ' + \
+                          'not be negative.\n' )
+        sys.exit( os.EX_USAGE )
+    cmp_cfg.set_match_window( match_window )
+    cmp_cfg.set_target_ips( ( get_cfg_value( 'GOLDEN_PLATFORM', 'ip' ),
+                              get_cfg_value( 'PLATFORM_UNDER_TEST',
+                                             'ip' ) ) )
+    cmp_cfg.set_lazy_dissect( get_cfg_bool( 'COMPARATOR', 'lazy_dissect',
+        fallback = cmp_cfg.get_lazy_dissect() ) )
+    workers = get_cfg_int( 'COMPARATOR', 'workers',
+                           fallback = cmp_cfg.get_workers() )
+    if workers < 0:
+        sys.stderr.write( 'The number of comparator workers ' + \
+                          'must not be negative.\n' )
+        sys.exit( os.EX_USAGE )
+    cmp_cfg.set_workers( workers )
+    chunk_size = get_cfg_int( 'COMPARATOR', 'chunk_size',
+                              fallback = cmp_cfg.get_chunk_size() )
+    if chunk_size < 0:
+        sys.stderr.write( 'The comparator chunk size must ' + \
+                          'not be negative.\n' )
+        sys.exit( os.EX_USAGE )
+    if chunk_size > 0 and match_mode != 'positional':
+        sys.stderr.write( 'The chunked comparison supports the ' + \
+                          'positional match mode only.\n' )
+        sys.exit( os.EX_USAGE )
+    cmp_cfg.set_chunk_size( chunk_size )
+    engine = get_cfg_value( 'COMPARATOR', 'engine',
+                            fallback = cmp_cfg.get_engine() )
+    if engine not in CMP_ENGINES:
+        sys.stderr.write( ( 'Unknown comparator engine: %s. ' + \
+                            'Valid engines: %s\n' ) % \
+                          ( engine, str( CMP_ENGINES ) ) )
+        sys.exit( os.EX_USAGE )
+    if engine == 'columnar' and not NUMPY_AVAILABLE:
+        sys.stderr.write( 'The columnar comparator engine ' + \
+                          'requires NumPy.\n' )
+        sys.exit( os.EX_USAGE )
+    cmp_cfg.set_engine( engine )
+    golden_model_path = get_cfg_value( 'COMPARATOR',
+                                       'golden_model_path', fallback = '' )
+    if golden_model_path != '':
+        cmp_cfg.set_golden_model_path( golden_model_path )
+    try:
+        cmp_cfg.set_normalise_rules( parse_normalise_rules(
+            get_cfg_value( 'COMPARATOR', 'normalise', fallback = '' ) ) )
+    except ( ValueError, ) as e:
+        sys.stderr.write( str( e ) + '\n' )
+        sys.exit( os.EX_USAGE )
+    max_mismatches = get_cfg_int( 'COMPARATOR', 'max_mismatches',
+        fallback = cmp_cfg.get_max_mismatches() )
+    max_cmp_time = get_cfg_float( 'COMPARATOR', 'max_cmp_time',
+        fallback = cmp_cfg.get_max_cmp_time() )
+    if max_mismatches < 0 or max_cmp_time < 0:
+        sys.stderr.write( 'The comparator limits must ' + \
+                          'not be negative.\n' )
+        sys.exit( os.EX_USAGE )
+    cmp_cfg.set_max_mismatches( max_mismatches )
+    cmp_cfg.set_max_cmp_time( max_cmp_time )
+    cmp_cfg.set_stop_on_timing( get_cfg_bool( 'COMPARATOR', 'stop_on_timing',
+        fallback = cmp_cfg.get_stop_on_timing() ) )
+    results_db = get_cfg_value( 'COMPARATOR', 'results_db',
+                                fallback = '' )
+    if results_db != '':
+        cmp_cfg.set_results_db( results_db )
     return cmp_cfg
 
 
@@ -0,0 +1,243 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         timing.py
+
+
+    Purpose:      This module contains
+                  the inter packet time
+                  check. The differences
+                  of the packet timestamps
+                  are checked against the
+                  expected ranges of the
+                  timing configuration
+                  ( mu, sigma ).
+
+
+    Remarks:      - With NumPy the check is
+                    done on arrays of blocks of
+                    timestamps, otherwise on
+                    plain lists.
+
+                  - The range sequence is
+                    repeated if there are more
+                    packets than ranges.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import logging
+import itertools as itt
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# An inter packet time is in range if it is not more than
+# SIGMA_TIMES standard deviations away from the mean.
+SIGMA_TIMES = 3
+# Number of timestamps checked at once, the memory use
+# does not depend on the capture size.
+TIMING_BLOCK_SIZE = 65536
+
+
+# Returns the inter packet times and the expected ranges
+# ( left and right bounds ) of a sequence of timestamps block
+# by block, as ( index of the first inter packet time of the
+# block, diffs, lefts, rights ). The offset is the index of
+# the range of the first time.
+def iter_inter_pkt_times( times, tr, offset = 0,
+                          sigma_times = SIGMA_TIMES,
+                          block_size = TIMING_BLOCK_SIZE ):
+    if len( tr ) == 0:
+        return
+    times = iter( times )
+    t_first = next( times, None )
+    if t_first is None:
+        return
+    mus = [ mu for ( mu, _ ) in tr ]
+    sigmas = [ sigma for ( _, sigma ) in tr ]
+    if np is not None:
+        mus = np.array( mus, dtype = float )
+        sigmas = np.array( sigmas, dtype = float )
+    # Last time of the previous block.
+    prev = 0.0
+    start = 0
+    while True:
+        # Relative to the first timestamp, the float
+        # precision is then good enough for the differences.
+        rel_times = ( float( t - t_first ) for t in \
+                      itt.islice( times, block_size ) )
+        if np is not None:
+            rel_times = np.fromiter( rel_times, dtype = float )
+            num = len( rel_times )
+            if num == 0:
+                break
+            diffs = np.diff( rel_times, prepend = prev )
+            idx = ( np.arange( start, start + num ) + offset ) % \
+                  len( tr )
+            lefts = np.maximum( mus[ idx ] - \
+                                ( sigma_times * sigmas[ idx ] ), 0.0 )
+            rights = mus[ idx ] + ( sigma_times * sigmas[ idx ] )
+        else:
+            rel_times = list( rel_times )
+            num = len( rel_times )
+            if num == 0:
+                break
+            diffs = [ ( b - a ) for ( a, b ) in \
+                      zip( [ prev ] + rel_times[ : -1 ], rel_times ) ]
+            idx = [ ( ( k + offset ) % len( tr ) ) \
+                    for k in range( start, start + num ) ]
+            lefts = [ max( mus[ k ] - ( sigma_times * sigmas[ k ] ),
+                           0.0 ) for k in idx ]
+            rights = [ mus[ k ] + ( sigma_times * sigmas[ k ] ) \
+                       for k in idx ]
+        prev = float( rel_times[ -1 ] )
+        yield ( start, diffs, lefts, rights )
+        start += num
+
+
+# Returns the indices of the inter packet times
+# which are out of their expected range.
+def find_timing_violations( diffs, lefts, rights ):
+    if np is not None:
+        mask = ( diffs < lefts ) | ( diffs > rights )
+        return np.flatnonzero( mask ).tolist()
+    return [ k for ( k, ( diff, left, right ) ) in \
+             enumerate( zip( diffs, lefts, rights ) ) \
+             if not ( diff >= left and diff <= right ) ]
+
+
+# Checks the inter packet times of the expected and the actual
+# timestamps against the time ranges trs ( GP, PUT ), None if a
+# side is not checked. The timing check works on iterables of
+# timestamps, so it can be fed from in memory packet lists as
+# well as from streamed captures.
+def chk_time_ranges( ctx, trs, exp_times, act_times ):
+    results = []
+    for ( d, tr, t ) in zip( ( 'GP', 'PUT' ), trs,
+                             ( exp_times, act_times ) ):
+        if tr is not None:
+            ctx.get_log().info( ( 'Timing ranges to check for ' +
+                                  '%s: ' % ( d, ) ) + str( tr ) )
+            results.append( chk_pkt_times( ctx, d, tr, t ) )
+        else:
+            ctx.get_log().info( ( 'No timing values present for ' +
+                                  'target: %s' ) % ( d, ) )
+            results.append( True )
+    return all( results )
+
+
+# pkt_idxs are the capture indices of the timestamps if these
+# are not the whole capture (flow match mode), the packet
+# numbers in the report are those of the capture.
+def chk_pkt_times( ctx, d, tr, times, first_idx = 1, pkt_idxs = None ):
+    log = ctx.get_log()
+    budget = ctx.get_budget()
+    # Nothing is checked after an early stop, the
+    # comparison fails anyway.
+    if budget.is_stopped():
+        return True
+    # The time range sequence is repeated if there are
+    # more packets than time ranges.
+    violations = 0
+    first_violation = None
+    for ( start, diffs, lefts, rights ) in iter_inter_pkt_times(
+            times, tr, offset = ( first_idx - 1 ) ):
+        block_violations = find_timing_violations( diffs, lefts,
+                                                   rights )
+        if budget.stops_on_timing():
+            block_violations = block_violations[ : 1 ]
+        # The per packet messages are formatted only if they
+        # are written at all, otherwise the violations only.
+        if log.isEnabledFor( logging.DEBUG ):
+            rows = range( len( diffs ) )
+            if len( block_violations ) > 0 and \
+               budget.stops_on_timing():
+                rows = range( block_violations[ 0 ] + 1 )
+        else:
+            rows = block_violations
+        _log_pkt_times( ctx, d, tr, ( first_idx + start ),
+                        ( diffs, lefts, rights ), rows,
+                        set( block_violations ), pkt_idxs )
+        if first_violation is None and len( block_violations ) > 0:
+            first_violation = ( first_idx + start +
+                                block_violations[ 0 ] + 1 )
+            if pkt_idxs is not None:
+                first_violation = pkt_idxs[ first_violation - 1 ] + 1
+        violations += len( block_violations )
+        if violations > 0 and budget.stops_on_timing():
+            break
+    result = ( violations == 0 )
+    budget.add_timing_result( result, first_violation )
+    log.debug( 'Packet times check: %s', result )
+    return result
+
+
+# Logs the rows of a block of inter packet times, first_idx
+# is the packet number of the first row of the block.
+def _log_pkt_times( ctx, d, tr, first_idx, block, rows, violations,
+                    pkt_idxs = None ):
+    log = ctx.get_log()
+    ( diffs, lefts, rights ) = block
+    for k in rows:
+        idx = ( first_idx + k )
+        ( num, next_num ) = ( idx, ( idx + 1 ) )
+        if pkt_idxs is not None:
+            num = pkt_idxs[ idx - 1 ] + 1
+            next_num = pkt_idxs[ idx ] + 1
+        diff = float( diffs[ k ] )
+        left = float( lefts[ k ] )
+        right = float( rights[ k ] )
+        log.debug( 'Between packet %4d and %4d ( %s ):',
+                   num, next_num, d )
+        log.debug( 'diff : %f s', diff )
+        log.debug( 'mu   : %f s', tr[ ( idx - 1 ) % len( tr ) ][ 0 ] )
+        log.debug( 'sigma: %f s', tr[ ( idx - 1 ) % len( tr ) ][ 1 ] )
+        log.debug( 'Expected range: [ %f, ..., %f ] s', left, right )
+        if k not in violations:
+            log.debug( 'Inter packet time in range between ' +
+                       'packet %4d and %4d', num, next_num )
+        else:
+            log.error( 'Timing violation on %s between packet ' +
+                       '%4d and %4d', d, num, next_num )
+            log.error( 'Expected range: [ %f, ..., %f ] s',
+                       left, right )
+            log.error( 'Actual value: %f s', diff )
+            ctx.add_result( 'timing', num, 'time.%s' % ( d, ),
+                '[ %f, ..., %f ]' % ( left, right ), diff )
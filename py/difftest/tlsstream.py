@@ -0,0 +1,137 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         tlsstream.py
+
+
+    Purpose:      This module contains
+                  the extraction of the TLS
+                  handshake messages from
+                  reassembled TCP streams
+                  (see tcpstream.py). Each
+                  record and each handshake
+                  message is parsed once.
+
+
+    Remarks:      - Handshake messages may
+                    span several records and
+                    records several segments.
+
+                  - Handshake records after a
+                    ChangeCipherSpec record are
+                    encrypted and skipped.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+import struct
+from scapy.all import conf
+from scapy.layers.tls.handshake import _tls_handshake_cls
+
+
+TLS_REC_HDR_LEN = 5
+TLS_HS_HDR_LEN = 4
+TLS_CHANGE_CIPHER_SPEC = 20
+TLS_HANDSHAKE = 22
+TLS_CONTENT_TYPES = ( 20, 21, 22, 23, 24 )
+
+_REC_HDR = struct.Struct( '!BBBH' )
+
+
+# Returns the handshake messages of all the streams in the
+# order of the packets which completed them. Every message is
+# a dissected scapy handshake layer with the time of the
+# completing packet.
+def get_tls_hs_msgs( streams ):
+    msgs = []
+    for ( order, stream ) in enumerate( streams ):
+        for ( seq, ( idx, msg ) ) in enumerate(
+            _get_stream_hs_msgs( stream ) ):
+            msgs.append( ( idx, order, seq, msg ) )
+    msgs.sort( key = lambda x: x[ : 3 ] )
+    return [ x[ 3 ] for x in msgs ]
+
+
+# True if the TCP payload starts with a handshake record.
+def starts_with_tls_hs( payload ):
+    return len( payload ) > 0 and payload[ 0 ] == TLS_HANDSHAKE
+
+
+def _get_stream_hs_msgs( stream ):
+    data = stream.get_data()
+    pos = 0
+    encrypted = False
+    hs_buf = bytearray()
+    # Handshake buffer end offsets of the records and
+    # the stream offsets of their last bytes.
+    hs_ends = []
+    hs_pos = 0
+    while ( pos + TLS_REC_HDR_LEN ) <= len( data ):
+        ( ctype, major, _, length ) = _REC_HDR.unpack_from( data, pos )
+        if ctype not in TLS_CONTENT_TYPES or major != 3:
+            # Not (or no longer) a TLS stream.
+            break
+        rec_end = pos + TLS_REC_HDR_LEN + length
+        if rec_end > len( data ):
+            break
+        if ctype == TLS_CHANGE_CIPHER_SPEC:
+            encrypted = True
+        elif ctype == TLS_HANDSHAKE and not encrypted:
+            hs_buf += data[ ( pos + TLS_REC_HDR_LEN ) : rec_end ]
+            hs_ends.append( ( len( hs_buf ), rec_end - 1 ) )
+            while ( hs_pos + TLS_HS_HDR_LEN ) <= len( hs_buf ):
+                msg_len = int.from_bytes(
+                    hs_buf[ ( hs_pos + 1 ) : ( hs_pos + 4 ) ], 'big' )
+                msg_end = hs_pos + TLS_HS_HDR_LEN + msg_len
+                if msg_end > len( hs_buf ):
+                    break
+                raw = bytes( hs_buf[ hs_pos : msg_end ] )
+                last = [ x[ 1 ] for x in hs_ends if x[ 0 ] >= msg_end ][ 0 ]
+                ( idx, ts ) = stream.get_pkt_at( last )
+                msg = _dissect_hs_msg( raw )
+                msg.time = ts
+                yield ( idx, msg )
+                hs_pos = msg_end
+        pos = rec_end
+
+
+def _dissect_hs_msg( raw ):
+    cls = _tls_handshake_cls.get( raw[ 0 ], conf.raw_layer )
+    try:
+        return cls( raw )
+    except ( Exception, ):
+        # Same fallback as the scapy pcap reader.
+        return conf.raw_layer( raw )
@@ -1,11 +1,16 @@
 
 import os
 import sys
+import queue
 import logging
+import threading
+import logging.handlers
 import datetime as dt
 import configparser as cp
 import ast
 
+from distutils import util as dstutl
+
 
 # Global declaration of the log level
 LOG_LEVEL = logging.INFO
@@ -15,6 +20,13 @@ LOG_FMT_STR = '%(asctime)s [%(threadName)-' + \
 # Test setup ini file location
 INI_PATH = './test_setup.ini'
 
+# Maximal number of report records written at once.
+REPORT_BATCH_SIZE = 512
+
+# Values which take precedence over the test setup ini file,
+# ( section, property name ) : value.
+cfg_overrides = {}
+
 
 def get_logger( logger_name = __name__ ):
     log_formatter = logging.Formatter( LOG_FMT_STR )
@@ -26,30 +38,144 @@ def get_logger( logger_name = __name__ ):
     return log
 
 
+# The report records are queued by the comparator and written
+# to the report file (and stdout) by a background listener.
 def get_report_logger( file_path, also_stdout = True ):
     log_formatter = logging.Formatter( LOG_FMT_STR )
     log = logging.getLogger( ( 'Logger ' + file_path ) )
     log_file = ( file_path + '/report.txt' )
     file_handler = logging.FileHandler( log_file )
     file_handler.setFormatter( log_formatter )
-    log.addHandler( file_handler )
+    handlers = [ file_handler ]
     if also_stdout:
         console_handler = logging.StreamHandler( sys.stdout )
         console_handler.setFormatter( log_formatter )
-        log.addHandler( console_handler )
+        handlers.append( console_handler )
+    listener = ReportListener( handlers )
+    log.addHandler( ReportQueueHandler( listener ) )
     log.setLevel( LOG_LEVEL )
     os.chmod( log_file, 0o666 )
+    listener.start()
     return log
 
 
+# Writes all the queued records before the handlers are closed.
 def tear_down_report_logger( log ):
     handlers = log.handlers[ : ]
     for handler in handlers:
+        if isinstance( handler, ReportQueueHandler ):
+            handler.get_listener().stop()
         handler.flush()
         handler.close()
         log.removeHandler( handler )
 
 
+
+# Queues the records unformatted, they are formatted
+# by the listener thread.
+class ReportQueueHandler( logging.handlers.QueueHandler ):
+    def __init__( self, listener ):
+        super().__init__( listener.get_queue() )
+        self.__listener = listener
+
+
+    def get_listener( self ):
+        return self.__listener
+
+
+    def prepare( self, record ):
+        return record
+
+
+
+# Writes the queued records in batches, the streams are
+# flushed once per batch.
+class ReportListener( object ):
+    def __init__( self, handlers ):
+        self.__queue = queue.SimpleQueue()
+        self.__handlers = handlers
+        self.__thread = threading.Thread( target = self.__run,
+            name = 'report-writer', daemon = True )
+
+
+    def get_queue( self ):
+        return self.__queue
+
+
+    def start( self ):
+        self.__thread.start()
+
+
+    # Returns as soon as all the records queued so far are
+    # written and the handlers are closed.
+    def stop( self ):
+        if self.__thread.is_alive():
+            self.__queue.put( None )
+            self.__thread.join()
+        for handler in self.__handlers:
+            handler.close()
+
+
+    def __run( self ):
+        done = False
+        while not done:
+            batch = [ self.__queue.get() ]
+            while len( batch ) < REPORT_BATCH_SIZE:
+                try:
+                    batch.append( self.__queue.get_nowait() )
+                except queue.Empty:
+                    break
+            if batch[ -1 ] is None:
+                batch.pop()
+                done = True
+            for handler in self.__handlers:
+                self.__write( handler, batch )
+
+
+    def __write( self, handler, batch ):
+        handler.acquire()
+        try:
+            for record in batch:
+                if record.levelno >= handler.level:
+                    handler.stream.write( handler.format( record ) +
+                                          handler.terminator )
+            handler.stream.flush()
+        except ( Exception, ):
+            for record in batch:
+                handler.handleError( record )
+        finally:
+            handler.release()
+
+
+# Logger which keeps the messages in a list instead of writing
+# them out. Used by worker processes, the messages are written
+# to the report by the parent process in the right order. The
+# chunks and flows of a process are compared one after the
+# other, so a single logger per process is reused with a new
+# list on every call (named loggers are never freed).
+def get_buffer_logger():
+    records = []
+    log = logging.getLogger( 'Buffer %d' % ( os.getpid(), ) )
+    for handler in log.handlers[ : ]:
+        log.removeHandler( handler )
+    log.addHandler( RecordListHandler( records ) )
+    log.setLevel( LOG_LEVEL )
+    log.propagate = False
+    return ( log, records )
+
+
+class RecordListHandler( logging.Handler ):
+    def __init__( self, records ):
+        super().__init__()
+        self.__records = records
+
+
+    def emit( self, record ):
+        self.__records.append( ( record.levelno,
+                                 record.getMessage() ) )
+
+
+
 def print_failwhale( out = sys.stderr, mute = False ):
     fw_str = \
         ( '\n\n' +
@@ -147,8 +273,19 @@ def create_timestamp_str():
     return ts
 
 
-def get_cfg_value( section, property_name ):
+# Overrides the ini file values of this process, e.g. with the
+# values of the resource slot of a test suite worker.
+def set_cfg_overrides( overrides ):
+    cfg_overrides.clear()
+    cfg_overrides.update( overrides )
+
+
+# A property with a fallback is optional, the fallback is
+# returned if the property or its section is missing.
+def get_cfg_value( section, property_name, fallback = None ):
     ret_val = ''
+    if ( section, property_name ) in cfg_overrides:
+        return cfg_overrides[ ( section, property_name ) ]
     config = cp.ConfigParser( allow_no_value = True )
     if len( config.read( INI_PATH ) ) != 1:
         sys.stderr.write( 'Something went wrong. Is the test ' + \
@@ -157,8 +294,48 @@ def get_cfg_value( section, property_name ):
         sys.exit( os.EX_UNAVAILABLE )
     try:
         ret_val = config.get( section, property_name )
-    except ( cp.NoSectionError, cp.NoOptionError,
-             cp.InterpolationSyntaxError ) as e:
+    except ( cp.NoSectionError, cp.NoOptionError ) as e:
+        if fallback is not None:
+            return fallback
+        sys.stderr.write( str( e ) + '\n' )
+        sys.exit( os.EX_USAGE )
+    except ( cp.InterpolationSyntaxError, ) as e:
+        sys.stderr.write( str( e ) + '\n' )
+        sys.exit( os.EX_USAGE )
+    return ret_val
+
+
+def get_cfg_int( section, property_name, fallback = None ):
+    ret_val = get_cfg_value( section, property_name, fallback )
+    if fallback is not None and ret_val is fallback:
+        return ret_val
+    try:
+        ret_val = int( ret_val, base = 10 )
+    except ( ValueError, ) as e:
+        sys.stderr.write( str( e ) + '\n' )
+        sys.exit( os.EX_USAGE )
+    return ret_val
+
+
+def get_cfg_float( section, property_name, fallback = None ):
+    ret_val = get_cfg_value( section, property_name, fallback )
+    if fallback is not None and ret_val is fallback:
+        return ret_val
+    try:
+        ret_val = float( ret_val )
+    except ( ValueError, ) as e:
+        sys.stderr.write( str( e ) + '\n' )
+        sys.exit( os.EX_USAGE )
+    return ret_val
+
+
+def get_cfg_bool( section, property_name, fallback = None ):
+    ret_val = get_cfg_value( section, property_name, fallback )
+    if fallback is not None and ret_val is fallback:
+        return ret_val
+    try:
+        ret_val = bool( dstutl.strtobool( ret_val ) )
+    except ( ValueError, ) as e:
         sys.stderr.write( str( e ) + '\n' )
         sys.exit( os.EX_USAGE )
     return ret_val
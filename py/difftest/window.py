@@ -0,0 +1,163 @@
+'''
+############################################################
+
+                             +
+                ---====D                        @
+       o                    *
+                    *              o
+            |
+           -O-                         =( =         +
+      +     |                   *
+                   ____     ________
+                  /  _/__  / __/ __/    .
+                 _/ // _ \/ _/_\ \             +  .
+        *       /___/_//_/___/___/             |
+                                       -O-         @
+      +                                |
+                      *
+                   ,      .
+           .    `
+       @                +    `~---~~`           *
+
+                   *       .            o         +
+
+
+    Institute of Embedded Systems
+    Zurich University of Applied Sciences
+    8401 Winterthur, Switzerland
+
+
+    File:         window.py
+
+
+    Purpose:      This module contains
+                  the windowed multiset
+                  matching of two captures.
+                  Packets with equal keys are
+                  matched if their relative
+                  times differ by no more than
+                  the window, regardless of
+                  their order.
+
+
+    Remarks:      - The captures are swept once,
+                    the unmatched packets of the
+                    actual capture are held in
+                    per key buckets while they
+                    are within the window.
+
+                  - Among several candidates the
+                    earliest packet is matched.
+
+
+    Author(s):    P. Leibundgut <leiu@zhaw.ch>
+
+
+    Date:         10/2026
+
+
+############################################################
+'''
+
+from collections import deque
+from difftest.align import KeyInterner
+
+
+# Matches the packets of a (keys and times) with those of b.
+# The times are relative to the start of their capture.
+# Returns ( matched index pairs, unmatched indices of a,
+# unmatched indices of b ).
+def match_windowed( a_keys, a_times, b_keys, b_times, window ):
+    matched = []
+    a_left = []
+    b_left = []
+    # key : unmatched indices of b, in capture order
+    buckets = {}
+    j = 0
+    num_b = len( b_keys )
+    for ( i, ( key, t ) ) in enumerate( zip( a_keys, a_times ) ):
+        while j < num_b and b_times[ j ] <= ( t + window ):
+            bucket = buckets.get( b_keys[ j ] )
+            if bucket is None:
+                bucket = deque()
+                buckets[ b_keys[ j ] ] = bucket
+            bucket.append( j )
+            j += 1
+        bucket = buckets.get( key )
+        if bucket is not None:
+            # Packets which dropped out of the window stay
+            # unmatched.
+            while len( bucket ) > 0 and \
+                  b_times[ bucket[ 0 ] ] < ( t - window ):
+                b_left.append( bucket.popleft() )
+        if bucket:
+            matched.append( ( i, bucket.popleft() ) )
+        else:
+            a_left.append( i )
+    for bucket in buckets.values():
+        b_left += bucket
+    b_left += range( j, num_b )
+    b_left.sort()
+    return ( matched, a_left, b_left )
+
+
+# Pairs the unmatched packets of both captures which are within
+# the window of each other in a merge like sweep, for a field by
+# field diagnosis. Returns ( index pairs, missing indices of a,
+# additional indices of b ).
+def pair_leftovers( a_left, a_times, b_left, b_times, window ):
+    pairs = []
+    missing = []
+    additional = []
+    ( k, l ) = ( 0, 0 )
+    while k < len( a_left ) and l < len( b_left ):
+        ( i, j ) = ( a_left[ k ], b_left[ l ] )
+        if abs( a_times[ i ] - b_times[ j ] ) <= window:
+            pairs.append( ( i, j ) )
+            k += 1
+            l += 1
+        elif a_times[ i ] < b_times[ j ]:
+            missing.append( i )
+            k += 1
+        else:
+            additional.append( j )
+            l += 1
+    missing += a_left[ k : ]
+    additional += b_left[ l : ]
+    return ( pairs, missing, additional )
+
+
+# Packets with equal projections are matched as multisets
+# within the match window, their order does not matter. The
+# leftovers are paired up within the window for a field by
+# field comparison or reported as missing and additional.
+def cmp_windowed( ctx, a, b, window ):
+    log = ctx.get_log()
+    interner = KeyInterner()
+    keys = []
+    times = []
+    for pkts in ( a, b ):
+        keys.append( [ interner.get_key( x ) for x in \
+                       ctx.project_all( pkts ) ] )
+        t = [ float( x ) for x in ctx.get_times( pkts ) ]
+        times.append( [ ( x - t[ 0 ] ) for x in t ] )
+    ( matched, a_left, b_left ) = match_windowed(
+        keys[ 0 ], times[ 0 ], keys[ 1 ], times[ 1 ], window )
+    ( pairs, missing, additional ) = pair_leftovers(
+        a_left, times[ 0 ], b_left, times[ 1 ], window )
+    cmp_ok = ( len( missing ) == 0 and len( additional ) == 0 )
+    for ( i, j ) in pairs:
+        if ctx.get_budget().is_exhausted():
+            break
+        log.debug( 'Expected packet %4d is compared with actual ' +
+                   'packet %4d', ( i + 1 ), ( j + 1 ) )
+        if not ctx.eq( ( i + 1 ), a[ i ], b[ j ] ):
+            cmp_ok = False
+    # Missing and additional packets count as mismatches.
+    ctx.report_missing( missing, 'no match within the window' )
+    ctx.report_additional( additional, 'no match within the window' )
+    log.info( ( 'Window matching ( %f s ): %d matched, %d differing, ' +
+                '%d missing, %d additional packets.' ) % \
+              ( window, len( matched ), len( pairs ), len( missing ),
+                len( additional ) ) )
+    return cmp_ok
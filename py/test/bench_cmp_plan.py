@@ -0,0 +1,122 @@
+import os
+import sys
+import time
+import tempfile
+
+from scapy.all import Ether, IP, ICMP, wrpcap, rdpcap
+
+# The difftest package is imported from the source tree, so
+# the benchmark runs without the PYTHONPATH of launch.bash.
+sys.path.insert( 0, os.path.abspath( os.path.join(
+    os.path.dirname( __file__ ), os.pardir ) ) )
+
+from difftest.bases import Comparator
+from difftest.cfg import CmpCfg, ComparatorEntry
+from difftest.plan import compile_cmp_plan
+from difftest.columnar import NUMPY_AVAILABLE, extract_columns, \
+                              find_mismatch_rows
+from difftest.fingerprint import get_fingerprints, find_mismatch_fps
+from difftest.util import get_logger
+
+log = get_logger( logger_name = __name__ )
+
+# Number of echo request/reply pairs per capture.
+NUM_PAIRS = 5000
+
+
+class BenchComparator( Comparator ):
+    def __init__( self, cfg ):
+        super().__init__( log, cfg )
+
+
+    def setup( self, recorder_service ):
+        pass
+
+
+    def enrich_cmp_cfg( self ):
+        self._cfg.add_cmp_entry( ComparatorEntry( IP,
+            ( lambda x: x.version, lambda x: x.src, lambda x: x.dst ) ) )
+        self._cfg.add_cmp_entry( ComparatorEntry( ICMP,
+            ( lambda x: x.type, lambda x: x.code, lambda x: x.seq ) ) )
+
+
+    def start( self ):
+        return super().start()
+
+
+    def stop( self ):
+        super().stop()
+
+
+
+def make_capture( path ):
+    pkts = []
+    t = 1000.0
+    for i in range( NUM_PAIRS ):
+        for icmp_type in ( 8, 0 ):
+            pkt = Ether() / IP( src = '10.0.0.1', dst = '10.0.0.2' ) / \
+                  ICMP( type = icmp_type, seq = i )
+            t += 1.0 if icmp_type == 8 else 0.001
+            pkt.time = t
+            pkts.append( pkt )
+    wrpcap( path, pkts )
+
+
+# Only the comparison is timed, the captures are read and
+# dissected beforehand. Packet pairs which are found to differ
+# in bulk (columnar, fingerprint) are compared with the plan.
+def run_engine( engine, a, b ):
+    cfg = CmpCfg()
+    comparator = BenchComparator( cfg )
+    comparator.enrich_cmp_cfg()
+    plan = compile_cmp_plan( cfg.get_cmp_entries() )
+    specific = [ x[ 2 ] is not None for x in plan.get_entries() ]
+    layout = [ len( x[ 1 ] ) for x in plan.get_entries() ]
+    pairs = list( zip( range( 1, len( a ) + 1 ), a, b ) )
+    start = time.perf_counter()
+    if engine == 'interpreted':
+        # Without a plan the comparator interprets the entries.
+        oks = [ comparator._eq( idx, x, y ) for ( idx, x, y ) in pairs ]
+    elif engine == 'plan':
+        oks = [ plan.eq( log, idx, x, y ) for ( idx, x, y ) in pairs ]
+    else:
+        projs = [ [ plan.project( x ) for x in pkts ] \
+                  for pkts in ( a, b ) ]
+        if engine == 'columnar':
+            rows = find_mismatch_rows( extract_columns( projs[ 0 ],
+                                                        layout ),
+                                       extract_columns( projs[ 1 ],
+                                                        layout ),
+                                       specific )
+        else:
+            rows = find_mismatch_fps(
+                get_fingerprints( projs[ 0 ], specific ),
+                get_fingerprints( projs[ 1 ], specific ) )
+        oks = [ plan.eq( log, pairs[ i ][ 0 ], pairs[ i ][ 1 ],
+                         pairs[ i ][ 2 ] ) for i in rows ]
+    duration = time.perf_counter() - start
+    return ( all( oks ), duration )
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        pcap_path = os.path.join( tmp_dir, 'bench.pcap' )
+        make_capture( pcap_path )
+        a = rdpcap( pcap_path )
+        b = rdpcap( pcap_path )
+        engines = [ 'interpreted', 'plan', 'fingerprint' ]
+        if NUMPY_AVAILABLE:
+            engines.append( 'columnar' )
+        for engine in engines:
+            ( verdict, duration ) = run_engine( engine, a, b )
+            log.info( 'Engine %-12s verdict: %s, %8.3f s, %6.2f us/pkt' % \
+                      ( engine, str( verdict ), duration,
+                        duration * 1e6 / ( 2 * NUM_PAIRS ) ) )
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt as ki:
+        print( str( ki ) )
+        sys.exit( os.EX_OK )
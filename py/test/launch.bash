@@ -32,10 +32,17 @@ function launch_test_cases()
 }
 
 
+function launch_bench_cmp_plan()
+{
+    eval ${PY_PATH} ${PY3} bench_cmp_plan.py
+}
+
+
 function main()
 {
     printf "Test launch script says: Hello, World!\n"
     # launch_gen_test
+    # launch_bench_cmp_plan
     launch_test_cases
 }
 
@@ -6,7 +6,10 @@ import sys
 import pelix.framework
 from pelix.utilities import use_service
 
-from difftest.util import get_logger
+from difftest.util import get_logger, set_cfg_overrides, \
+                          get_cfg_value, create_directory
+from difftest.testenv import get_suite_slots, get_slot_overrides
+from difftest.suite import SuiteScheduler
 
 log = get_logger( logger_name = __name__ )
 framework = None
@@ -31,6 +34,7 @@ def run_test_case( context, tc_bundle ):
     with use_service( context, ref_config ) as svc_config:
         # Here, svc_config points to test case bundle.
         svc_config.run()
+        return svc_config.get_cmp_service().get_verdict()
 
 
 def install_bundles_tc_icmp_0( context ):
@@ -55,16 +59,68 @@ def install_bundles_tc_tlshs( context ):
 
 def run_tc_icmp_0( context ):
     log.info( 'Testing the ICMP 0 test case service.' )
-    run_test_case( context, 'test_icmp_0' )
+    return run_test_case( context, 'test_icmp_0' )
 
 
 def run_tc_tlshs( context ):
     log.info( 'Testing the TLS handshake test case service.' )
-    run_test_case( context, 'test_tlshs' )
+    return run_test_case( context, 'test_tlshs' )
+
+
+# Test cases of the suite:
+# ( name, bundle installation, run, ini section )
+TEST_CASES = [ ( 'icmp_0', install_bundles_tc_icmp_0, run_tc_icmp_0,
+                 'ICMP_GEN_CMD_0' ),
+               ( 'tlshs', install_bundles_tc_tlshs, run_tc_tlshs,
+                 'TLS_HS_0' ) ]
+
+
+# Runs a single test case in a worker process of the suite
+# scheduler, with a framework of its own.
+def run_tc_in_slot( case, slot ):
+    global framework
+    ( name, install_fn, run_fn, section ) = case
+    set_cfg_overrides( get_slot_overrides( slot, section ) )
+    create_directory( get_cfg_value( 'PCAP_DUMP_LOCATION',
+                                     'base_path' ) )
+    log.info( 'Running the %s test case in slot %s.' % \
+              ( name, str( slot ) ) )
+    framework = pelix.framework.create_framework( (
+        'pelix.ipopo.core',
+        'pelix.shell.core' ) )
+    framework.start()
+    try:
+        context = framework.get_bundle_context()
+        context = install_fn( context )
+        verdict = run_fn( context )
+    finally:
+        framework.stop()
+        pelix.framework.FrameworkFactory.delete_framework()
+        framework = None
+    return verdict
+
+
+def run_suite( slots ):
+    scheduler = SuiteScheduler( log, slots )
+    results = scheduler.run( run_tc_in_slot, TEST_CASES )
+    for ( case, ( slot, verdict ) ) in zip( TEST_CASES, results ):
+        if verdict is None:
+            verdict_str = 'aborted'
+        elif verdict:
+            verdict_str = 'passed'
+        else:
+            verdict_str = 'failed'
+        log.info( 'Test case %s ( slot %s ): %s' % \
+                  ( case[ 0 ], str( slot ), verdict_str ) )
 
 
 def main():
     global framework
+    slots = get_suite_slots()
+    if len( slots ) > 0:
+        run_suite( slots )
+        return
+
     framework = pelix.framework.create_framework( (
         # iPOPO
         'pelix.ipopo.core',
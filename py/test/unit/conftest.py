@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The difftest package is imported from the source tree,
+# like with the PYTHONPATH of launch.bash.
+sys.path.insert( 0, os.path.abspath( os.path.join(
+    os.path.dirname( __file__ ), os.pardir, os.pardir ) ) )
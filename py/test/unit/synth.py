@@ -0,0 +1,20 @@
+from scapy.all import wrpcap
+from scapy.layers.l2 import Ether
+from scapy.layers.inet import IP, ICMP
+
+
+# ICMP echo requests from 10.0.0.1 to 10.0.0.2, one per seq
+# number, every ms.
+def make_icmp_pkts( seqs, ttl = 64, t_start = 1000.0 ):
+    pkts = []
+    for ( k, seq ) in enumerate( seqs ):
+        pkt = Ether() / IP( src = '10.0.0.1', dst = '10.0.0.2',
+                            ttl = ttl ) / ICMP( id = 1, seq = seq )
+        pkt.time = t_start + ( k * 0.001 )
+        pkts.append( pkt )
+    return pkts
+
+
+def write_pcap( path, pkts ):
+    wrpcap( str( path ), pkts )
+    return str( path )
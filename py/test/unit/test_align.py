@@ -0,0 +1,34 @@
+from difftest.align import KeyInterner, diff_opcodes
+
+
+def test_interner():
+    interner = KeyInterner()
+    keys = [ interner.get_key( x ) for x in
+             ( ( 1, [ 2, 3 ] ), ( 1, ( 2, 3 ) ), ( 1, { 2 : 3 } ), None ) ]
+    assert keys == [ 0, 0, 1, 2 ]
+
+
+def test_equal():
+    assert diff_opcodes( [ 1, 2, 3 ], [ 1, 2, 3 ] ) == \
+        [ ( 'equal', 0, 3, 0, 3 ) ]
+
+
+def test_missing_and_changed():
+    assert diff_opcodes( [ 1, 2, 3, 4, 5 ], [ 1, 3, 9, 5 ] ) == \
+        [ ( 'equal', 0, 1, 0, 1 ), ( 'delete', 1, 2, 1, 1 ),
+          ( 'equal', 2, 3, 1, 2 ), ( 'replace', 3, 4, 2, 3 ),
+          ( 'equal', 4, 5, 3, 4 ) ]
+
+
+def test_inserted():
+    assert diff_opcodes( [ 1, 2 ], [ 0, 1, 2, 7 ] ) == \
+        [ ( 'insert', 0, 0, 0, 1 ), ( 'equal', 0, 2, 1, 3 ),
+          ( 'insert', 2, 2, 3, 4 ) ]
+
+
+# Beyond the cost limit the regions are reported as changed.
+def test_max_cost():
+    a = list( range( 10 ) )
+    b = list( range( 10, 20 ) )
+    assert diff_opcodes( a, b, max_cost = 2 ) == \
+        [ ( 'replace', 0, 10, 0, 10 ) ]
@@ -0,0 +1,65 @@
+import multiprocessing as mp
+
+from difftest.budget import CmpBudget
+
+
+def test_limit_on_last_packet():
+    budget = CmpBudget( max_mismatches = 2 )
+    budget.start()
+    for idx in range( 1, 4 ):
+        assert not budget.is_exhausted()
+        budget.add_result( idx, ( idx == 1 ) )
+    # The comparison is complete, nothing was skipped.
+    assert not budget.is_stopped()
+    assert budget.get_summary() is None
+
+
+def test_limit_before_last_packet():
+    budget = CmpBudget( max_mismatches = 2 )
+    budget.start()
+    compared = 0
+    for idx in range( 1, 6 ):
+        if budget.is_exhausted():
+            break
+        budget.add_result( idx, False )
+        compared += 1
+    assert compared == 2
+    assert budget.is_stopped()
+    assert 'after packet number 2, 2 mismatching' in \
+           budget.get_summary()
+
+
+def test_merge():
+    budget = CmpBudget( max_mismatches = 3 )
+    budget.start()
+    budget.add_result( 1, False )
+    job = budget.fork()
+    job.add_result( 7, False )
+    job.add_result( 8, False )
+    budget.merge( job )
+    assert not budget.is_stopped()
+    assert budget.is_exhausted()
+    assert 'after packet number 8, 3 mismatching' in \
+           budget.get_summary()
+
+
+def test_shared_count():
+    budget = CmpBudget( max_mismatches = 2 )
+    budget.start()
+    budget.share( mp.Value( 'l', 0 ) )
+    jobs = [ budget.fork(), budget.fork() ]
+    jobs[ 0 ].add_result( 1, False )
+    assert not jobs[ 1 ].is_exhausted()
+    jobs[ 1 ].add_result( 5, False )
+    assert jobs[ 0 ].is_exhausted()
+    budget.share( None )
+
+
+def test_timing_stop():
+    budget = CmpBudget( stop_on_timing = True )
+    budget.start()
+    budget.add_timing_result( True )
+    assert not budget.is_stopped()
+    budget.add_timing_result( False, 9 )
+    assert budget.is_stopped()
+    assert 'timing violation at packet number 9' in budget.get_summary()
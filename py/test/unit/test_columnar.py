@@ -0,0 +1,48 @@
+import pytest
+
+from difftest.columnar import NUMPY_AVAILABLE, extract_columns, \
+                              find_mismatch_rows, to_column
+
+pytestmark = pytest.mark.skipif( not NUMPY_AVAILABLE,
+                                 reason = 'NumPy is not available' )
+
+# Projections of two comparator entries with two and one fields.
+LAYOUT = [ 2, 1 ]
+
+
+def test_columns():
+    projs = [ ( ( 1, 'a' ), ( 5, ) ), ( ( 2, 'b' ), None ) ]
+    ( presence, values ) = extract_columns( projs, LAYOUT )
+    assert [ x.tolist() for x in presence ] == [ [ True, True ],
+                                                 [ True, False ] ]
+    assert values[ 0 ][ 0 ].dtype.kind == 'i'
+    assert values[ 0 ][ 1 ].dtype == object
+    assert values[ 1 ][ 0 ].tolist() == [ 5, None ]
+
+
+def test_empty():
+    ( presence, values ) = extract_columns( [], LAYOUT )
+    assert [ len( x ) for x in presence ] == [ 0, 0 ]
+    assert find_mismatch_rows( ( presence, values ),
+                               ( presence, values ), [ False, False ] ) \
+           == []
+
+
+def test_big_ints():
+    assert to_column( [ 1, ( 1 << 70 ) ] ).dtype == object
+
+
+def test_mismatch_rows():
+    a = [ ( ( 1, 'a' ), ( 5, ) ), ( ( 2, 'b' ), ( 6, ) ),
+          ( ( 3, 'c' ), ( 7, ) ), ( ( 4, 'd' ), None ) ]
+    b = [ ( ( 1, 'a' ), ( 5, ) ), ( ( 2, 'x' ), ( 6, ) ),
+          ( ( 3, 'c' ), None ), ( ( 4, 'd' ), None ),
+          ( ( 9, 'z' ), ( 1, ) ) ]
+    cols = [ extract_columns( x, LAYOUT ) for x in ( a, b ) ]
+    # The rows beyond the shorter capture are left out.
+    assert find_mismatch_rows( cols[ 0 ], cols[ 1 ],
+                               [ False, False ] ) == [ 1, 2 ]
+    # Present layers with a specific compare function are
+    # always compared packet by packet.
+    assert find_mismatch_rows( cols[ 0 ], cols[ 1 ],
+                               [ False, True ] ) == [ 0, 1, 2 ]
@@ -0,0 +1,169 @@
+import os
+import logging
+import sqlite3
+
+import pytest
+from scapy.layers.inet import IP, ICMP
+
+from difftest.bases import Comparator
+from difftest.cfg import CmpCfg, ComparatorEntry
+from difftest.util import get_logger
+from synth import make_icmp_pkts, write_pcap
+
+log = get_logger( logger_name = __name__ )
+
+NUM_PKTS = 8
+# Packet number of the changed and of the dropped packet.
+PKT_NUM = 4
+
+# ( name, configuration ) of the engines and modes, all
+# compared with the interpreted engine in positional mode.
+POSITIONAL_CFGS = [
+    ( 'plan', dict( engine = 'plan' ) ),
+    ( 'columnar', dict( engine = 'columnar' ) ),
+    ( 'fingerprint', dict( engine = 'fingerprint' ) ),
+    ( 'stream', dict( read_mode = 'stream' ) ),
+    ( 'lazy', dict( lazy_dissect = True ) ),
+    ( 'chunked', dict( chunk_size = 3 ) ),
+    ( 'chunked workers', dict( chunk_size = 3, workers = 2 ) ) ]
+MATCHING_CFGS = [
+    ( 'align', dict( match_mode = 'align' ) ),
+    ( 'window', dict( match_mode = 'window' ) ),
+    ( 'flow', dict( match_mode = 'flow' ) ),
+    ( 'flow workers', dict( match_mode = 'flow', workers = 2 ) ) ]
+
+
+class UnitComparator( Comparator ):
+    def __init__( self, cfg ):
+        super().__init__( log, cfg )
+
+
+    def setup( self, recorder_service ):
+        pass
+
+
+    def enrich_cmp_cfg( self ):
+        self._cfg.add_cmp_entry( ComparatorEntry( IP,
+            ( lambda x: x.version, lambda x: x.src, lambda x: x.dst,
+              lambda x: x.ttl ) ) )
+        self._cfg.add_cmp_entry( ComparatorEntry( ICMP,
+            ( lambda x: x.type, lambda x: x.code, lambda x: x.seq ) ) )
+
+
+    def start( self ):
+        return super().start()
+
+
+    def stop( self ):
+        super().stop()
+
+
+
+# Runs the comparator on a capture pair and returns the
+# verdict and the structured results.
+def run_cmp( tmp_path, name, exp_pkts, act_pkts, **settings ):
+    run_dir = tmp_path / name.replace( ' ', '_' )
+    rpt_loc = run_dir / 'run' / 'case' / 'if'
+    os.makedirs( str( rpt_loc ) )
+    db_path = str( run_dir / 'results.db' )
+    cfg = CmpCfg()
+    cfg.add_cmp_pcap_pair( ( write_pcap( run_dir / 'exp.pcap', exp_pkts ),
+                             write_pcap( run_dir / 'act.pcap', act_pkts ) ) )
+    cfg.add_cmp_rpt_location( str( rpt_loc ) )
+    cfg.set_results_db( db_path )
+    for ( key, value ) in settings.items():
+        getattr( cfg, 'set_' + key )( value )
+    comparator = UnitComparator( cfg )
+    comparator.enrich_cmp_cfg()
+    comparator.start()
+    comparator.stop()
+    conn = sqlite3.connect( db_path )
+    try:
+        rows = conn.execute( 'SELECT kind, pkt_idx, field, expected, ' +
+                             'actual FROM results' ).fetchall()
+    finally:
+        conn.close()
+    return ( comparator.get_verdict(), sorted( rows, key = repr ) )
+
+
+def get_field_change():
+    exp_pkts = make_icmp_pkts( range( NUM_PKTS ) )
+    act_pkts = make_icmp_pkts( range( NUM_PKTS ) )
+    act_pkts[ PKT_NUM - 1 ][ IP ].ttl = 63
+    return ( exp_pkts, act_pkts )
+
+
+def get_missing_pkt():
+    exp_pkts = make_icmp_pkts( range( NUM_PKTS ) )
+    act_pkts = make_icmp_pkts( range( NUM_PKTS ) )
+    del act_pkts[ PKT_NUM - 1 ]
+    return ( exp_pkts, act_pkts )
+
+
+@pytest.fixture( scope = 'module' )
+def interpreted( tmp_path_factory ):
+    tmp_path = tmp_path_factory.mktemp( 'interpreted' )
+    return dict( [ ( case, run_cmp( tmp_path, case, *pkts,
+                                    engine = 'interpreted' ) ) \
+                   for ( case, pkts ) in
+                   ( ( 'equal', ( make_icmp_pkts( range( NUM_PKTS ) ),
+                                  make_icmp_pkts( range( NUM_PKTS ) ) ) ),
+                     ( 'field', get_field_change() ),
+                     ( 'missing', get_missing_pkt() ) ) ] )
+
+
+def test_interpreted( interpreted ):
+    assert interpreted[ 'equal' ] == ( True, [] )
+    assert interpreted[ 'field' ] == \
+        ( False, [ ( 'field', PKT_NUM, 'IP.ttl', '64', '63' ) ] )
+    ( verdict, rows ) = interpreted[ 'missing' ]
+    assert not verdict
+    # Every packet after the dropped one is compared with
+    # its successor.
+    assert [ x[ 1 ] for x in rows if x[ 2 ] == 'ICMP.seq' ] == \
+        list( range( PKT_NUM, NUM_PKTS ) )
+
+
+@pytest.mark.parametrize( 'name, settings', POSITIONAL_CFGS,
+                          ids = [ x[ 0 ] for x in POSITIONAL_CFGS ] )
+def test_positional( tmp_path, interpreted, name, settings ):
+    pkts = make_icmp_pkts( range( NUM_PKTS ) )
+    assert run_cmp( tmp_path, 'equal', pkts, pkts, **settings ) == \
+           interpreted[ 'equal' ]
+    assert run_cmp( tmp_path, 'field', *get_field_change(),
+                    **settings ) == interpreted[ 'field' ]
+    assert run_cmp( tmp_path, 'missing', *get_missing_pkt(),
+                    **settings ) == interpreted[ 'missing' ]
+
+
+@pytest.mark.parametrize( 'name, settings', MATCHING_CFGS,
+                          ids = [ x[ 0 ] for x in MATCHING_CFGS ] )
+def test_matching( tmp_path, interpreted, name, settings ):
+    pkts = make_icmp_pkts( range( NUM_PKTS ) )
+    assert run_cmp( tmp_path, 'equal', pkts, pkts, **settings ) == \
+           interpreted[ 'equal' ]
+    assert run_cmp( tmp_path, 'field', *get_field_change(),
+                    **settings ) == interpreted[ 'field' ]
+    ( verdict, rows ) = run_cmp( tmp_path, 'missing', *get_missing_pkt(),
+                                 **settings )
+    assert not verdict
+    if settings[ 'match_mode' ] == 'flow':
+        # Positional within the flow, the packet left over
+        # is missing.
+        assert rows == sorted( interpreted[ 'missing' ][ 1 ] +
+            [ ( 'missing', NUM_PKTS,
+                'proto 1 10.0.0.1:0 <-> 10.0.0.2 #0', None, None ) ],
+            key = repr )
+    else:
+        assert rows == [ ( 'missing', PKT_NUM, None, None, None ) ]
+
+
+# The chunks and flows share a single buffer logger.
+@pytest.mark.parametrize( 'settings', [ dict( chunk_size = 1 ),
+                                        dict( match_mode = 'flow' ) ] )
+def test_no_logger_per_job( tmp_path, settings ):
+    run_cmp( tmp_path, 'warm up', *get_field_change(), **settings )
+    num_loggers = len( logging.Logger.manager.loggerDict )
+    run_cmp( tmp_path, 'field', *get_field_change(), **settings )
+    # the report logger of the pair
+    assert len( logging.Logger.manager.loggerDict ) == num_loggers + 1
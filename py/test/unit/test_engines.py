@@ -0,0 +1,134 @@
+import logging
+
+import pytest
+from scapy.layers.inet import IP, ICMP
+
+from difftest.budget import CmpBudget
+from difftest.cfg import ComparatorEntry
+from difftest.columnar import NUMPY_AVAILABLE
+from difftest.engines import CmpContext, select_engine, uses_plan, \
+                             get_positional_cmp_fn, get_match_cmp_fn, \
+                             cmp_positional, cmp_streamed
+from difftest.flows import get_flow_jobs, cmp_flow_units
+from difftest.plan import compile_cmp_plan
+from difftest.timing import chk_time_ranges
+from synth import make_icmp_pkts
+
+LOG = logging.getLogger( 'test_engines' )
+
+NUM_PKTS = 6
+
+
+# The engines work on a comparison context only, the packet
+# pairs are compared with the plan.
+def make_ctx( budget = None ):
+    plan = compile_cmp_plan( [
+        ComparatorEntry( IP, ( lambda x: x.ttl, ) ),
+        ComparatorEntry( ICMP, ( lambda x: x.seq, ) ) ] )
+    return CmpContext( LOG, CmpBudget() if budget is None else budget,
+                       [], plan = plan )
+
+
+def get_changed():
+    a = make_icmp_pkts( range( NUM_PKTS ) )
+    b = make_icmp_pkts( range( NUM_PKTS ) )
+    b[ 2 ][ IP ].ttl = 1
+    return ( a, b )
+
+
+def get_missing():
+    a = make_icmp_pkts( range( NUM_PKTS ) )
+    b = make_icmp_pkts( [ x for x in range( NUM_PKTS ) if x != 2 ] )
+    return ( a, b )
+
+
+def test_select_engine( monkeypatch ):
+    assert select_engine( 'fingerprint', LOG ) == 'fingerprint'
+    assert not uses_plan( 'interpreted' )
+    assert uses_plan( 'plan' )
+    monkeypatch.setattr( 'difftest.engines.NUMPY_AVAILABLE', False )
+    assert select_engine( 'columnar', LOG ) == 'plan'
+    assert get_positional_cmp_fn( 'plan' ) is cmp_positional
+    assert get_match_cmp_fn( 'positional', 'interpreted', 0.1 ) is \
+           cmp_positional
+
+
+@pytest.mark.parametrize( 'engine', [ 'plan', 'columnar', 'fingerprint' ] )
+def test_positional( engine ):
+    if engine == 'columnar' and not NUMPY_AVAILABLE:
+        pytest.skip( 'NumPy is not available' )
+    cmp_fn = get_positional_cmp_fn( engine )
+    ctx = make_ctx()
+    assert cmp_fn( ctx, *get_changed(), first_idx = 11 ) is False
+    assert ctx.get_results() == [ ( 'field', 13, 'IP.ttl', '64', '1' ) ]
+    ctx = make_ctx()
+    assert cmp_fn( ctx, *get_missing() ) is False
+    assert [ x[ 1 ] for x in ctx.get_results() ] == [ 3, 4, 5 ]
+
+
+@pytest.mark.parametrize( 'match_mode', [ 'align', 'window' ] )
+def test_matching( match_mode ):
+    cmp_fn = get_match_cmp_fn( match_mode, 'plan', 0.1 )
+    ctx = make_ctx()
+    assert cmp_fn( ctx, *get_changed() ) is False
+    assert ctx.get_results() == [ ( 'field', 3, 'IP.ttl', '64', '1' ) ]
+    ctx = make_ctx()
+    assert cmp_fn( ctx, *get_missing() ) is False
+    assert ctx.get_results() == [ ( 'missing', 3, None, None, None ) ]
+    ( a, b ) = get_missing()
+    ctx = make_ctx()
+    assert cmp_fn( ctx, b, a ) is False
+    assert ctx.get_results() == [ ( 'additional', 3, None, None, None ) ]
+
+
+def test_flows():
+    ( a, b ) = get_missing()
+    ( jobs, num_exp, num_act ) = get_flow_jobs( a, b, a, b,
+                                                ( None, None ) )
+    assert ( len( jobs ), num_exp, num_act ) == ( 1, 1, 1 )
+    ( key, a_idxs, b_idxs, _, _ ) = jobs[ 0 ]
+    ctx = make_ctx()
+    assert cmp_flow_units( ctx, key, a, b, a_idxs, b_idxs ) is False
+    assert [ x[ : 2 ] for x in ctx.get_results() ] == \
+        [ ( 'field', 3 ), ( 'field', 4 ), ( 'field', 5 ),
+          ( 'missing', NUM_PKTS ) ]
+    ctx = make_ctx()
+    assert cmp_flow_units( ctx, key, a, [], a_idxs, [] ) is False
+    assert ctx.get_results() == \
+        [ ( 'missing', None, 'proto 1 10.0.0.1:0 <-> 10.0.0.2 #0',
+            str( NUM_PKTS ), None ) ]
+
+
+def test_streamed():
+    ctx = make_ctx()
+    assert cmp_streamed( ctx, *[ iter( x ) for x in get_missing() ] ) == \
+        ( False, NUM_PKTS, NUM_PKTS - 1 )
+    assert [ x[ 1 ] for x in ctx.get_results() ] == [ 3, 4, 5 ]
+
+
+# The comparison stops at the limit, the budget of a forked
+# context is merged back.
+def test_budget():
+    ctx = make_ctx( CmpBudget( max_mismatches = 2 ) )
+    ctx.get_budget().start()
+    child = ctx.fork( LOG )
+    assert not cmp_positional( child, *get_missing() )
+    assert [ x[ 1 ] for x in child.get_results() ] == [ 3, 4 ]
+    ctx.merge( child.get_budget(), child.get_results() )
+    assert len( ctx.get_results() ) == 2
+    assert ctx.get_budget().is_exhausted()
+    assert ctx.get_budget().get_summary() is not None
+
+
+def test_timing():
+    ctx = make_ctx()
+    ( a, b ) = get_changed()
+    b[ 3 ].time += 0.5
+    trs = ( [ ( 0.001, 0.0001 ) ], None )
+    assert chk_time_ranges( ctx, trs, [ x.time for x in a ],
+                            [ x.time for x in b ] )
+    trs = ( None, [ ( 0.001, 0.0001 ) ] )
+    assert not chk_time_ranges( ctx, trs, [ x.time for x in a ],
+                                [ x.time for x in b ] )
+    assert [ x[ : 3 ] for x in ctx.get_results() ] == \
+        [ ( 'timing', 3, 'time.PUT' ), ( 'timing', 4, 'time.PUT' ) ]
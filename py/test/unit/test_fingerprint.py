@@ -0,0 +1,25 @@
+from difftest.fingerprint import FINGERPRINT_SIZE, get_fingerprints, \
+                                 find_mismatch_fps
+
+
+def test_fingerprints():
+    projs = [ ( ( 1, 'a' ), ( 5, ) ), ( ( 1, 'a' ), ( 5, ) ),
+              ( ( 1, 'a' ), ( 6, ) ), ( ( 1, 'a' ), None ) ]
+    fps = get_fingerprints( projs, [ False, False ] )
+    assert [ len( x ) for x in fps ] == [ FINGERPRINT_SIZE ] * 4
+    assert fps[ 0 ] == fps[ 1 ]
+    assert len( set( fps[ 1 : ] ) ) == 3
+
+
+# Packets with a present layer of an entry with a specific
+# compare function have no fingerprint.
+def test_specific():
+    projs = [ ( ( 1, 'a' ), ( 5, ) ), ( ( 1, 'a' ), None ) ]
+    fps = get_fingerprints( projs, [ False, True ] )
+    assert fps[ 0 ] is None
+    assert fps[ 1 ] is not None
+
+
+def test_mismatch_fps():
+    assert find_mismatch_fps( [ b'a', b'b', None, b'c' ],
+                              [ b'a', b'x', None ] ) == [ 1, 2 ]
@@ -0,0 +1,44 @@
+from scapy.layers.l2 import Ether, ARP
+from scapy.layers.inet import IP, TCP, UDP
+
+from difftest.flows import FLOW_OTHER, ROLE_TARGET, get_five_tuple, \
+                           index_flows, format_flow_key
+
+
+def get_pkts():
+    return [ IP( src = '10.0.0.1', dst = '10.0.0.2' ) /
+             TCP( sport = 4000, dport = 80 ),
+             Ether() / ARP(),
+             IP( src = '10.0.0.1', dst = '10.0.0.3' ) /
+             UDP( sport = 5000, dport = 53 ),
+             IP( src = '10.0.0.2', dst = '10.0.0.1' ) /
+             TCP( sport = 80, dport = 4000 ),
+             # second connection to the same service
+             IP( src = '10.0.0.1', dst = '10.0.0.2' ) /
+             TCP( sport = 4001, dport = 80 ) ]
+
+
+def test_five_tuple():
+    pkts = get_pkts()
+    assert get_five_tuple( pkts[ 0 ] ) == \
+        ( 6, ( '10.0.0.1', 4000 ), ( '10.0.0.2', 80 ) )
+    assert get_five_tuple( pkts[ 1 ] ) is None
+
+
+def test_index_flows():
+    flows = index_flows( get_pkts() )
+    assert list( flows.values() ) == [ [ 0, 3 ], [ 1 ], [ 2 ], [ 4 ] ]
+    assert list( flows )[ 1 ] == FLOW_OTHER
+    assert format_flow_key( FLOW_OTHER ) == 'non IP'
+
+
+# With the address of the target platform, the ephemeral
+# ports of the peers do not matter. The connections are
+# numbered in their order instead.
+def test_target_ip():
+    flows = index_flows( get_pkts(), '10.0.0.2' )
+    keys = list( flows )
+    assert keys[ 0 ] == ( 6, ROLE_TARGET, 80, '10.0.0.1', 0 )
+    assert keys[ 3 ] == ( 6, ROLE_TARGET, 80, '10.0.0.1', 1 )
+    assert format_flow_key( keys[ 3 ] ) == \
+        'proto 6 target:80 <-> 10.0.0.1 #1'
@@ -0,0 +1,50 @@
+import logging
+import os
+import time
+
+from difftest.genctl import GeneratorController
+from difftest.netns import get_nsenter_cmd, NETNS_ETC_DIR
+
+
+LOG = logging.getLogger( 'test_genctl' )
+
+
+def test_nsenter_cmd():
+    cmd = [ 'ip', 'netns', 'exec', 'difftest_unit_ns', 'ping', '-c', '1' ]
+    assert get_nsenter_cmd( cmd ) == \
+        [ 'nsenter', '--net=/var/run/netns/difftest_unit_ns', '--',
+          'ping', '-c', '1' ]
+    assert get_nsenter_cmd( [ 'ping', '-c', '1' ] ) == \
+        [ 'ping', '-c', '1' ]
+    # nothing left to run
+    assert get_nsenter_cmd( cmd[ : 4 ] ) == cmd[ : 4 ]
+
+
+def test_nsenter_cmd_etc_netns( monkeypatch ):
+    is_dir = os.path.isdir
+    monkeypatch.setattr( os.path, 'isdir',
+        lambda x: x == os.path.join( NETNS_ETC_DIR, 'etc_ns' ) or \
+                  is_dir( x ) )
+    cmd = [ 'ip', 'netns', 'exec', 'etc_ns', 'true' ]
+    assert get_nsenter_cmd( cmd ) == cmd
+
+
+def test_ended_process_is_forgotten():
+    ctl = GeneratorController()
+    pids = [ ctl.launch( [ 'sleep', '0.2' ], LOG ),
+             ctl.launch( [ 'true' ], LOG ) ]
+    # not waited for and not stopped
+    assert ctl.wait( pids[ 0 ] ) == 0
+    deadline = time.monotonic() + 5
+    while len( ctl._GeneratorController__procs ) > 0 and \
+          time.monotonic() < deadline:
+        time.sleep( 0.05 )
+    assert ctl._GeneratorController__procs == {}
+    assert ctl.wait( pids[ 1 ] ) is None
+
+
+def test_stop_running_process():
+    ctl = GeneratorController()
+    pid = ctl.launch( [ 'sleep', '30' ], LOG )
+    ctl.stop( [ pid ] )
+    assert ctl.wait( pid ) is None
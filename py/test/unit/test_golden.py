@@ -0,0 +1,129 @@
+import os
+
+from scapy.all import wrpcap
+from scapy.layers.inet import IP, ICMP
+
+import difftest.bases as bases
+from difftest.bases import TestCaseBase, AggregServiceBundle, \
+                           Generator, Recorder, Comparator
+from difftest.cfg import GeneratorCfg, PlatformCfg, RecorderCfg, \
+                         RecInterfaceCfg, GoldenCacheCfg
+from difftest.util import get_logger
+
+log = get_logger( logger_name = __name__ )
+
+
+class StubGenerator( Generator ):
+    def start( self ):
+        pass
+
+
+    def stop( self ):
+        pass
+
+
+
+# Writes a small ICMP capture instead of sniffing.
+class StubRecorder( Recorder ):
+    def __init__( self, log, cfg, calls ):
+        super().__init__( log, cfg )
+        self.__calls = calls
+
+
+    def start( self ):
+        self.__calls.append( 'rec %s' % self.get_target() )
+
+
+    def stop( self ):
+        for rec_if in self._cfg.get_rec_ifs():
+            filename = self.get_pcap_filename( rec_if )
+            wrpcap( filename, [ IP( dst = '10.0.0.2' ) / ICMP( seq = x ) \
+                                for x in range( 3 ) ] )
+            rec_if.set_pcap_path( filename )
+
+
+    def get_target( self ):
+        return self._cfg.get_rec_ifs()[ 0 ].get_target_str()
+
+
+
+# Like the comparator bundles, the configuration is set up
+# right before the comparison only.
+class StubComparator( Comparator ):
+    def __init__( self, log ):
+        super().__init__( log, None )
+        self.started = False
+
+
+    def setup( self, recorder_service ):
+        pass
+
+
+    def enrich_cmp_cfg( self ):
+        return False
+
+
+    def start( self ):
+        self.started = True
+
+
+    def stop( self ):
+        pass
+
+
+
+class StubTestCase( TestCaseBase ):
+    def run( self ):
+        super().run( 'stub' )
+
+
+    def unrun( self ):
+        pass
+
+
+def make_service( targets ):
+    service = AggregServiceBundle( log, 'stub' )
+    service._targets.update( targets )
+    return service
+
+
+def make_test_case( tmp_path, calls ):
+    tc = StubTestCase( log )
+    gens = {}
+    recs = {}
+    for target in ( 'GP', 'PUT' ):
+        wr_path = str( tmp_path / target )
+        os.makedirs( wr_path, exist_ok = True )
+        gen_cfg = GeneratorCfg( 'veth1', PlatformCfg( '10.0.0.2', '24' ),
+                                0, [ 'true' ] )
+        rec_cfg = RecorderCfg( ( RecInterfaceCfg( 'ovs-p1', target,
+                                                  wr_path,
+                                                  filter_expr = 'icmp' ), ),
+                               0 )
+        gens[ target ] = StubGenerator( log, gen_cfg )
+        recs[ target ] = StubRecorder( log, rec_cfg, calls )
+    tc._gen_service = make_service( gens )
+    tc._rec_service = make_service( recs )
+    tc._cmp_service = StubComparator( log )
+    return tc
+
+
+def test_run_with_golden_cache( tmp_path, monkeypatch ):
+    cache_path = str( tmp_path / 'cache' )
+    monkeypatch.setattr( bases, 'get_golden_cache_cfg',
+                         lambda: GoldenCacheCfg( cache_path, '1' ) )
+    monkeypatch.setattr( bases, 'get_test_run_mode',
+                         lambda: 'sequential' )
+    calls = []
+    # A fresh comparator has no configuration yet.
+    tc = make_test_case( tmp_path, calls )
+    tc.run()
+    assert calls == [ 'rec GP', 'rec PUT' ]
+    assert tc.get_cmp_service().started
+    assert len( os.listdir( cache_path ) ) == 1
+    # The second run takes the GP capture from the cache.
+    del calls[ : ]
+    tc = make_test_case( tmp_path, calls )
+    tc.run()
+    assert calls == [ 'rec PUT' ]
+    assert tc.get_cmp_service().started
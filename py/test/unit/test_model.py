@@ -0,0 +1,53 @@
+import os
+import shutil
+
+import numpy as np
+from scapy.layers.inet import IP, ICMP
+
+from synth import make_icmp_pkts, write_pcap
+
+from difftest.cfg import ComparatorEntry
+from difftest.columnar import extract_columns
+from difftest.model import get_model_key, save_golden_model, \
+                           load_golden_model
+from difftest.pcapio import LazyPacketList
+from difftest.plan import compile_cmp_plan
+
+
+def make_plan():
+    return compile_cmp_plan( [
+        ComparatorEntry( IP, ( lambda x: x.ttl, ) ),
+        ComparatorEntry( ICMP, ( lambda x: x.seq, ) ) ] )
+
+
+def test_copy_has_same_key( tmp_path ):
+    plan = make_plan()
+    pcap = write_pcap( tmp_path / 'a.pcap', make_icmp_pkts( range( 5 ) ) )
+    os.makedirs( str( tmp_path / 'run2' ) )
+    copy = str( tmp_path / 'run2' / 'a.pcap' )
+    shutil.copyfile( pcap, copy )
+    other = write_pcap( tmp_path / 'b.pcap',
+                        make_icmp_pkts( range( 5 ), ttl = 63 ) )
+    key = get_model_key( pcap, plan.get_signature() )
+    assert get_model_key( copy, plan.get_signature() ) == key
+    assert get_model_key( other, plan.get_signature() ) != key
+    assert get_model_key( pcap, [ 'other' ] ) != key
+
+
+def test_save_and_load( tmp_path ):
+    plan = make_plan()
+    pcap = write_pcap( tmp_path / 'a.pcap', make_icmp_pkts( range( 5 ) ) )
+    model_path = str( tmp_path / 'models' )
+    key = get_model_key( pcap, plan.get_signature() )
+    assert load_golden_model( model_path, key, pcap ) is None
+    pkts = LazyPacketList( pcap )
+    layout = [ len( x[ 1 ] ) for x in plan.get_entries() ]
+    cols = extract_columns( [ plan.project( x ) for x in pkts ], layout )
+    save_golden_model( model_path, key, pcap, cols, pkts.get_times() )
+    model = load_golden_model( model_path, key, pcap )
+    assert len( model ) == 5
+    assert model[ 3 ][ ICMP ].seq == 3
+    ( presence, values ) = model.get_columns()
+    for ( a, b ) in zip( presence, cols[ 0 ] ):
+        assert np.array_equal( a, b )
+    assert list( values[ 1 ][ 0 ] ) == [ 0, 1, 2, 3, 4 ]
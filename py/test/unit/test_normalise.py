@@ -0,0 +1,58 @@
+import pytest
+from scapy.layers.l2 import Ether
+from scapy.layers.inet import IP, ICMP, TCP
+
+from difftest.normalise import Normaliser, parse_normalise_rules
+from test_tcpstream import make_segment
+
+
+def test_parse_rules():
+    assert parse_normalise_rules( ' IP.id, chksum,,tcp_seq ' ) == \
+        [ 'IP.id', 'chksum', 'tcp_seq' ]
+    for rules in ( 'IP.foo', 'Foo.id', 'checksum' ):
+        with pytest.raises( ValueError ):
+            parse_normalise_rules( rules )
+
+
+def test_fields():
+    frames = [ bytes( Ether() / IP( id = x, ttl = 64 ) /
+                      ICMP( seq = x ) ) for x in ( 1, 2 ) ] + \
+             [ bytes( Ether() / IP( id = 3 ) / ICMP( type = 3 ) ), b'abc' ]
+    normalised = Normaliser( [ 'IP.id', 'ICMP.seq', 'chksum' ] ) \
+                 .normalise_frames( frames )
+    pkts = [ Ether( x ) for x in normalised[ : 3 ] ]
+    assert [ x[ IP ].id for x in pkts ] == [ 0, 0, 0 ]
+    assert [ x[ IP ].chksum for x in pkts ] == [ 0, 0, 0 ]
+    assert [ x[ ICMP ].chksum for x in pkts ] == [ 0, 0, 0 ]
+    assert [ x[ ICMP ].seq for x in pkts[ : 2 ] ] == [ 0, 0 ]
+    assert [ x[ IP ].ttl for x in pkts ] == [ 64, 64, 64 ]
+    # ICMP type 3 has no id and seq, not IP frames are copied
+    assert bytes( pkts[ 2 ][ ICMP ] )[ 4 : ] == \
+           bytes( Ether( frames[ 2 ] )[ ICMP ] )[ 4 : ]
+    assert normalised[ 3 ] == b'abc'
+
+
+# Only the flag bits of the 16 bit word are masked.
+def test_masked_field():
+    frame = bytes( Ether() / IP( flags = 'DF', id = 7 ) / ICMP() )
+    normalised = Normaliser( [ 'IP.flags' ] ) \
+                 .normalise_frames( [ frame ] )[ 0 ]
+    assert int( Ether( normalised )[ IP ].flags ) == 0
+    assert normalised[ 20 ] == ( frame[ 20 ] & 0x1f )
+    assert normalised[ : 20 ] + normalised[ 21 : ] == \
+           frame[ : 20 ] + frame[ 21 : ]
+
+
+def test_tcp_seq():
+    client = ( '10.0.0.1', 4000 )
+    server = ( '10.0.0.2', 443 )
+    frames = [ bytes( make_segment( 1000, b'', flags = 'S',
+                                    src = client, dst = server ) ),
+               bytes( make_segment( 5000, b'', flags = 'SA',
+                                    src = server, dst = client ) ),
+               bytes( make_segment( 1001, b'ab', src = client,
+                                    dst = server, ack = 5001 ) ) ]
+    pkts = [ Ether( x ) for x in
+             Normaliser( [ 'tcp_seq' ] ).normalise_frames( frames ) ]
+    assert [ x[ TCP ].seq for x in pkts ] == [ 0, 0, 1 ]
+    assert pkts[ 2 ][ TCP ].ack == 1
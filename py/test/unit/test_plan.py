@@ -0,0 +1,82 @@
+import logging
+import operator
+
+from scapy.layers.inet import IP, ICMP, TCP
+
+from difftest.cfg import ComparatorEntry
+from difftest.plan import compile_cmp_plan, get_attr_path, \
+                          get_getter_signature
+from difftest.rawfield import RawField
+from synth import make_icmp_pkts
+
+LOG = logging.getLogger( 'test_plan' )
+
+
+def get_entries( cmp_fn = None ):
+    return [ ComparatorEntry( IP, ( lambda x: x.ttl, lambda x: x.src ) ),
+             ComparatorEntry( ICMP, ( lambda x: x.seq, ), cmp_fn ) ]
+
+
+def test_attr_getters():
+    assert get_attr_path( lambda x: x.ttl ) == 'ttl'
+    assert get_attr_path( lambda x: x.payload.seq ) == 'payload.seq'
+    assert get_attr_path( lambda x: x.ttl + 1 ) is None
+    plan = compile_cmp_plan( get_entries() )
+    getters = plan.get_entries()[ 0 ][ 1 ]
+    assert all( [ isinstance( x, operator.attrgetter ) for x in getters ] )
+    assert plan.get_labels() == ( ( 'IP.ttl', 'IP.src' ), ( 'ICMP.seq', ) )
+
+
+def test_signature():
+    assert get_getter_signature( lambda x: x.ttl ) == \
+           get_getter_signature( lambda y: y.ttl )
+    assert get_getter_signature( lambda x: x.ttl * 2 ) != \
+           get_getter_signature( lambda x: x.ttl * 3 )
+    assert compile_cmp_plan( get_entries() ).get_signature() == \
+           compile_cmp_plan( get_entries() ).get_signature()
+
+
+def test_eq():
+    plan = compile_cmp_plan( get_entries() )
+    ( a, b ) = make_icmp_pkts( [ 1, 2 ] )
+    results = []
+    assert plan.eq( LOG, 1, a, a, results )
+    assert not plan.eq( LOG, 2, a, b, results )
+    assert results == [ ( 'field', 2, 'ICMP.seq', '1', '2' ) ]
+    c = a.copy()
+    c[ IP ].remove_payload()
+    assert not plan.eq( LOG, 3, a, c, results )
+    assert results[ -1 ] == ( 'layer', 3, 'ICMP', 'True', 'False' )
+
+
+def test_eq_cmp_fn():
+    calls = []
+    def cmp_fn( log, idx, a, b ):
+        calls.append( ( idx, a, b ) )
+        return True
+    plan = compile_cmp_plan( get_entries( cmp_fn ) )
+    ( a, b ) = make_icmp_pkts( [ 1, 2 ] )
+    assert plan.eq( LOG, 7, a, b )
+    assert calls == [ ( 7, 1, 2 ) ]
+
+
+def test_project_raw():
+    plan = compile_cmp_plan( [
+        ComparatorEntry( IP, ( RawField( IP, 'ttl' ),
+                               RawField( IP, 'src' ),
+                               RawField( IP, 'flags' ) ) ),
+        ComparatorEntry( ICMP, ( RawField( ICMP, 'type' ),
+                                 RawField( ICMP, 'seq' ) ) ),
+        ComparatorEntry( TCP, ( RawField( TCP, 'sport' ), ) ) ] )
+    assert plan.is_raw()
+    pkt = make_icmp_pkts( [ 5 ] )[ 0 ]
+    frame = bytes( pkt )
+    dissected = pkt.__class__( frame )
+    assert plan.project_raw( frame ) == plan.project( dissected )
+    assert plan.project_raw( frame ) == \
+        ( ( 64, '10.0.0.1', 0 ), ( 8, 5 ), None )
+
+
+def test_not_raw():
+    plan = compile_cmp_plan( get_entries() )
+    assert not plan.is_raw()
@@ -0,0 +1,49 @@
+from scapy.layers.l2 import Ether
+from scapy.layers.inet import IP, ICMP, TCP, UDP
+from scapy.layers.inet6 import IPv6
+
+from difftest.rawfield import RawField, locate_layers
+
+
+def test_locate_layers():
+    frame = bytes( Ether() / IP( options = b'\x01\x01\x01\x01' ) / UDP() )
+    assert locate_layers( frame ) == { Ether : 0, IP : 14, UDP : 38 }
+    assert locate_layers( bytes( Ether() / IPv6() / UDP() ) ) is None
+    assert locate_layers( bytes( Ether() / IP( frag = 1 ) / UDP() ) ) \
+           is None
+    # truncated TCP header
+    assert locate_layers( bytes( Ether() / IP() / TCP() )[ : -1 ] ) \
+           is None
+
+
+def test_read_like_scapy():
+    pkt = Ether( src = '00:11:22:33:44:55' ) / \
+          IP( src = '10.1.2.3', ttl = 17, flags = 'DF', tos = 3 ) / \
+          TCP( sport = 1234, seq = 0xfffffff0, flags = 'SA',
+               window = 77 )
+    frame = bytes( pkt )
+    layer_offs = locate_layers( frame )
+    dissected = Ether( frame )
+    for ( scapy_type, names ) in (
+        ( Ether, ( 'src', 'dst', 'type' ) ),
+        ( IP, ( 'version', 'ihl', 'tos', 'len', 'flags', 'frag',
+                'ttl', 'proto', 'chksum', 'src', 'dst' ) ),
+        ( TCP, ( 'sport', 'seq', 'dataofs', 'flags', 'window' ) ) ):
+        for name in names:
+            field = RawField( scapy_type, name )
+            assert field.read( frame, layer_offs[ scapy_type ] ) == \
+                   field( dissected[ scapy_type ] ), name
+
+
+def test_icmp_id_seq():
+    field = RawField( ICMP, 'seq' )
+    for ( icmp_type, seq ) in ( ( 8, 3 ), ( 3, None ) ):
+        frame = bytes( Ether() / IP() / ICMP( type = icmp_type,
+                                               seq = 3 ) )
+        assert field.read( frame, 34 ) == seq
+
+
+def test_not_raw():
+    field = RawField( IP, 'options' )
+    assert not field.is_raw()
+    assert field( IP( options = [] ) ) == []
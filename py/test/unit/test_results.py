@@ -0,0 +1,44 @@
+import os
+import sqlite3
+
+from difftest.results import ResultStore, make_result, split_rpt_loc
+
+
+def test_make_result():
+    assert make_result( 'field', 3, 'IP.ttl', 64, 63 ) == \
+        ( 'field', 3, 'IP.ttl', '64', '63' )
+    assert make_result( 'missing', 4 ) == \
+        ( 'missing', 4, None, None, None )
+
+
+def test_split_rpt_loc():
+    assert split_rpt_loc( '/base/run_1/test_icmp_0/eth0' ) == \
+        ( 'run_1', 'test_icmp_0', 'eth0' )
+    assert split_rpt_loc( '/eth0' ) == ( '', '', 'eth0' )
+
+
+# Pairs of several runs end up in the same database.
+def test_add_pair( tmp_path ):
+    db_path = str( tmp_path / 'db' / 'results.db' )
+    store = ResultStore( db_path )
+    rows = [ make_result( 'field', 3, 'IP.ttl', 64, 63 ),
+             make_result( 'missing', 4 ) ]
+    ids = [ store.add_pair( os.path.join( str( tmp_path ), run,
+                                          'case', 'eth0' ),
+                            ( 'exp.pcap', 'act.pcap' ), verdict, r ) \
+            for ( run, verdict, r ) in ( ( 'run_1', False, rows ),
+                                         ( 'run_2', True, [] ) ) ]
+    assert ids == [ 1, 2 ]
+    conn = sqlite3.connect( db_path )
+    try:
+        assert conn.execute( 'SELECT run, test_case, rec_if, exp_pcap, ' +
+                             'verdict FROM pairs ORDER BY pair_id' ) \
+                   .fetchall() == \
+            [ ( 'run_1', 'case', 'eth0', 'exp.pcap', 0 ),
+              ( 'run_2', 'case', 'eth0', 'exp.pcap', 1 ) ]
+        assert conn.execute( 'SELECT pair_id, run, kind, pkt_idx, ' +
+                             'field, expected, actual FROM results' ) \
+                   .fetchall() == \
+            [ ( 1, 'run_1' ) + rows[ 0 ], ( 1, 'run_1' ) + rows[ 1 ] ]
+    finally:
+        conn.close()
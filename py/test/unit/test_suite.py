@@ -0,0 +1,39 @@
+import os
+import sys
+import signal
+
+import pytest
+
+from difftest.suite import SuiteScheduler
+from difftest.util import get_logger
+
+log = get_logger( logger_name = __name__ )
+
+
+def run_case( case, slot ):
+    if case == 'config error':
+        sys.exit( os.EX_USAGE )
+    if case == 'error':
+        raise RuntimeError( case )
+    return ( case == 'pass' )
+
+
+@pytest.fixture
+def deadline():
+    # A blocked pool fails the test instead of hanging it.
+    def expired( signum, frame ):
+        raise TimeoutError( 'suite did not finish' )
+    old = signal.signal( signal.SIGALRM, expired )
+    signal.alarm( 60 )
+    yield
+    signal.alarm( 0 )
+    signal.signal( signal.SIGALRM, old )
+
+
+def test_aborted_cases( deadline ):
+    scheduler = SuiteScheduler( log, [ 0, 1 ] )
+    cases = [ 'pass', 'config error', 'fail', 'error', 'pass' ]
+    results = scheduler.run( run_case, cases )
+    assert [ x[ 1 ] for x in results ] == [ True, None, False, None,
+                                            True ]
+    assert set( x[ 0 ] for x in results ) <= { 0, 1 }
@@ -0,0 +1,54 @@
+from scapy.layers.l2 import Ether
+from scapy.layers.inet import IP, TCP
+
+from difftest.tcpstream import reassemble_tcp, get_tcp_payload
+
+ISN = 0xfffffffe
+
+
+def make_segment( seq, data, flags = 'PA', t = 0.0,
+                  src = ( '10.0.0.1', 4000 ), dst = ( '10.0.0.2', 443 ),
+                  ack = 0 ):
+    pkt = Ether() / IP( src = src[ 0 ], dst = dst[ 0 ] ) / \
+          TCP( sport = src[ 1 ], dport = dst[ 1 ], flags = flags,
+               seq = ( seq % ( 1 << 32 ) ), ack = ack ) / data
+    pkt.time = t
+    return pkt
+
+
+def test_payload_without_padding():
+    pkt = Ether( bytes( make_segment( 1, b'abc' ) ) + b'\x00' * 10 )
+    assert get_tcp_payload( pkt ) == b'abc'
+
+
+# The sequence numbers wrap around, a segment is retransmitted
+# and one arrives out of order.
+def test_reassembly():
+    pkts = [ make_segment( ISN, b'', flags = 'S', t = 1.0 ),
+             make_segment( ISN + 1, b'ab', t = 2.0 ),
+             make_segment( ISN + 5, b'ef', t = 3.0 ),
+             make_segment( ISN + 1, b'ab', t = 4.0 ),
+             make_segment( ISN + 3, b'cd', t = 5.0 ),
+             make_segment( 1, b'', flags = 'SA', t = 6.0,
+                           src = ( '10.0.0.2', 443 ),
+                           dst = ( '10.0.0.1', 4000 ) ) ]
+    streams = reassemble_tcp( pkts )
+    assert [ x.get_key() for x in streams ] == \
+        [ ( '10.0.0.1', 4000, '10.0.0.2', 443 ),
+          ( '10.0.0.2', 443, '10.0.0.1', 4000 ) ]
+    stream = streams[ 0 ]
+    assert stream.get_data() == b'abcdef'
+    assert not stream.has_gap()
+    assert stream.get_pkt_at( 1 ) == ( 1, 2.0 )
+    # the out of order bytes became available with the
+    # segment closing the gap
+    assert stream.get_pkt_at( 5 ) == ( 4, 5.0 )
+    assert stream.get_pkt_at( 6 ) is None
+    assert streams[ 1 ].get_data() == b''
+
+
+def test_gap():
+    stream = reassemble_tcp( [ make_segment( 100, b'ab' ),
+                               make_segment( 104, b'ef' ) ] )[ 0 ]
+    assert stream.get_data() == b'ab'
+    assert stream.has_gap()
@@ -0,0 +1,67 @@
+
+import pytest
+
+from difftest.cfg import CmpCfg, RecorderCfg, PlatformCfg
+from difftest.testenv import inject_cmp_settings, inject_rec_settings, \
+                             get_gen_cfg, get_test_run_mode, \
+                             get_suite_slots, get_golden_cache_cfg
+
+BASELINE_INI = """
+[GOLDEN_PLATFORM]
+ip = 10.0.0.2
+netmask = 24
+
+[PLATFORM_UNDER_TEST]
+ip = 10.0.0.3
+netmask = 24
+
+[SILENCE_OUTPUT]
+generators = True
+recorders = True
+"""
+
+
+# An ini file without any of the optional sections.
+@pytest.fixture
+def baseline_ini( tmp_path, monkeypatch ):
+    ( tmp_path / 'test_setup.ini' ).write_text( BASELINE_INI )
+    monkeypatch.chdir( tmp_path )
+
+
+def test_defaults( baseline_ini ):
+    cmp_cfg = inject_cmp_settings( CmpCfg() )
+    default_cfg = CmpCfg()
+    assert cmp_cfg.get_engine() == default_cfg.get_engine()
+    assert cmp_cfg.get_match_mode() == 'positional'
+    assert cmp_cfg.get_read_mode() == 'list'
+    assert cmp_cfg.get_workers() == 1
+    assert cmp_cfg.get_golden_model_path() is None
+    assert cmp_cfg.get_results_db() is None
+    assert cmp_cfg.get_normalise_rules() == []
+    rec_cfg = inject_rec_settings( RecorderCfg( (), 1 ) )
+    assert rec_cfg.get_rec_mode() == 'memory'
+    assert rec_cfg.get_idle_timeout() == 0
+    assert not rec_cfg.get_raw_capture()
+    gen_cfg = get_gen_cfg( PlatformCfg( '10.0.0.2', '24' ), 'veth1' )
+    assert not gen_cfg.get_setns()
+    assert get_test_run_mode() == 'sequential'
+    assert get_suite_slots() == []
+    assert get_golden_cache_cfg() is None
+
+
+def test_values( baseline_ini, tmp_path ):
+    with open( str( tmp_path / 'test_setup.ini' ), 'a' ) as f:
+        f.write( '[COMPARATOR]\nengine = columnar\nworkers = 2\n' +
+                 '[RECORDER]\nidle_timeout = 0.5\n' )
+    cmp_cfg = inject_cmp_settings( CmpCfg() )
+    assert cmp_cfg.get_engine() == 'columnar'
+    assert cmp_cfg.get_workers() == 2
+    rec_cfg = inject_rec_settings( RecorderCfg( (), 1 ) )
+    assert rec_cfg.get_idle_timeout() == 0.5
+
+
+def test_invalid_value( baseline_ini, tmp_path ):
+    with open( str( tmp_path / 'test_setup.ini' ), 'a' ) as f:
+        f.write( '[COMPARATOR]\nworkers = many\n' )
+    with pytest.raises( SystemExit ):
+        inject_cmp_settings( CmpCfg() )
@@ -0,0 +1,42 @@
+from scapy.layers.tls.record import TLS, TLSChangeCipherSpec
+from scapy.layers.tls.handshake import TLSClientHello, TLSServerHello, \
+                                       TLSFinished
+
+from difftest.tcpstream import reassemble_tcp
+from difftest.tlsstream import get_tls_hs_msgs, starts_with_tls_hs
+from test_tcpstream import make_segment
+
+SERVER = ( '10.0.0.2', 443 )
+CLIENT = ( '10.0.0.1', 4000 )
+
+
+def test_starts_with_hs():
+    assert starts_with_tls_hs( bytes( TLS( msg = [ TLSClientHello() ] ) ) )
+    assert not starts_with_tls_hs( b'GET / HTTP/1.1\r\n' )
+    assert not starts_with_tls_hs( b'' )
+
+
+# The client hello is split across two segments, the server
+# hello follows in between. The messages are ordered by their
+# completing packets, messages after the change cipher spec
+# are encrypted and left out.
+def test_hs_msgs():
+    client_data = bytes( TLS( msg = [ TLSClientHello() ] ) ) + \
+                  bytes( TLS( msg = [ TLSChangeCipherSpec() ] ) ) + \
+                  bytes( TLS( msg = [ TLSFinished() ] ) )
+    server_data = bytes( TLS( msg = [ TLSServerHello() ] ) )
+    pkts = [ make_segment( 1, client_data[ : 50 ], t = 1.0,
+                           src = CLIENT, dst = SERVER ),
+             make_segment( 1, server_data, t = 2.0,
+                           src = SERVER, dst = CLIENT ),
+             make_segment( 51, client_data[ 50 : ], t = 3.0,
+                           src = CLIENT, dst = SERVER ) ]
+    msgs = get_tls_hs_msgs( reassemble_tcp( pkts ) )
+    assert [ type( x ) for x in msgs ] == [ TLSServerHello,
+                                            TLSClientHello ]
+    assert [ x.time for x in msgs ] == [ 2.0, 3.0 ]
+
+
+def test_no_tls():
+    pkts = [ make_segment( 1, b'GET / HTTP/1.1\r\n\r\n' ) ]
+    assert get_tls_hs_msgs( reassemble_tcp( pkts ) ) == []
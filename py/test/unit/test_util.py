@@ -0,0 +1,18 @@
+import logging
+
+from difftest.util import get_buffer_logger, tear_down_report_logger
+
+
+def test_buffer_logger_reused():
+    num_loggers = len( logging.Logger.manager.loggerDict )
+    ( log, records ) = get_buffer_logger()
+    log.error( 'first %d', 1 )
+    tear_down_report_logger( log )
+    for k in range( 100 ):
+        ( log2, records2 ) = get_buffer_logger()
+        log2.info( 'chunk %d', k )
+    assert log2 is log
+    assert len( log2.handlers ) == 1
+    assert records == [ ( logging.ERROR, 'first 1' ) ]
+    assert records2 == [ ( logging.INFO, 'chunk 99' ) ]
+    assert len( logging.Logger.manager.loggerDict ) <= num_loggers + 1
@@ -0,0 +1,32 @@
+from difftest.window import match_windowed, pair_leftovers
+
+
+def test_reordered():
+    ( matched, a_left, b_left ) = match_windowed(
+        [ 1, 2, 3 ], [ 0.0, 0.01, 0.02 ],
+        [ 2, 1, 3 ], [ 0.0, 0.01, 0.02 ], 0.1 )
+    assert sorted( matched ) == [ ( 0, 1 ), ( 1, 0 ), ( 2, 2 ) ]
+    assert ( a_left, b_left ) == ( [], [] )
+
+
+# Equal keys are matched in capture order.
+def test_duplicates():
+    ( matched, _, _ ) = match_windowed( [ 1, 1 ], [ 0.0, 0.01 ],
+                                        [ 1, 1 ], [ 0.0, 0.01 ], 0.1 )
+    assert matched == [ ( 0, 0 ), ( 1, 1 ) ]
+
+
+def test_out_of_window():
+    ( matched, a_left, b_left ) = match_windowed(
+        [ 1, 2, 3 ], [ 0.0, 0.5, 1.0 ],
+        [ 1, 3, 2 ], [ 0.0, 0.5, 1.0 ], 0.1 )
+    assert matched == [ ( 0, 0 ) ]
+    assert ( a_left, b_left ) == ( [ 1, 2 ], [ 1, 2 ] )
+
+
+def test_leftovers():
+    a_times = [ 0.0, 0.5, 1.0, 2.0 ]
+    b_times = [ 0.05, 1.02, 3.0 ]
+    assert pair_leftovers( [ 0, 1, 2, 3 ], a_times, [ 0, 1, 2 ],
+                           b_times, 0.1 ) == \
+        ( [ ( 0, 0 ), ( 2, 1 ) ], [ 1, 3 ], [ 2 ] )